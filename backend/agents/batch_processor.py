@@ -0,0 +1,234 @@
+"""
+Batch Processor - Re-runs the agent pipeline over many existing issues
+
+This module:
+1. Streams matching issue ids from the database in keyset-paginated pages
+2. Feeds them into the agent pipeline with a per-batch concurrency cap, at
+   each issue's stored intake pre-score so a backlog never jumps live intake
+3. Tracks each batch as a job resource with progress, throughput and failures
+"""
+
+from agents.pipeline import get_pipeline
+from config import get_settings
+from utils.supabase_client import get_db
+from datetime import datetime
+import asyncio
+import time
+import uuid
+
+
+MAX_TRACKED_BATCHES = 100
+MAX_RECORDED_FAILURES = 200
+
+# Pipeline priority for issues stored before intake pre-scoring (lowest band)
+BATCH_DEFAULT_PRIORITY = 0.0
+
+_batches = {}
+
+
+class BatchJob:
+    """Progress tracking for one bulk reprocessing run"""
+
+    def __init__(self, filters: dict, issue_ids: list, concurrency: int):
+        self.id = str(uuid.uuid4())
+        self.filters = filters
+        self.issue_ids = issue_ids
+        self.concurrency = concurrency
+        self.status = "queued"  # queued, running, completed, cancelled, failed
+        self.error = None
+        self.matched = 0
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.failures = []
+        self.created_at = datetime.utcnow().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self._started_monotonic = None
+        self._finished_monotonic = None
+        self.task = None
+
+    def record_result(self, issue_id: str, status: str, error: str = None):
+        if status == "completed":
+            self.completed += 1
+        elif status == "skipped":
+            self.skipped += 1
+        else:
+            self.failed += 1
+            if len(self.failures) < MAX_RECORDED_FAILURES:
+                self.failures.append({"issue_id": issue_id, "error": error})
+
+    def to_dict(self) -> dict:
+        processed = self.completed + self.skipped + self.failed
+        elapsed = 0.0
+        if self._started_monotonic is not None:
+            elapsed = (self._finished_monotonic or time.monotonic()) - self._started_monotonic
+
+        return {
+            "batch_id": self.id,
+            "status": self.status,
+            "filters": self.filters,
+            "concurrency": self.concurrency,
+            "progress": {
+                "matched": self.matched,
+                "processed": processed,
+                "completed": self.completed,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "in_flight": self.in_flight
+            },
+            "throughput_per_min": round(processed / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "elapsed_seconds": round(elapsed, 1),
+            "failures": self.failures,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+def _stored_priority(row: dict) -> float:
+    """The intake pre-score saved with the issue (utils.triage.pre_score)"""
+    triage = (row.get("metadata") or {}).get("triage") or {}
+    try:
+        return float(triage["priority"])
+    except (KeyError, TypeError, ValueError):
+        return BATCH_DEFAULT_PRIORITY
+
+
+async def iter_matching_issues(filters: dict, issue_ids: list = None, page_size: int = 200):
+    """
+    Yield (id, stored pre-score) of issues matching the filters, one page at a time
+
+    Uses keyset pagination on id so rows changing status mid-batch
+    (which reprocessing does) never shift the pages.
+    """
+    db = get_db()
+
+    if issue_ids:
+        for i in range(0, len(issue_ids), page_size):
+            chunk = issue_ids[i:i + page_size]
+            result = db.table("issues").select("id, metadata").in_("id", chunk).execute()
+            found = {row["id"]: _stored_priority(row) for row in result.data}
+            # Preserve the caller's ordering
+            for issue_id in chunk:
+                if issue_id in found:
+                    yield issue_id, found[issue_id]
+        return
+
+    last_id = None
+    while True:
+        query = db.table("issues").select("id, metadata")
+
+        if filters.get("status"):
+            query = query.eq("status", filters["status"])
+        if filters.get("category"):
+            query = query.eq("category", filters["category"])
+        if filters.get("created_after"):
+            query = query.gte("created_at", filters["created_after"])
+        if filters.get("created_before"):
+            query = query.lt("created_at", filters["created_before"])
+        if last_id:
+            query = query.gt("id", last_id)
+
+        result = query.order("id").limit(page_size).execute()
+        rows = result.data
+
+        for row in rows:
+            yield row["id"], _stored_priority(row)
+
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+async def _process_one(batch: BatchJob, issue_id: str, priority: float, semaphore: asyncio.Semaphore):
+    try:
+        job = await get_pipeline().submit(issue_id, priority)
+        await job.wait()
+        batch.record_result(issue_id, job.status, job.error)
+    except Exception as e:
+        batch.record_result(issue_id, "failed", str(e))
+    finally:
+        batch.in_flight -= 1
+        semaphore.release()
+
+
+async def run_batch(batch: BatchJob):
+    """Stream matching issues through the pipeline, at most batch.concurrency at a time"""
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(batch.concurrency)
+    running = set()
+
+    batch.status = "running"
+    batch.started_at = datetime.utcnow().isoformat()
+    batch._started_monotonic = time.monotonic()
+    print(f"📦 Starting batch {batch.id} (concurrency={batch.concurrency})")
+
+    try:
+        async for issue_id, priority in iter_matching_issues(batch.filters, batch.issue_ids, settings.batch_page_size):
+            await semaphore.acquire()
+            batch.matched += 1
+            batch.in_flight += 1
+            task = asyncio.create_task(_process_one(batch, issue_id, priority, semaphore))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        if running:
+            await asyncio.gather(*running)
+        batch.status = "completed"
+
+    except asyncio.CancelledError:
+        for task in running:
+            task.cancel()
+        batch.status = "cancelled"
+
+    except Exception as e:
+        print(f"❌ Batch {batch.id} failed: {e}")
+        batch.status = "failed"
+        batch.error = str(e)
+
+    finally:
+        batch.finished_at = datetime.utcnow().isoformat()
+        batch._finished_monotonic = time.monotonic()
+        print(f"📦 Batch {batch.id} {batch.status}: {batch.completed} completed, {batch.skipped} skipped, {batch.failed} failed")
+
+
+def start_batch(filters: dict, issue_ids: list = None, concurrency: int = None) -> BatchJob:
+    """Create a batch job and start it in the background"""
+    settings = get_settings()
+    batch = BatchJob(
+        filters=filters,
+        issue_ids=issue_ids,
+        concurrency=concurrency or settings.batch_default_concurrency
+    )
+
+    # Forget the oldest finished batches once we are tracking too many
+    if len(_batches) >= MAX_TRACKED_BATCHES:
+        for batch_id in [b.id for b in _batches.values() if b.finished_at]:
+            del _batches[batch_id]
+            if len(_batches) < MAX_TRACKED_BATCHES:
+                break
+
+    _batches[batch.id] = batch
+    batch.task = asyncio.create_task(run_batch(batch))
+    return batch
+
+
+def get_batch(batch_id: str) -> BatchJob:
+    """Look up a tracked batch job"""
+    return _batches.get(batch_id)
+
+
+def list_batches() -> list:
+    """All tracked batch jobs, newest first"""
+    return sorted(_batches.values(), key=lambda b: b.created_at, reverse=True)
+
+
+def cancel_batch(batch_id: str) -> BatchJob:
+    """Cancel a running batch; issues already in the pipeline still finish there"""
+    batch = _batches.get(batch_id)
+    if batch and batch.task and not batch.task.done():
+        batch.task.cancel()
+    return batch
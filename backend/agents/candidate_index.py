@@ -0,0 +1,291 @@
+"""
+Precomputed volunteer shortlists per skill and geocell
+
+Ranking a task against the whole roster repeats the same work on every
+matching run, although only volunteers with the task's skills near its
+location can score well. This module:
+1. Buckets volunteers by (normalized skill, geocell), where a geocell is a
+   slippy-map tile at a fixed zoom; every volunteer is also in an ANY_SKILL
+   bucket, and volunteers without a location use a per-skill "no cell" bucket
+2. Keeps the top-K of each bucket by the skill-independent part of the
+   matching score (proximity to the cell centre and reliability)
+3. Re-buckets only the volunteers whose updated_at moved since the last sync
+   (see migrations/006_volunteer_updated_at.sql) and rebuilds periodically
+4. Merges the lists for a task's skills in the cells around its location
+   into a shortlist that matching fully scores instead of the whole roster
+"""
+
+from agents.matching_agent import score_volunteer_for_task
+from config import get_settings
+from utils.geo_grid import lat_lng_to_tile, tile_bounds
+from utils.supabase_client import get_db
+from functools import lru_cache
+import asyncio
+import heapq
+import math
+import time
+
+
+# Bucket every volunteer belongs to in their cell, whatever their skills
+ANY_SKILL = "*"
+
+# Scored against no required skills, volunteers differ only in proximity and reliability
+NO_SKILL_TASK = {"skills_required": []}
+
+
+def normalize_skill(skill) -> str:
+    """Lowercase a skill and collapse whitespace (matching compares lowercased skills)"""
+    return " ".join(str(skill).lower().split())
+
+
+def location_cell(location, zoom: int):
+    """Tile (x, y) containing a location, or None without usable coordinates"""
+    try:
+        lat = float(location["lat"])
+        lng = float(location["lng"])
+    except (TypeError, KeyError, ValueError):
+        return None
+    if math.isnan(lat) or math.isnan(lng):
+        return None
+    return lat_lng_to_tile(lat, lng, zoom)
+
+
+def cell_center(cell: tuple, zoom: int) -> dict:
+    bounds = tile_bounds(cell[0], cell[1], zoom)
+    return {
+        "lat": (bounds["min_lat"] + bounds["max_lat"]) / 2,
+        "lng": (bounds["min_lng"] + bounds["max_lng"]) / 2
+    }
+
+
+def neighbour_cells(cell: tuple, zoom: int, rings: int) -> list:
+    """The cell and `rings` cells around it (wrapping across the antimeridian)"""
+    n = 1 << zoom
+    return [
+        ((cell[0] + dx) % n, cell[1] + dy)
+        for dy in range(-rings, rings + 1) for dx in range(-rings, rings + 1)
+        if 0 <= cell[1] + dy < n
+    ]
+
+
+class CandidateIndex:
+    """Top-K volunteer ids per (skill, cell) bucket, maintained incrementally"""
+
+    def __init__(self, top_k: int = 50, zoom: int = 11, rings: int = 1):
+        self.top_k = top_k
+        self.zoom = zoom
+        self.rings = rings
+        self.members = {}
+        self.top = {}
+        self.keys_by_volunteer = {}
+        self.built_at = None
+        self.synced_at = None
+        self.cursor = None
+        self.rebuilds = 0
+        self.syncs = 0
+        self.volunteers_synced = 0
+        self._lock = asyncio.Lock()
+
+    def _bucket_entry(self, volunteer: dict) -> tuple:
+        """(bucket keys, prior score) for a volunteer"""
+        cell = location_cell(volunteer.get("location"), self.zoom)
+        center = cell_center(cell, self.zoom) if cell else None
+        prior = score_volunteer_for_task(volunteer, NO_SKILL_TASK, center)["total_score"]
+        skills = set(normalize_skill(s) for s in volunteer.get("skills") or [] if s)
+        skills.add(ANY_SKILL)
+        return [(skill, cell) for skill in skills], prior
+
+    def _add(self, volunteer: dict) -> list:
+        keys, prior = self._bucket_entry(volunteer)
+        for key in keys:
+            self.members.setdefault(key, {})[volunteer["id"]] = prior
+        self.keys_by_volunteer[volunteer["id"]] = keys
+        return keys
+
+    def _discard(self, volunteer_id: str) -> list:
+        keys = self.keys_by_volunteer.pop(volunteer_id, [])
+        for key in keys:
+            bucket = self.members.get(key)
+            if bucket is not None:
+                bucket.pop(volunteer_id, None)
+                if not bucket:
+                    del self.members[key]
+        return keys
+
+    def _refresh(self, keys):
+        for key in keys:
+            bucket = self.members.get(key)
+            if bucket:
+                self.top[key] = [v_id for v_id, _ in heapq.nlargest(self.top_k, bucket.items(), key=lambda e: e[1])]
+            else:
+                self.top.pop(key, None)
+
+    def upsert(self, volunteer: dict):
+        """Add a volunteer or re-bucket one whose skills, location or reliability changed"""
+        touched = set(self._discard(volunteer["id"]))
+        touched.update(self._add(volunteer))
+        self._refresh(touched)
+
+    def remove(self, volunteer_id: str):
+        self._refresh(self._discard(volunteer_id))
+
+    def shortlist(self, skills, location) -> list:
+        """
+        Merged top-K volunteer ids for a task's skills around a location
+
+        Returns None when the index is empty or the location has no
+        coordinates, so the caller scores the whole roster instead.
+        """
+        cell = location_cell(location, self.zoom)
+        if cell is None or not self.built_at:
+            return None
+        cells = neighbour_cells(cell, self.zoom, self.rings) + [None]
+        wanted = [normalize_skill(s) for s in skills or [] if s] + [ANY_SKILL]
+        ids = {}
+        for skill in wanted:
+            for c in cells:
+                for v_id in self.top.get((skill, c), ()):
+                    ids[v_id] = True
+        return list(ids)
+
+    def _latest(self, rows: list):
+        stamps = [r["updated_at"] for r in rows if r.get("updated_at")]
+        if stamps:
+            latest = max(str(s) for s in stamps)
+            if self.cursor is None or latest > self.cursor:
+                self.cursor = latest
+
+    def _stream(self, page_size: int, since: str = None):
+        db = get_db()
+        last_id = None
+        while True:
+            query = db.table("volunteers").select("*")
+            if since:
+                query = query.gte("updated_at", since)
+            if last_id:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(page_size).execute().data
+            yield rows
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1]["id"]
+
+    def rebuild(self, page_size: int = 1000):
+        """Re-bucket the whole roster (drops deleted volunteers)"""
+        fresh = CandidateIndex(self.top_k, self.zoom, self.rings)
+        for rows in self._stream(page_size):
+            for row in rows:
+                fresh._add(row)
+            fresh._latest(rows)
+        fresh._refresh(list(fresh.members))
+
+        self.members = fresh.members
+        self.top = fresh.top
+        self.keys_by_volunteer = fresh.keys_by_volunteer
+        self.cursor = fresh.cursor
+        self.built_at = self.synced_at = time.time()
+        self.rebuilds += 1
+        print(f"🗂️ Candidate index built: {len(self.keys_by_volunteer)} volunteers in {len(self.top)} skill/cell lists")
+
+    def sync(self, page_size: int = 1000) -> int:
+        """
+        Re-bucket volunteers changed since the last build or sync
+
+        Rows are re-read from the newest updated_at seen (inclusive), so a
+        change stamped in the same instant is not missed; a change committed
+        late with an older timestamp waits for the next full rebuild.
+        """
+        changed = 0
+        for rows in self._stream(page_size, since=self.cursor):
+            for row in rows:
+                self.upsert(row)
+            changed += len(rows)
+            self._latest(rows)
+        self.synced_at = time.time()
+        self.syncs += 1
+        self.volunteers_synced += changed
+        return changed
+
+    async def ensure_fresh(self, rebuild_seconds: int, sync_seconds: int):
+        """
+        Build on first use, rebuild every rebuild_seconds, and sync changes every sync_seconds
+
+        The roster reads and bucketing run in a worker thread so other
+        requests keep being served; shortlists read meanwhile see the
+        previous lists (rebuild swaps them in whole, sync replaces each
+        changed list in one assignment).
+        """
+        async with self._lock:
+            now = time.time()
+            if not self.built_at or now - self.built_at >= rebuild_seconds:
+                await asyncio.to_thread(self.rebuild)
+            elif now - self.synced_at >= sync_seconds:
+                if self.cursor is None:
+                    # No updated_at column yet (migration 006 not applied); rebuild only
+                    self.synced_at = now
+                    return
+                try:
+                    await asyncio.to_thread(self.sync)
+                except Exception as e:
+                    self.synced_at = now
+                    print(f"⚠️ Candidate index sync failed, waiting for the next rebuild: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "volunteers": len(self.keys_by_volunteer),
+            "lists": len(self.top),
+            "top_k": self.top_k,
+            "zoom": self.zoom,
+            "rebuilds": self.rebuilds,
+            "syncs": self.syncs,
+            "volunteers_synced": self.volunteers_synced,
+            "built_at": self.built_at,
+            "synced_at": self.synced_at
+        }
+
+
+def shortlist_tasks(index: CandidateIndex, tasks: list, issue_location, volunteers: list,
+                    min_per_person: int) -> dict:
+    """
+    Shortlisted volunteer rows per task, drawn from `volunteers`
+
+    Tasks whose shortlist has fewer than min_per_person candidates per
+    required person are left out, so matching scores the full list for them.
+    """
+    by_id = {v["id"]: v for v in volunteers}
+    shortlists = {}
+    for task in tasks:
+        ids = index.shortlist(task.get("skills_required"), issue_location)
+        if ids is None:
+            continue
+        rows = [by_id[v_id] for v_id in ids if v_id in by_id]
+        if len(rows) >= min_per_person * (task.get("required_people") or 1):
+            shortlists[task["id"]] = rows
+    return shortlists
+
+
+def shortlisted_volunteer_ids(index: CandidateIndex, tasks: list, issue_location, min_per_person: int) -> list:
+    """
+    Union of the tasks' shortlisted volunteer ids, so matching can read just those rows
+
+    Returns None if any task has no shortlist or fewer than min_per_person
+    ids per required person; that task needs the whole roster anyway.
+    """
+    ids = {}
+    for task in tasks:
+        task_ids = index.shortlist(task.get("skills_required"), issue_location)
+        if task_ids is None or len(task_ids) < min_per_person * (task.get("required_people") or 1):
+            return None
+        ids.update(dict.fromkeys(task_ids))
+    return list(ids)
+
+
+@lru_cache()
+def get_candidate_index() -> CandidateIndex:
+    """Get the process-wide matching candidate index"""
+    settings = get_settings()
+    return CandidateIndex(
+        top_k=settings.candidate_index_top_k,
+        zoom=settings.candidate_index_zoom,
+        rings=settings.candidate_index_rings
+    )
@@ -11,6 +11,10 @@ This agent:
 
 from utils.gemini_client import call_gemini
 from utils.supabase_client import get_db
+from utils.agent_log_stats import record_agent_log
+from utils.geo_grid import record_issue_location
+from utils.image_pipeline import get_image_pipeline
+from config import get_settings
 from datetime import datetime
 import uuid
 
@@ -50,6 +54,10 @@ Analyze this issue and return a JSON response with the following structure:
 Return ONLY valid JSON, no additional text or markdown.
 """
 
+PHOTOS_NOTE = """
+**Photos:** {count} photo(s) of the issue are attached. Use them to judge severity, scope and validity.
+"""
+
 
 async def analyze_issue(issue_id: str) -> dict:
     """
@@ -84,10 +92,18 @@ async def analyze_issue(issue_id: str) -> dict:
         # Log agent input
         execution_start = datetime.utcnow()
         
+        # Downsampled, EXIF-stripped, deduplicated photos (bounded count and size)
+        images = {"images": [], "skipped": []}
+        if issue.get("images") and get_settings().discovery_images_enabled:
+            images = await get_image_pipeline().prepare(issue["images"])
+            if images["images"]:
+                prompt += PHOTOS_NOTE.format(count=len(images["images"]))
+        
         # Call Gemini
         analysis = await call_gemini(
             prompt=prompt,
-            system_instruction="You are an expert community organizer and issue analyst."
+            system_instruction="You are an expert community organizer and issue analyst.",
+            images=[image.data for image in images["images"]]
         )
         
         execution_time = int((datetime.utcnow() - execution_start).total_seconds() * 1000)
@@ -112,19 +128,26 @@ async def analyze_issue(issue_id: str) -> dict:
             "priority": analysis.get("priority", 0.5),
             "status": "planning" if analysis.get("is_valid", True) else "pending",
             "metadata": {
+                **(issue.get("metadata") or {}),
                 "discovery_analysis": analysis,
                 "analyzed_at": datetime.utcnow().isoformat()
             }
         }
         
         db.table("issues").update(update_data).eq("id", issue_id).execute()
+        record_issue_location({**issue, **update_data})
         
         # Log successful execution
         await log_agent_execution(
             session_id=session_id,
             issue_id=issue_id,
             action="analyze_issue",
-            input_data={"title": issue["title"], "description": issue["description"]},
+            input_data={
+                "title": issue["title"],
+                "description": issue["description"],
+                "images": [image.to_dict() for image in images["images"]],
+                "images_skipped": images["skipped"]
+            },
             output_data=analysis,
             success=True,
             confidence_score=analysis.get("confidence", 0.0),
@@ -191,5 +214,6 @@ async def log_agent_execution(
     
     try:
         db.table("agent_logs").insert(log_entry).execute()
+        record_agent_log(log_entry)
     except Exception as e:
         print(f"Failed to log agent execution: {e}")
@@ -3,18 +3,51 @@ Matching Agent - Assigns volunteers to tasks based on intelligent matching
 
 This agent:
 1. Analyzes task requirements (skills, people needed, location)
-2. Finds available volunteers with matching skills
+2. Finds available volunteers with matching skills who are free in each
+   task's scheduled window
 3. Scores candidates based on skill match, location proximity, and reliability
 4. Assigns optimal volunteers to each task
 5. Creates task assignments in the database
 """
 
 from utils.supabase_client import get_db
-from datetime import datetime
+from utils.agent_log_stats import record_agent_log
+from utils.workload import get_workload_counts, get_active_windows, overlapping_count, scheduled_window
+from agents.scheduler import schedule_tasks, windows_overlap
+from utils.single_flight import SingleFlight
+from utils.availability import get_availability_index, local_now
+from utils.log_retention import parse_timestamp
+from config import get_settings
+from datetime import datetime, timedelta
+import time
 import uuid
 import math
 
 
+# Volunteers with this many active assignments overlapping a task's window are busy for it
+MAX_CONCURRENT_TASKS = 10
+
+# Assignment statuses that no longer count towards a task's staffing
+DROPPED_ASSIGNMENT_STATUSES = {"withdrawn", "declined", "dropped", "no_show", "cancelled"}
+
+# Task/plan statuses staffing writes leave alone: the work is already under way
+STARTED_STATUSES = {"in_progress", "completed"}
+
+# Ranked candidate lists kept per task for incremental re-matching
+CANDIDATE_LIST_LENGTH = 50
+CANDIDATE_CACHE_SIZE = 1000
+CANDIDATE_CACHE_TTL_SECONDS = 3600
+
+# Shortlisted volunteer ids read per request on a cache miss
+VOLUNTEER_ID_CHUNK_SIZE = 200
+
+_candidate_cache = {}
+
+# Concurrent matching runs for the same plan (or re-matches for the same task)
+# share one execution instead of racing to insert duplicate assignments
+matching_flights = SingleFlight("matching")
+
+
 def calculate_distance(lat1, lng1, lat2, lng2):
     """
     Calculate distance between two points using Haversine formula
@@ -102,16 +135,323 @@ def score_volunteer_for_task(volunteer, task, issue_location):
     }
 
 
+def rank_volunteers_for_task(task, volunteers, issue_location):
+    """
+    Score every volunteer for a task and return them best-first
+    Each entry is {'volunteer': ..., 'scores': ...}
+    """
+    scored_volunteers = []
+    for volunteer in volunteers:
+        score_data = score_volunteer_for_task(volunteer, task, issue_location)
+        scored_volunteers.append({
+            'volunteer': volunteer,
+            'scores': score_data
+        })
+    
+    # Sort by total score (descending)
+    scored_volunteers.sort(key=lambda x: x['scores']['total_score'], reverse=True)
+    return scored_volunteers
+
+
+def cache_ranked_candidates(task_id, ranked):
+    """Keep the head of a task's ranked candidate list for later re-matching"""
+    if len(_candidate_cache) >= CANDIDATE_CACHE_SIZE and task_id not in _candidate_cache:
+        # Evict the oldest entry (dicts preserve insertion order)
+        _candidate_cache.pop(next(iter(_candidate_cache)))
+    _candidate_cache[task_id] = {
+        'ranked': ranked[:CANDIDATE_LIST_LENGTH],
+        'cached_at': time.monotonic()
+    }
+
+
+def get_cached_candidates(task_id):
+    """Return a task's cached ranked candidates, or None if missing or stale"""
+    entry = _candidate_cache.get(task_id)
+    if not entry:
+        return None
+    if time.monotonic() - entry['cached_at'] > CANDIDATE_CACHE_TTL_SECONDS:
+        _candidate_cache.pop(task_id, None)
+        return None
+    return entry['ranked']
+
+
+def build_assignment(task, volunteer, scores, note_prefix="Auto-assigned by matching agent"):
+    """Create a task_assignments row (notes field stores matching metadata as a string)"""
+    distance_display = f"{scores['distance_km']:.1f}km" if scores['distance_km'] is not None else "N/A"
+    return {
+        "id": str(uuid.uuid4()),
+        "task_id": task['id'],
+        "volunteer_id": volunteer['id'],
+        "status": "assigned",
+        "assigned_at": datetime.utcnow().isoformat(),
+        "notes": f"{note_prefix}. Skill match: {scores['skill_score']:.2f}, Location: {distance_display}, Reliability: {scores['reliability_score']:.2f}"
+    }
+
+
+def filter_available_volunteers(all_volunteers, assignment_counts):
+    """
+    Drop volunteers at the MAX_CONCURRENT_TASKS cap
+    
+    Returns (available_volunteers, busy_volunteer_ids). If everyone is busy,
+    falls back to all volunteers ordered least-busy first. Capped volunteers
+    can still take tasks outside their busy windows (see under_cap_in_window).
+    """
+    # Filter strictly busy volunteers (more than MAX_CONCURRENT_TASKS active tasks)
+    busy_volunteer_ids = set(v_id for v_id, count in assignment_counts.items() if count >= MAX_CONCURRENT_TASKS)
+    
+    # Filter to available volunteers (less than MAX_CONCURRENT_TASKS assignments)
+    available_volunteers = [v for v in all_volunteers if v['id'] not in busy_volunteer_ids]
+    
+    # Fallback: If no volunteers are "available" (all hit the limit), pick the least busy ones
+    if not available_volunteers:
+        print("⚠️ All volunteers are busy! Falling back to least busy volunteers.")
+        # Volunteers with 0 assignments won't be in assignment_counts, so get(v_id, 0) handles them
+        available_volunteers = sorted(all_volunteers, key=lambda v: assignment_counts.get(v['id'], 0))
+    
+    return available_volunteers, busy_volunteer_ids
+
+
+def task_window_bounds(plan_start, window):
+    """Wall-clock (start, end) of a scheduled task window"""
+    return (
+        plan_start + timedelta(hours=window['start_hour']),
+        plan_start + timedelta(hours=window['end_hour'])
+    )
+
+
+def filter_free_volunteers(volunteers, availability, plan_start, window):
+    """
+    Keep volunteers whose availability covers a task's whole window
+    
+    Returns (candidates, free_count). If nobody is free, falls back to all
+    volunteers so the task is still staffed.
+    """
+    free = availability.filter_free(volunteers, *task_window_bounds(plan_start, window))
+    if not free:
+        return volunteers, 0
+    return free, len(free)
+
+
+def resolve_plan_start(plan, tasks, schedule, volunteers, availability):
+    """
+    Wall-clock start of a plan's schedule (local time)
+    
+    Uses metadata.scheduled_start if an organizer set one, then the start
+    chosen by an earlier matching run, and otherwise the upcoming start
+    at which the most required people are free.
+    """
+    metadata = plan.get('metadata') or {}
+    for value in (metadata.get('scheduled_start'), (metadata.get('schedule') or {}).get('start_at')):
+        if value:
+            try:
+                return parse_timestamp(value)
+            except (TypeError, ValueError):
+                print(f"⚠️ Ignoring invalid plan start {value!r}")
+    
+    settings = get_settings()
+    task_windows = [
+        (schedule['tasks'][t['id']]['start_hour'], schedule['tasks'][t['id']]['end_hour'], t.get('required_people', 1))
+        for t in tasks
+    ]
+    return availability.suggest_start(
+        volunteers,
+        task_windows,
+        local_now(),
+        earliest_hour=settings.plan_start_earliest_hour,
+        latest_hour=settings.plan_start_latest_hour,
+        horizon_days=settings.plan_start_horizon_days
+    )
+
+
+def _pick_for_window(scored_volunteers, deficit, already_assigned_ids, window, volunteer_windows):
+    """Best candidates up to the deficit, skipping anyone already on the task or busy in this window"""
+    picks = []
+    for candidate in scored_volunteers:
+        if len(picks) >= deficit:
+            break
+        volunteer_id = candidate['volunteer']['id']
+        if volunteer_id in already_assigned_ids:
+            continue
+        if any(windows_overlap(window, w) for w in volunteer_windows.get(volunteer_id, [])):
+            continue
+        picks.append(candidate)
+    return picks
+
+
+def capped_volunteers(all_volunteers, available_volunteers, busy_volunteer_ids):
+    """Volunteers left out by filter_available_volunteers for being at the cap"""
+    if not busy_volunteer_ids:
+        return []
+    available_ids = set(v['id'] for v in available_volunteers)
+    return [v for v in all_volunteers if v['id'] in busy_volunteer_ids and v['id'] not in available_ids]
+
+
+def under_cap_in_window(capped, busy_windows, start, end):
+    """Capped volunteers with fewer than MAX_CONCURRENT_TASKS active assignments overlapping [start, end)"""
+    return [
+        v for v in capped
+        if v['id'] in busy_windows and overlapping_count(busy_windows[v['id']], start, end) < MAX_CONCURRENT_TASKS
+    ]
+
+
+def staffed_task_update(task):
+    """Columns marking a fully staffed task ready to be accepted ({} once work has started)"""
+    if task.get('status') in STARTED_STATUSES:
+        return {}
+    return {"status": "pending"}
+
+
+def plan_staffing_update(plan, volunteer_ids):
+    """A plan's assigned volunteer count, and its status until work starts"""
+    update = {"assigned_volunteers": len(volunteer_ids)}
+    if plan.get('status') not in STARTED_STATUSES:
+        update["status"] = "active" if volunteer_ids else "draft"
+    return update
+
+
+def plan_task_assignments(tasks, volunteers, issue_location, existing_by_task=None, schedule=None,
+                          availability=None, plan_start=None, shortlists=None, capped=None, busy_windows=None):
+    """
+    Decide which volunteers to assign to each task (no database access)
+    
+    Tasks are staffed in prerequisite order. A volunteer may take several
+    tasks in the same plan as long as their scheduled windows never overlap.
+    
+    Args:
+        tasks: Task rows for one action plan
+        volunteers: Candidate volunteer rows (already filtered for workload)
+        issue_location: {lat, lng} of the issue
+        existing_by_task: task_id -> existing assignment rows for that task
+        schedule: Output of schedule_tasks(tasks); computed if omitted
+        availability: AvailabilityIndex; with plan_start, candidates not free
+            for a task's whole window are dropped before scoring
+        plan_start: Local datetime the schedule's hour 0 maps to
+        shortlists: task_id -> candidate rows to score instead of
+            `volunteers`; a task whose shortlist can't cover its deficit
+            (with free volunteers, when availability applies) falls back
+            to scoring every volunteer
+        capped: Volunteers at the MAX_CONCURRENT_TASKS cap; with plan_start,
+            each task also considers those whose active assignments
+            overlapping its window stay under the cap
+        busy_windows: volunteer_id -> get_active_windows() entries for `capped`
+        
+    Returns:
+        One dict per task with the task, its time window, current staffing,
+        deficit, new assignment rows and the head of its ranked candidate list
+    """
+    existing_by_task = existing_by_task or {}
+    shortlists = shortlists or {}
+    schedule = schedule or schedule_tasks(tasks)
+    windows = schedule['tasks']
+    tasks_by_id = {t['id']: t for t in tasks}
+    
+    # Time windows each volunteer already holds in this plan
+    volunteer_windows = {}
+    for task_id, rows in existing_by_task.items():
+        if task_id not in windows:
+            continue
+        for a in rows:
+            if a['status'] not in DROPPED_ASSIGNMENT_STATUSES:
+                volunteer_windows.setdefault(a['volunteer_id'], []).append(windows[task_id])
+    
+    results = []
+    for task_id in schedule['order']:
+        task = tasks_by_id[task_id]
+        window = windows[task_id]
+        required_people = task.get('required_people', 1)
+        
+        # Volunteers already on this task (including drop-outs) are never re-picked
+        existing = existing_by_task.get(task_id, [])
+        already_assigned_ids = set(a['volunteer_id'] for a in existing)
+        staffed = sum(1 for a in existing if a['status'] not in DROPPED_ASSIGNMENT_STATUSES)
+        deficit = max(0, required_people - staffed)
+        
+        # The cap only counts assignments that overlap this task in time
+        relieved = []
+        if capped and plan_start is not None and deficit > 0:
+            relieved = under_cap_in_window(capped, busy_windows or {}, *task_window_bounds(plan_start, window))
+        
+        # Score the task's shortlist first, then everyone if it comes up short
+        shortlist = shortlists.get(task_id)
+        pools = [volunteers] if shortlist is None else [shortlist, volunteers]
+        for pool_index, pool in enumerate(pools):
+            pool = pool + relieved if relieved else pool
+            # Only score volunteers free for the whole task window
+            candidates, free_count = pool, None
+            if availability is not None and plan_start is not None and deficit > 0:
+                candidates, free_count = filter_free_volunteers(pool, availability, plan_start, window)
+            
+            scored_volunteers = rank_volunteers_for_task(task, candidates, issue_location)
+            picks = _pick_for_window(scored_volunteers, deficit, already_assigned_ids, window, volunteer_windows)
+            if len(picks) >= deficit and free_count != 0:
+                break
+        
+        task_assignments = []
+        for candidate in picks:
+            task_assignments.append(build_assignment(task, candidate['volunteer'], candidate['scores']))
+            volunteer_windows.setdefault(candidate['volunteer']['id'], []).append(window)
+        
+        results.append({
+            'task': task,
+            'window': window,
+            'staffed': staffed,
+            'deficit': deficit,
+            'assignments': task_assignments,
+            'ranked': scored_volunteers[:CANDIDATE_LIST_LENGTH],
+            'free_in_window': free_count,
+            'shortlisted': None if shortlist is None else len(shortlist),
+            'full_scan': pool_index == len(pools) - 1,
+            'relieved_from_cap': len(relieved)
+        })
+    
+    return results
+
+
+def _read_volunteers(db, volunteer_ids=None):
+    """Volunteer rows for the given ids (chunked), or the whole roster"""
+    if volunteer_ids is None:
+        return db.table("volunteers").select("*").execute().data
+    volunteers = []
+    for i in range(0, len(volunteer_ids), VOLUNTEER_ID_CHUNK_SIZE):
+        volunteers.extend(
+            db.table("volunteers").select("*").in_("id", volunteer_ids[i:i + VOLUNTEER_ID_CHUNK_SIZE]).execute().data
+        )
+    return volunteers
+
+
+def _plan_candidates(all_volunteers, available_volunteers, busy_volunteer_ids, plan_start, index, tasks, issue_location):
+    """(capped volunteers, their active windows, per-task shortlists) for plan matching"""
+    # Volunteers at the cap may still take tasks that don't overlap their active ones
+    capped, busy_windows = [], {}
+    if plan_start is not None:
+        capped = capped_volunteers(all_volunteers, available_volunteers, busy_volunteer_ids)
+        busy_windows = get_active_windows([v['id'] for v in capped])
+    
+    # Start each task from the precomputed top-K lists for its skills around the issue
+    shortlists = None
+    if index is not None:
+        from agents.candidate_index import shortlist_tasks
+        shortlists = shortlist_tasks(index, tasks, issue_location, available_volunteers,
+                                     get_settings().candidate_index_min_per_person)
+    return capped, busy_windows, shortlists
+
+
 async def match_volunteers_to_tasks(action_plan_id: str) -> dict:
     """
     Match volunteers to all tasks in an action plan
     
+    Concurrent calls for the same plan share one run.
+    
     Args:
         action_plan_id: The UUID of the action plan
         
     Returns:
         Dictionary containing assignment results
     """
+    return await matching_flights.do(("plan", action_plan_id), _match_plan_volunteers, action_plan_id)
+
+
+async def _match_plan_volunteers(action_plan_id: str) -> dict:
     db = get_db()
     session_id = str(uuid.uuid4())
     start_time = datetime.utcnow()
@@ -134,44 +474,54 @@ async def match_volunteers_to_tasks(action_plan_id: str) -> dict:
         if not tasks:
             return {"message": "No tasks found for this action plan"}
         
-        # Get all volunteers
-        volunteers_result = db.table("volunteers").select("*").execute()
-        all_volunteers = volunteers_result.data
+        settings = get_settings()
+        
+        # Precomputed top-K lists per skill and map cell around the issue
+        index = None
+        if settings.candidate_index_enabled:
+            from agents.candidate_index import get_candidate_index
+            index = get_candidate_index()
+            await index.ensure_fresh(settings.candidate_index_rebuild_seconds, settings.candidate_index_sync_seconds)
+        
+        # Read only the shortlisted volunteers when every task has a usable shortlist
+        # (the process pool shards the whole roster, so it always reads everyone)
+        shortlist_ids = None
+        if index is not None and not settings.matching_process_pool_enabled:
+            from agents.candidate_index import shortlisted_volunteer_ids
+            shortlist_ids = shortlisted_volunteer_ids(index, tasks, issue_location, settings.candidate_index_min_per_person)
+        all_volunteers = _read_volunteers(db, shortlist_ids) if shortlist_ids else None
+        if not all_volunteers:
+            shortlist_ids = None
+            all_volunteers = _read_volunteers(db)
         
         if not all_volunteers:
             return {"error": "No volunteers available in the database"}
         
-        # Get volunteers who are already assigned to active (non-completed) tasks
-        active_assignments = db.table("task_assignments").select("volunteer_id").in_("status", ["assigned", "in_progress"]).execute()
+        # Get existing assignments for this plan's tasks so re-runs only fill gaps
+        task_ids = [t['id'] for t in tasks]
+        existing_assignments = db.table("task_assignments").select("task_id, volunteer_id, status").in_("task_id", task_ids).execute()
+        existing_by_task = {}
+        for a in existing_assignments.data:
+            existing_by_task.setdefault(a['task_id'], []).append(a)
         
-        # Count assignments per volunteer
-        assignment_counts = {}
-        for a in active_assignments.data:
-            v_id = a['volunteer_id']
-            assignment_counts[v_id] = assignment_counts.get(v_id, 0) + 1
-            
-        # Filter strictly busy volunteers (more than MAX_CONCURRENT_TASKS active tasks)
-        MAX_CONCURRENT_TASKS = 10
-        busy_volunteer_ids = set(v_id for v_id, count in assignment_counts.items() if count >= MAX_CONCURRENT_TASKS)
+        # Active assignment counts per volunteer (materialized workload counters):
+        # the shortlisted volunteers' rows, or one read of every non-zero counter
+        assignment_counts = get_workload_counts(shortlist_ids)
         
-        # Filter to available volunteers (less than MAX_CONCURRENT_TASKS assignments)
-        available_volunteers = [v for v in all_volunteers if v['id'] not in busy_volunteer_ids]
+        available_volunteers, busy_volunteer_ids = filter_available_volunteers(all_volunteers, assignment_counts)
         
-        print(f"📊 Volunteers: {len(all_volunteers)} total, {len(busy_volunteer_ids)} busy, {len(available_volunteers)} available")
+        print(f"📊 Volunteers: {len(all_volunteers)} {'shortlisted' if shortlist_ids else 'total'}, {len(busy_volunteer_ids)} busy, {len(available_volunteers)} available")
         
-        # Fallback: If no volunteers are "available" (all hit the limit), pick the least busy ones
-        if not available_volunteers:
-            print("⚠️ All volunteers are busy! Falling back to least busy volunteers.")
-            # Sort all volunteers by their current assignment count (ascending)
-            # Volunteers with 0 assignments won't be in assignment_counts, so get(v_id, 0) handles them
-            available_volunteers = sorted(all_volunteers, key=lambda v: assignment_counts.get(v['id'], 0))
-            
-            # If we really just want to proceed, we use everyone, but prioritized by least busy
-            # The sorting above achieves that.
-            
-            # Log this fallback event (optional but good for debugging)
-            # We don't return error anymore, we proceed with these "busy" volunteers
-
+        # Order tasks by prerequisites and give each a time window
+        schedule = schedule_tasks(tasks)
+        if schedule['cycle']:
+            print(f"⚠️ Task prerequisites form a cycle ({' -> '.join(schedule['cycle'])}); scheduling tasks in parallel")
+        
+        # Anchor the schedule in local time so availability can be checked
+        availability, plan_start = None, None
+        if settings.matching_availability_enabled:
+            availability = get_availability_index()
+            plan_start = resolve_plan_start(plan, tasks, schedule, available_volunteers, availability)
         
         assignments = []
         assignment_summary = {
@@ -179,45 +529,69 @@ async def match_volunteers_to_tasks(action_plan_id: str) -> dict:
             'tasks_fully_assigned': 0,
             'tasks_partially_assigned': 0,
             'total_assignments_made': 0,
-            'unassigned_tasks': []
+            'unassigned_tasks': [],
+            'makespan_hours': schedule['makespan_hours'],
+            'critical_path': schedule['critical_path_names'],
+            'plan_start': plan_start.isoformat() if plan_start else None,
+            'tasks_without_free_volunteers': []
         }
         
-        # For each task, find and assign best matching volunteers
-        for task in tasks:
+        # Decide assignments for every task, then write them
+        capped, busy_windows, shortlists = _plan_candidates(
+            all_volunteers, available_volunteers, busy_volunteer_ids, plan_start, index, tasks, issue_location
+        )
+        if settings.matching_process_pool_enabled:
+            # Score in a worker process against the issue's region shards
+            from agents.matching_pool import get_matching_pool
+            pooled = await get_matching_pool().plan_assignments(
+                all_volunteers, assignment_counts, tasks, issue_location, existing_by_task, schedule, plan_start,
+                shortlists, busy_windows
+            )
+            task_plans = pooled['task_plans']
+            assignment_summary['region'] = {k: pooled[k] for k in ("candidates", "available", "shards", "global")}
+        else:
+            task_plans = plan_task_assignments(tasks, available_volunteers, issue_location, existing_by_task, schedule,
+                                               availability, plan_start, shortlists, capped, busy_windows)
+            
+            if shortlist_ids and any(len(p['assignments']) < p['deficit'] for p in task_plans):
+                # Shortlists alone couldn't staff every task; decide again against the whole roster
+                all_volunteers = _read_volunteers(db)
+                assignment_counts = get_workload_counts()
+                available_volunteers, busy_volunteer_ids = filter_available_volunteers(all_volunteers, assignment_counts)
+                capped, busy_windows, shortlists = _plan_candidates(
+                    all_volunteers, available_volunteers, busy_volunteer_ids, plan_start, index, tasks, issue_location
+                )
+                task_plans = plan_task_assignments(tasks, available_volunteers, issue_location, existing_by_task,
+                                                   schedule, availability, plan_start, shortlists, capped, busy_windows)
+                shortlist_ids = None
+        
+        assignment_summary['roster_read'] = "shortlisted" if shortlist_ids else "full"
+        assignment_summary['capped_volunteers'] = len(capped)
+        assignment_summary['assignments_from_capped'] = sum(
+            1 for p in task_plans for a in p['assignments'] if a['volunteer_id'] in busy_windows
+        )
+        
+        if shortlists is not None:
+            assignment_summary['shortlist'] = {
+                'tasks_shortlisted': sum(1 for p in task_plans if p['shortlisted'] is not None),
+                'full_scan_fallbacks': sum(1 for p in task_plans if p['shortlisted'] is not None and p['full_scan'])
+            }
+        
+        for task_plan in task_plans:
+            task = task_plan['task']
             required_people = task.get('required_people', 1)
             task_name = task.get('name', 'Unnamed task')
+            staffed = task_plan['staffed']
+            deficit = task_plan['deficit']
+            task_assignments = task_plan['assignments']
+            cache_ranked_candidates(task['id'], task_plan['ranked'])
+            if task_plan['free_in_window'] == 0:
+                # Nobody's availability covers this window; staffed from everyone instead
+                assignment_summary['tasks_without_free_volunteers'].append(task_name)
             
-            # Score all volunteers for this task
-            scored_volunteers = []
-            for volunteer in available_volunteers:
-                score_data = score_volunteer_for_task(volunteer, task, issue_location)
-                scored_volunteers.append({
-                    'volunteer': volunteer,
-                    'scores': score_data
-                })
-            
-            # Sort by total score (descending)
-            scored_volunteers.sort(key=lambda x: x['scores']['total_score'], reverse=True)
-            
-            # Assign top N volunteers
-            task_assignments = []
-            for i in range(min(required_people, len(scored_volunteers))):
-                candidate = scored_volunteers[i]
-                volunteer = candidate['volunteer']
-                scores = candidate['scores']
-                
-                # Create assignment (notes field stores matching metadata as JSON string)
-                distance_display = f"{scores['distance_km']:.1f}km" if scores['distance_km'] is not None else "N/A"
-                assignment = {
-                    "id": str(uuid.uuid4()),
-                    "task_id": task['id'],
-                    "volunteer_id": volunteer['id'],
-                    "status": "assigned",
-                    "assigned_at": datetime.utcnow().isoformat(),
-                    "notes": f"Auto-assigned by matching agent. Skill match: {scores['skill_score']:.2f}, Location: {distance_display}, Reliability: {scores['reliability_score']:.2f}"
-                }
-                
-                task_assignments.append(assignment)
+            if deficit == 0:
+                assignment_summary['tasks_fully_assigned'] += 1
+                continue
             
             # Insert assignments for this task
             if task_assignments:
@@ -225,11 +599,11 @@ async def match_volunteers_to_tasks(action_plan_id: str) -> dict:
                 assignments.extend(task_assignments)
                 
                 # UPDATE TASK STATUS based on assignments
-                if len(task_assignments) >= required_people:
+                if len(task_assignments) >= deficit:
                     # Fully assigned - mark as ready to start
-                    db.table("tasks").update({
-                        "status": "pending"  # Ready to be accepted by volunteers
-                    }).eq("id", task['id']).execute()
+                    task_update = staffed_task_update(task)
+                    if task_update:
+                        db.table("tasks").update(task_update).eq("id", task['id']).execute()
                     assignment_summary['tasks_fully_assigned'] += 1
                 else:
                     # Partially assigned - still need more volunteers
@@ -237,7 +611,7 @@ async def match_volunteers_to_tasks(action_plan_id: str) -> dict:
                     assignment_summary['unassigned_tasks'].append({
                         'task_name': task_name,
                         'required': required_people,
-                        'assigned': len(task_assignments)
+                        'assigned': staffed + len(task_assignments)
                     })
                 
                 assignment_summary['total_assignments_made'] += len(task_assignments)
@@ -245,14 +619,37 @@ async def match_volunteers_to_tasks(action_plan_id: str) -> dict:
                 assignment_summary['unassigned_tasks'].append({
                     'task_name': task_name,
                     'required': required_people,
-                    'assigned': 0
+                    'assigned': staffed
                 })
         
-        # Update action plan with assigned volunteer count
-        total_assigned_volunteers = len(set(a['volunteer_id'] for a in assignments))
+        # Update action plan with assigned volunteer count (existing staff plus new assignments)
+        plan_volunteer_ids = set(
+            a['volunteer_id'] for a in existing_assignments.data
+            if a['status'] not in DROPPED_ASSIGNMENT_STATUSES
+        )
+        plan_volunteer_ids.update(a['volunteer_id'] for a in assignments)
+        
+        # Volunteers covering more than one (non-overlapping) task in this run
+        new_task_counts = {}
+        for a in assignments:
+            new_task_counts[a['volunteer_id']] = new_task_counts.get(a['volunteer_id'], 0) + 1
+        assignment_summary['volunteers_reused_across_tasks'] = sum(1 for c in new_task_counts.values() if c > 1)
+        
         db.table("action_plans").update({
-            "assigned_volunteers": total_assigned_volunteers,
-            "status": "active" if total_assigned_volunteers > 0 else "draft"
+            **plan_staffing_update(plan, plan_volunteer_ids),
+            "metadata": {
+                **(plan.get('metadata') or {}),
+                "schedule": {
+                    "start_at": plan_start.isoformat() if plan_start else None,
+                    "makespan_hours": schedule['makespan_hours'],
+                    "critical_path": schedule['critical_path'],
+                    "cycle": schedule['cycle'],
+                    "tasks": {
+                        task_id: {k: w[k] for k in ("start_hour", "end_hour", "slack_hours", "critical")}
+                        for task_id, w in schedule['tasks'].items()
+                    }
+                }
+            }
         }).eq("id", action_plan_id).execute()
         
         # Log agent execution
@@ -301,6 +698,224 @@ async def match_volunteers_to_tasks(action_plan_id: str) -> dict:
         }
 
 
+async def rematch_task(task_id: str) -> dict:
+    """
+    Fill the staffing gap of a single task after a volunteer drops out
+    
+    Computes the task's deficit, skips anyone who was ever assigned to it and
+    takes replacements from the cached ranked candidate list, so recovery
+    costs one task's work instead of a full plan re-match.
+    
+    Args:
+        task_id: The UUID of the task to re-staff
+        
+    Returns:
+        Dictionary containing the new assignments
+    """
+    return await matching_flights.do(("task", task_id), _rematch_task, task_id)
+
+
+async def _rematch_task(task_id: str) -> dict:
+    db = get_db()
+    session_id = str(uuid.uuid4())
+    start_time = datetime.utcnow()
+    action_plan_id = None
+    
+    try:
+        task_result = db.table("tasks").select("*").eq("id", task_id).execute()
+        if not task_result.data:
+            return {"error": "Task not found", "task_id": task_id}
+        
+        task = task_result.data[0]
+        action_plan_id = task.get('action_plan_id')
+        required_people = task.get('required_people', 1)
+        
+        existing = db.table("task_assignments").select("volunteer_id, status").eq("task_id", task_id).execute().data
+        excluded_ids = set(a['volunteer_id'] for a in existing)
+        staffed = sum(1 for a in existing if a['status'] not in DROPPED_ASSIGNMENT_STATUSES)
+        deficit = max(0, required_people - staffed)
+        
+        if deficit == 0:
+            return {
+                "success": True,
+                "task_id": task_id,
+                "deficit": 0,
+                "assignments": [],
+                "message": "Task is already fully staffed"
+            }
+        
+        ranked = get_cached_candidates(task_id)
+        from_cache = ranked is not None
+        if not from_cache:
+            ranked = await _rank_task_from_scratch(db, task)
+            cache_ranked_candidates(task_id, ranked)
+        
+        # Volunteers already working an overlapping task in this plan can't take this one
+        excluded_ids |= _volunteers_in_overlapping_tasks(db, task)
+        
+        # Wall-clock window the last matching run scheduled, for the per-window cap
+        plan_rows = db.table("action_plans").select("id, status, metadata").eq("id", action_plan_id).execute().data
+        plan = plan_rows[0] if plan_rows else None
+        bounds = scheduled_window(plan, task_id) if plan else None
+        
+        picks = _pick_replacements(ranked, excluded_ids, deficit, bounds)
+        
+        # A stale cache can run dry (everyone busy or already on the task); re-rank once
+        if len(picks) < deficit and from_cache:
+            ranked = await _rank_task_from_scratch(db, task)
+            cache_ranked_candidates(task_id, ranked)
+            picks = _pick_replacements(ranked, excluded_ids, deficit, bounds)
+        
+        new_assignments = [
+            build_assignment(task, c['volunteer'], c['scores'], note_prefix="Re-assigned by matching agent after drop-out")
+            for c in picks
+        ]
+        if new_assignments:
+            db.table("task_assignments").insert(new_assignments).execute()
+            
+            # Same post-write updates as a plan matching run
+            if len(new_assignments) >= deficit:
+                task_update = staffed_task_update(task)
+                if task_update:
+                    db.table("tasks").update(task_update).eq("id", task_id).execute()
+            if plan:
+                db.table("action_plans").update(
+                    plan_staffing_update(plan, _plan_volunteer_ids(db, action_plan_id))
+                ).eq("id", action_plan_id).execute()
+        
+        summary = {
+            "required": required_people,
+            "staffed_before": staffed,
+            "deficit": deficit,
+            "assigned": len(new_assignments),
+            "remaining_deficit": deficit - len(new_assignments),
+            "used_cached_candidates": from_cache
+        }
+        
+        execution_time = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+        await log_agent_execution(
+            session_id=session_id,
+            action_plan_id=action_plan_id,
+            action="rematch_task",
+            input_data={"task_id": task_id, "excluded_volunteers": len(excluded_ids)},
+            output_data=summary,
+            success=True,
+            execution_time_ms=execution_time
+        )
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "session_id": session_id,
+            "summary": summary,
+            "assignments": new_assignments
+        }
+        
+    except Exception as e:
+        execution_time = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+        await log_agent_execution(
+            session_id=session_id,
+            action_plan_id=action_plan_id,
+            action="rematch_task",
+            input_data={"task_id": task_id},
+            output_data={},
+            success=False,
+            error_message=str(e),
+            execution_time_ms=execution_time
+        )
+        
+        return {
+            "error": str(e),
+            "task_id": task_id,
+            "session_id": session_id
+        }
+
+
+async def _rank_task_from_scratch(db, task):
+    """
+    Rank volunteers for one task (cache miss path)
+    
+    Reads only the candidate index's shortlist for the task's skills around
+    its location when that covers the task; otherwise the whole roster.
+    """
+    plan = db.table("action_plans").select("metadata, issues(location)").eq("id", task['action_plan_id']).execute()
+    plan = plan.data[0] if plan.data else {}
+    task_location = task.get('location') or (plan.get('issues') or {}).get('location')
+    
+    volunteers = None
+    settings = get_settings()
+    if settings.candidate_index_enabled:
+        from agents.candidate_index import get_candidate_index
+        index = get_candidate_index()
+        await index.ensure_fresh(settings.candidate_index_rebuild_seconds, settings.candidate_index_sync_seconds)
+        ids = index.shortlist(task.get('skills_required'), task_location)
+        if ids and len(ids) >= settings.candidate_index_min_per_person * (task.get('required_people') or 1):
+            volunteers = _read_volunteers(db, ids)
+    if volunteers is None:
+        volunteers = _read_volunteers(db)
+    
+    # Keep to volunteers free in the window the last matching run scheduled
+    schedule = (plan.get('metadata') or {}).get('schedule') or {}
+    window = (schedule.get('tasks') or {}).get(task['id'])
+    if settings.matching_availability_enabled and window and schedule.get('start_at'):
+        volunteers, _ = filter_free_volunteers(
+            volunteers, get_availability_index(), parse_timestamp(schedule['start_at']), window
+        )
+    
+    return rank_volunteers_for_task(task, volunteers, task_location or {})
+
+
+def _plan_volunteer_ids(db, action_plan_id):
+    """Ids of volunteers with an assignment still counting towards one of the plan's tasks"""
+    task_ids = [t['id'] for t in db.table("tasks").select("id").eq("action_plan_id", action_plan_id).execute().data]
+    if not task_ids:
+        return set()
+    rows = db.table("task_assignments").select("volunteer_id, status").in_("task_id", task_ids).execute().data
+    return set(a['volunteer_id'] for a in rows if a['status'] not in DROPPED_ASSIGNMENT_STATUSES)
+
+
+def _volunteers_in_overlapping_tasks(db, task):
+    """Ids of volunteers active on plan tasks whose schedule window overlaps this task's"""
+    plan_tasks = db.table("tasks").select("id, name, estimated_hours, prerequisites").eq("action_plan_id", task['action_plan_id']).execute().data
+    windows = schedule_tasks(plan_tasks)['tasks']
+    window = windows.get(task['id'])
+    if not window:
+        return set()
+    
+    overlapping = [t_id for t_id, w in windows.items() if t_id != task['id'] and windows_overlap(window, w)]
+    if not overlapping:
+        return set()
+    
+    rows = db.table("task_assignments").select("volunteer_id, status").in_("task_id", overlapping).execute().data
+    return set(a['volunteer_id'] for a in rows if a['status'] not in DROPPED_ASSIGNMENT_STATUSES)
+
+
+def _pick_replacements(ranked, excluded_ids, deficit, bounds=None):
+    """
+    Take the best not-yet-assigned, not-busy candidates from a ranked list
+    
+    With the task's wall-clock bounds, volunteers at the cap still qualify
+    if their active assignments overlapping the task stay under it.
+    """
+    candidates = [c for c in ranked if c['volunteer']['id'] not in excluded_ids]
+    if not candidates:
+        return []
+    
+    # Check current workload only for the candidates we might pick
+    counts = get_workload_counts([c['volunteer']['id'] for c in candidates])
+    capped_ids = [c['volunteer']['id'] for c in candidates if counts.get(c['volunteer']['id'], 0) >= MAX_CONCURRENT_TASKS]
+    relieved_ids = set()
+    if capped_ids and bounds:
+        capped = [{'id': v_id} for v_id in capped_ids]
+        relieved_ids = set(v['id'] for v in under_cap_in_window(capped, get_active_windows(capped_ids), *bounds))
+    
+    picks = [
+        c for c in candidates
+        if counts.get(c['volunteer']['id'], 0) < MAX_CONCURRENT_TASKS or c['volunteer']['id'] in relieved_ids
+    ]
+    return picks[:deficit]
+
+
 async def log_agent_execution(
     session_id: str,
     action_plan_id: str,
@@ -334,5 +949,6 @@ async def log_agent_execution(
     
     try:
         db.table("agent_logs").insert(log_entry).execute()
+        record_agent_log(log_entry)
     except Exception as e:
         print(f"Failed to log agent execution: {e}")
@@ -0,0 +1,318 @@
+"""
+Region-sharded matching on a process pool
+
+Matching is CPU-bound scoring, and plans in different cities share no useful
+candidates. This module:
+1. Partitions the volunteer roster into geographic shards (lat/lng grid
+   cells) and publishes each shard once into shared memory
+2. Runs plan_task_assignments for a plan in a worker process over the
+   shards around the issue (plus volunteers without a location), so
+   concurrent plans score in parallel without stalling the event loop
+3. Sends each job only shard names, tasks and workload counts; workers
+   decode a shard once and reuse it until the roster is republished
+4. Republishes when the roster's updated_at watermark (or content digest)
+   moves, and frees a replaced shard once no dispatched job still uses it
+5. Falls back to every shard when the region has too few candidates
+
+Enabled with MATCHING_PROCESS_POOL_ENABLED; otherwise matching stays
+in-process.
+"""
+
+from agents.matching_agent import capped_volunteers, filter_available_volunteers, plan_task_assignments
+from config import get_settings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+import asyncio
+import hashlib
+import math
+import orjson
+import time
+import uuid
+
+
+# Volunteer fields the matching core reads
+ROSTER_FIELDS = ("id", "skills", "location", "reliability_score", "availability")
+
+# Shard key for volunteers without usable coordinates (included in every region)
+ANYWHERE = "anywhere"
+
+
+def shard_key(location, degrees: float):
+    """Grid cell (lat index, lng index) of a location, or None without coordinates"""
+    try:
+        lat = float(location["lat"])
+        lng = float(location["lng"])
+    except (TypeError, KeyError, ValueError):
+        return None
+    if math.isnan(lat) or math.isnan(lng):
+        return None
+    return (math.floor(lat / degrees), math.floor(lng / degrees))
+
+
+def roster_watermark(volunteers: list) -> tuple:
+    """
+    (size, version) of a roster: the newest updated_at, or a digest of the
+    matching fields when some rows have no updated_at (migration 006 not applied)
+    """
+    stamps = [v.get("updated_at") for v in volunteers]
+    if stamps and all(stamps):
+        return (len(volunteers), max(str(s) for s in stamps))
+    payload = orjson.dumps([[v.get(k) for k in ROSTER_FIELDS] for v in volunteers])
+    return (len(volunteers), hashlib.blake2b(payload, digest_size=16).hexdigest())
+
+
+def region_keys(location, degrees: float, rings: int) -> list:
+    """Shard keys of the cell containing location and `rings` cells around it"""
+    center = shard_key(location, degrees)
+    if center is None:
+        return []
+    return [(center[0] + dy, center[1] + dx) for dy in range(-rings, rings + 1) for dx in range(-rings, rings + 1)]
+
+
+class SharedShard:
+    """One shard's slim volunteer rows, orjson-encoded into a shared memory block"""
+
+    def __init__(self, volunteers: list):
+        payload = orjson.dumps([{k: v.get(k) for k in ROSTER_FIELDS} for v in volunteers])
+        self.ids = [v["id"] for v in volunteers]
+        self.size = len(payload)
+        self.block = shared_memory.SharedMemory(name=f"weave-{uuid.uuid4().hex[:16]}", create=True, size=max(1, self.size))
+        self.block.buf[:self.size] = payload
+        self.jobs = 0
+        self.retired = False
+
+    @property
+    def ref(self) -> tuple:
+        return (self.block.name, self.size)
+
+    def release(self):
+        self.block.close()
+        try:
+            self.block.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Worker-side cache: shared memory name -> decoded volunteers
+_worker_shards = {}
+_WORKER_SHARD_CACHE_SIZE = 256
+
+
+def _load_shard(ref: tuple) -> list:
+    name, size = ref
+    volunteers = _worker_shards.get(name)
+    if volunteers is None:
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            volunteers = orjson.loads(bytes(block.buf[:size]))
+        finally:
+            block.close()
+        if len(_worker_shards) >= _WORKER_SHARD_CACHE_SIZE:
+            _worker_shards.pop(next(iter(_worker_shards)))
+        _worker_shards[name] = volunteers
+    return volunteers
+
+
+def run_region_job(shard_refs: list, job: dict) -> dict:
+    """
+    Worker entry point: match one plan against the given shards
+
+    Returns plan_task_assignments output plus the candidate counts.
+    """
+    from utils.availability import AvailabilityIndex
+
+    volunteers = [v for ref in shard_refs for v in _load_shard(ref)]
+    available, busy_ids = filter_available_volunteers(volunteers, job["assignment_counts"])
+    availability = AvailabilityIndex() if job["plan_start"] is not None else None
+    capped = capped_volunteers(volunteers, available, busy_ids)
+    shortlists = None
+    if job["shortlists"]:
+        by_id = {v["id"]: v for v in available}
+        shortlists = {
+            task_id: [by_id[i] for i in ids if i in by_id]
+            for task_id, ids in job["shortlists"].items()
+        }
+    task_plans = plan_task_assignments(
+        job["tasks"],
+        available,
+        job["issue_location"],
+        job["existing_by_task"],
+        job["schedule"],
+        availability,
+        job["plan_start"],
+        shortlists,
+        capped,
+        job["busy_windows"]
+    )
+    return {"task_plans": task_plans, "candidates": len(volunteers), "available": len(available)}
+
+
+class MatchingPool:
+    """Shared-memory roster shards and the process pool that matches against them"""
+
+    def __init__(self, workers: int = 2, shard_degrees: float = 0.5, region_rings: int = 1,
+                 refresh_seconds: int = 300):
+        self.workers = max(1, workers)
+        self.shard_degrees = shard_degrees
+        self.region_rings = region_rings
+        self.refresh_seconds = refresh_seconds
+        self._executor = None
+        self._publish_lock = None
+        self.shards = {}
+        self._retired = []
+        self.published_at = None
+        self.roster_size = 0
+        self.watermark = None
+        self.jobs = 0
+        self.global_jobs = 0
+        self.publishes = 0
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def build_shards(self, volunteers: list) -> dict:
+        """Partition the roster into shards and copy them into shared memory"""
+        groups = {}
+        for v in volunteers:
+            groups.setdefault(shard_key(v.get("location"), self.shard_degrees) or ANYWHERE, []).append(v)
+        return {key: SharedShard(group) for key, group in groups.items()}
+
+    def swap(self, shards: dict, volunteers: list, watermark: tuple = None):
+        """
+        Serve new shards; the previous generation is freed as its jobs finish
+
+        Call from the event loop (job reference counts are kept there).
+        """
+        for shard in self.shards.values():
+            shard.retired = True
+            if shard.jobs:
+                self._retired.append(shard)
+            else:
+                shard.release()
+
+        self.shards = shards
+        self.published_at = time.time()
+        self.roster_size = len(volunteers)
+        self.watermark = watermark or roster_watermark(volunteers)
+        self.publishes += 1
+        print(f"🧩 Matching roster published: {len(volunteers)} volunteers in {len(self.shards)} shards")
+
+    def publish(self, volunteers: list):
+        """Build and serve shards for the roster"""
+        self.swap(self.build_shards(volunteers), volunteers)
+
+    def needs_publish(self, volunteers: list, watermark: tuple = None) -> bool:
+        stale = self.published_at is None or time.time() - self.published_at > self.refresh_seconds
+        return stale or (watermark or roster_watermark(volunteers)) != self.watermark
+
+    async def ensure_published(self, volunteers: list):
+        """Republish off the event loop when the shards are stale or the roster changed"""
+        if self._publish_lock is None:
+            self._publish_lock = asyncio.Lock()
+        async with self._publish_lock:
+            watermark = roster_watermark(volunteers)
+            if self.needs_publish(volunteers, watermark):
+                shards = await asyncio.to_thread(self.build_shards, volunteers)
+                self.swap(shards, volunteers, watermark)
+
+    def attach(self, shards: list):
+        """Hold shards for a dispatched job"""
+        for shard in shards:
+            shard.jobs += 1
+
+    def detach(self, shards: list):
+        """Drop a finished job's hold, freeing retired shards nobody uses any more"""
+        for shard in shards:
+            shard.jobs -= 1
+            if shard.retired and shard.jobs == 0 and shard in self._retired:
+                shard.release()
+                self._retired.remove(shard)
+
+    def region_shards(self, issue_location, needed: int) -> tuple:
+        """(shards, is_global) for an issue: its region, or every shard if the region is too thin"""
+        keys = region_keys(issue_location, self.shard_degrees, self.region_rings)
+        shards = [self.shards[k] for k in keys if k in self.shards]
+        if ANYWHERE in self.shards:
+            shards.append(self.shards[ANYWHERE])
+        if sum(len(s.ids) for s in shards) < needed:
+            return list(self.shards.values()), True
+        return shards, False
+
+    async def plan_assignments(self, volunteers, assignment_counts, tasks, issue_location,
+                               existing_by_task, schedule, plan_start=None, shortlists=None,
+                               busy_windows=None) -> dict:
+        """
+        Run plan_task_assignments for one plan in a worker process
+
+        Args:
+            volunteers: Full roster (only used to (re)publish the shards)
+            assignment_counts: Active assignment counts per volunteer
+            shortlists: task_id -> shortlisted volunteer rows (sent as ids;
+                candidates outside the region shards are dropped)
+            busy_windows: get_active_windows() for volunteers at the cap
+            Remaining args as for plan_task_assignments
+
+        Returns:
+            {"task_plans", "candidates", "available", "shards", "global"}
+        """
+        await self.ensure_published(volunteers)
+        needed = sum(t.get("required_people", 1) for t in tasks)
+        shards, is_global = self.region_shards(issue_location, needed)
+
+        region_ids = [i for s in shards for i in s.ids]
+        job = {
+            "tasks": tasks,
+            "issue_location": issue_location,
+            "existing_by_task": existing_by_task,
+            "schedule": schedule,
+            "plan_start": plan_start,
+            "shortlists": {t: [v["id"] for v in rows] for t, rows in (shortlists or {}).items()},
+            "busy_windows": {i: busy_windows[i] for i in region_ids if i in (busy_windows or {})},
+            "assignment_counts": {i: assignment_counts[i] for i in region_ids if i in assignment_counts}
+        }
+        self.jobs += 1
+        self.global_jobs += int(is_global)
+
+        # Held until the worker is done, so a republish can't free them under it
+        self.attach(shards)
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor(), run_region_job, [s.ref for s in shards], job)
+        finally:
+            self.detach(shards)
+        return {**result, "shards": len(shards), "global": is_global}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for shard in list(self.shards.values()) + self._retired:
+            shard.release()
+        self.shards, self._retired = {}, []
+        self.published_at = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "shards": len(self.shards),
+            "retired_shards_in_use": len(self._retired),
+            "roster_size": self.roster_size,
+            "publishes": self.publishes,
+            "jobs": self.jobs,
+            "global_jobs": self.global_jobs
+        }
+
+
+@lru_cache()
+def get_matching_pool() -> MatchingPool:
+    """Get the process-wide matching pool"""
+    settings = get_settings()
+    return MatchingPool(
+        workers=settings.matching_process_workers,
+        shard_degrees=settings.matching_shard_degrees,
+        region_rings=settings.matching_shard_region_rings,
+        refresh_seconds=settings.matching_shard_refresh_seconds
+    )
@@ -0,0 +1,451 @@
+"""
+Agent Pipeline - Staged executor for Discovery → Planning → Matching
+
+This module:
+1. Gives each agent stage its own bounded queue and pool of workers
+2. Lets issue N+1 run Discovery while issue N is still in Planning
+3. Keeps LLM-bound stages wide and the DB-heavy Matching stage narrow
+4. Applies backpressure when a downstream stage falls behind
+5. Serves every queue by priority (intake pre-score, then Discovery's
+   priority/urgency), with aging so low-priority issues are never starved
+6. Reports per-stage throughput, service time, queue wait time and
+   time-to-plan per urgency
+"""
+
+from config import get_settings
+from utils.triage import priority_from_analysis, urgency_for_priority
+from collections import deque
+from functools import lru_cache
+import asyncio
+import heapq
+import itertools
+import time
+
+
+DEFAULT_PRIORITY = 0.5
+
+# Recent time-to-plan samples kept per urgency band
+TIME_TO_PLAN_SAMPLES = 1000
+
+
+class PipelineJob:
+    """Tracks a single issue as it moves through the pipeline stages"""
+
+    def __init__(self, issue_id: str, priority: float = DEFAULT_PRIORITY):
+        self.issue_id = issue_id
+        self.priority = priority
+        self.intake_priority = priority
+        self.action_plan_id = None
+        self.status = "queued"  # queued, running, completed, skipped, failed
+        self.stage = None
+        self.error = None
+        self.results = {}
+        self.submitted_at = time.monotonic()
+        self.enqueued_at = self.submitted_at
+        self.planned_at = None
+        self.finished_at = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def finish(self, status: str, error: str = None):
+        """Mark the job as finished and wake up anyone waiting on it"""
+        self.status = status
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+    async def wait(self) -> "PipelineJob":
+        """Wait until the job has left the pipeline"""
+        await self._done.wait()
+        return self
+
+    def to_dict(self) -> dict:
+        elapsed = (self.finished_at or time.monotonic()) - self.submitted_at
+        return {
+            "issue_id": self.issue_id,
+            "action_plan_id": self.action_plan_id,
+            "status": self.status,
+            "stage": self.stage,
+            "priority": self.priority,
+            "urgency": urgency_for_priority(self.priority),
+            "error": self.error,
+            "elapsed_ms": int(elapsed * 1000)
+        }
+
+
+class StageStats:
+    """Running counters for one pipeline stage"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+
+    def record(self, queue_wait: float, service_time: float, failed: bool):
+        self.processed += 1
+        if failed:
+            self.failed += 1
+        self.busy_seconds += service_time
+        self.queue_wait_seconds += queue_wait
+        self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, queue_wait)
+
+
+class PriorityJobQueue:
+    """
+    Bounded queue that hands out the job with the lowest key first
+
+    Producers blocked on a full queue are also admitted lowest-key first, so
+    an urgent issue does not wait behind a bulk import stuck on put().
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(1, maxsize)
+        self._heap = []
+        self._putters = []  # (key, seq, job, future) of blocked producers
+        self._getters = deque()
+        self._seq = itertools.count()
+
+    def qsize(self) -> int:
+        return len(self._heap)
+
+    def waiting_producers(self) -> int:
+        return sum(1 for entry in self._putters if not entry[3].done())
+
+    async def put(self, key: float, job):
+        seq = next(self._seq)
+        if len(self._heap) < self.maxsize and not self._putters:
+            self._push(key, seq, job)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._putters, (key, seq, job, future))
+        await future
+
+    async def get(self):
+        while not self._heap:
+            future = asyncio.get_running_loop().create_future()
+            self._getters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Woken but cancelled before taking the job: pass the wake-up on
+                    self._wake_getter()
+                raise
+        _, _, job = heapq.heappop(self._heap)
+        self._admit()
+        return job
+
+    def _push(self, key: float, seq: int, job):
+        heapq.heappush(self._heap, (key, seq, job))
+        self._wake_getter()
+
+    def _admit(self):
+        while self._putters and len(self._heap) < self.maxsize:
+            key, seq, job, future = heapq.heappop(self._putters)
+            if future.done():
+                continue  # producer was cancelled
+            self._push(key, seq, job)
+            future.set_result(None)
+
+    def _wake_getter(self):
+        while self._getters:
+            future = self._getters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+
+
+class PipelineStage:
+    """A named stage: handler coroutine, bounded priority queue and worker pool"""
+
+    def __init__(self, name: str, handler, concurrency: int, queue_size: int):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue = PriorityJobQueue(queue_size)
+        self.stats = StageStats()
+        self.workers = []
+        self.active = 0
+
+    def snapshot(self) -> dict:
+        stats = self.stats
+        uptime = max(time.monotonic() - stats.started_at, 1e-9)
+        processed = stats.processed
+        return {
+            "concurrency": self.concurrency,
+            "active_workers": self.active,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "waiting_producers": self.queue.waiting_producers(),
+            "processed": processed,
+            "failed": stats.failed,
+            "throughput_per_min": round(processed / uptime * 60, 3),
+            "avg_service_ms": round(stats.busy_seconds / processed * 1000, 1) if processed else 0.0,
+            "avg_queue_wait_ms": round(stats.queue_wait_seconds / processed * 1000, 1) if processed else 0.0,
+            "max_queue_wait_ms": round(stats.max_queue_wait_seconds * 1000, 1),
+            "utilization": round(stats.busy_seconds / (uptime * self.concurrency), 3)
+        }
+
+
+async def run_discovery_stage(job: PipelineJob):
+    """Discovery stage: analyze the issue, continue only if it is valid"""
+    # Agents are imported on first use so importing the API doesn't load the LLM stack
+    from agents.discovery_agent import analyze_issue
+    
+    print(f"🤖 Starting Discovery Agent for issue {job.issue_id}")
+    discovery_result = await analyze_issue(job.issue_id)
+    job.results["discovery"] = discovery_result
+    print(f"✅ Discovery Agent completed: {discovery_result.get('success', False)}")
+
+    if not discovery_result.get('success'):
+        job.finish("failed", discovery_result.get('error', "Discovery failed"))
+        return None
+
+    if not discovery_result.get('analysis', {}).get('is_valid', True):
+        job.finish("skipped", "Issue marked invalid by Discovery Agent")
+        return None
+
+    # Discovery's priority/urgency can raise the intake pre-score but never lower it;
+    # the keyword fallback (Gemini unavailable) knows less than intake triage did
+    analysis = discovery_result.get('analysis', {})
+    if not analysis.get('fallback'):
+        job.priority = max(job.intake_priority, priority_from_analysis(analysis, job.priority))
+    return "planning"
+
+
+async def run_planning_stage(job: PipelineJob):
+    """Planning stage: create (or reuse) the action plan for the issue"""
+    from agents.planning_agent import create_action_plan
+    
+    print(f"📋 Starting Planning Agent for issue {job.issue_id}")
+    planning_result = await create_action_plan(job.issue_id)
+    job.results["planning"] = planning_result
+    print(f"✅ Planning Agent completed: {planning_result.get('success', False)}")
+
+    if not planning_result.get('success'):
+        job.finish("failed", planning_result.get('error', "Planning failed"))
+        return None
+
+    # Extract action_plan_id handling both new and existing plan formats
+    if 'action_plan' in planning_result:
+        job.action_plan_id = planning_result['action_plan'].get('id')
+    elif 'action_plan_id' in planning_result:
+        job.action_plan_id = planning_result['action_plan_id']
+
+    if not job.action_plan_id:
+        print("⚠️ Could not find action_plan_id to trigger matching")
+        job.finish("failed", "Planning did not return an action_plan_id")
+        return None
+
+    job.planned_at = time.monotonic()
+    return "matching"
+
+
+async def run_matching_stage(job: PipelineJob):
+    """Matching stage: assign volunteers to the plan's tasks"""
+    from agents.matching_agent import match_volunteers_to_tasks
+    
+    print(f"👥 Starting Matching Agent for action plan {job.action_plan_id}")
+    matching_result = await match_volunteers_to_tasks(job.action_plan_id)
+    job.results["matching"] = matching_result
+    print(f"✅ Matching Agent completed: {matching_result.get('success', False)}")
+
+    if matching_result.get('success'):
+        summary = matching_result.get('summary', {})
+        print(f"   📊 Assigned {summary.get('total_assignments_made', 0)} volunteers to {summary.get('tasks_fully_assigned', 0)}/{summary.get('total_tasks', 0)} tasks")
+        job.finish("completed")
+    else:
+        job.finish("failed", matching_result.get('error') or matching_result.get('message'))
+
+    return None
+
+
+class AgentPipeline:
+    """
+    Staged executor for the agent workflow
+
+    Jobs flow discovery → planning → matching. Each stage pulls from its own
+    bounded queue, so a slow stage only blocks the stage feeding it.
+    
+    Queues are ordered by submitted_at - priority * priority_headstart_seconds:
+    a priority 1.0 issue goes ahead of priority 0.0 issues submitted up to
+    that many seconds earlier, and anything older still goes first (aging).
+    A headstart of 0 gives plain submission order.
+    """
+
+    def __init__(
+        self,
+        discovery_concurrency: int = 8,
+        planning_concurrency: int = 8,
+        matching_concurrency: int = 2,
+        queue_size: int = 100,
+        priority_headstart_seconds: float = 600.0
+    ):
+        self.stages = {
+            "discovery": PipelineStage("discovery", run_discovery_stage, discovery_concurrency, queue_size),
+            "planning": PipelineStage("planning", run_planning_stage, planning_concurrency, queue_size),
+            "matching": PipelineStage("matching", run_matching_stage, matching_concurrency, queue_size),
+        }
+        self.priority_headstart_seconds = priority_headstart_seconds
+        self.submitted = 0
+        self.coalesced = 0
+        self.time_to_plan = {level: deque(maxlen=TIME_TO_PLAN_SAMPLES) for level in ("low", "medium", "high", "critical")}
+        # issue_id -> job still in the pipeline (single flight per issue)
+        self.active_jobs = {}
+        self.started = False
+
+    def start(self):
+        """Spawn worker tasks for every stage (must run inside the event loop)"""
+        if self.started:
+            return
+        for stage in self.stages.values():
+            stage.stats = StageStats()
+            stage.workers = [
+                asyncio.create_task(self._worker(stage), name=f"pipeline-{stage.name}-{i}")
+                for i in range(stage.concurrency)
+            ]
+        self.started = True
+
+    async def stop(self):
+        """Cancel all stage workers"""
+        if not self.started:
+            return
+        workers = [w for stage in self.stages.values() for w in stage.workers]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for stage in self.stages.values():
+            stage.workers = []
+        self.started = False
+
+    async def submit(self, issue_id: str, priority: float = None) -> PipelineJob:
+        """
+        Queue an issue for processing
+
+        Returns as soon as the job is accepted by the discovery queue (waits
+        only if that queue is full). Use job.wait() to wait for completion.
+        If the issue is already in the pipeline, its running job is returned
+        instead of starting a second run.
+        
+        Args:
+            issue_id: The issue to process
+            priority: 0.0-1.0 scheduling priority until Discovery re-scores
+                the issue (see utils.triage.pre_score)
+        """
+        self.start()
+        existing = self.active_jobs.get(issue_id)
+        if existing is not None and not existing.done:
+            self.coalesced += 1
+            return existing
+        
+        job = PipelineJob(issue_id, DEFAULT_PRIORITY if priority is None else priority)
+        self.active_jobs[issue_id] = job
+        self.submitted += 1
+        await self._enqueue("discovery", job)
+        return job
+
+    def schedule_key(self, job: PipelineJob) -> float:
+        """Queue order: earlier submission and higher priority go first"""
+        return job.submitted_at - job.priority * self.priority_headstart_seconds
+
+    async def _enqueue(self, stage_name: str, job: PipelineJob):
+        job.stage = stage_name
+        job.enqueued_at = time.monotonic()
+        await self.stages[stage_name].queue.put(self.schedule_key(job), job)
+
+    async def _worker(self, stage: PipelineStage):
+        while True:
+            job = await stage.queue.get()
+            started = time.monotonic()
+            queue_wait = started - job.enqueued_at
+            stage.active += 1
+            job.status = "running"
+            next_stage = None
+
+            try:
+                next_stage = await stage.handler(job)
+            except asyncio.CancelledError:
+                job.finish("failed", "Pipeline stopped")
+                raise
+            except Exception as e:
+                print(f"❌ Agent processing failed in {stage.name} stage: {e}")
+                job.finish("failed", str(e))
+            finally:
+                stage.active -= 1
+                stage.stats.record(queue_wait, time.monotonic() - started, failed=job.status == "failed")
+
+            if job.planned_at and stage.name == "planning":
+                self.time_to_plan[urgency_for_priority(job.priority)].append(job.planned_at - job.submitted_at)
+
+            if next_stage:
+                await self._enqueue(next_stage, job)
+                continue
+            if not job.done:
+                job.finish("completed")
+            if self.active_jobs.get(job.issue_id) is job:
+                del self.active_jobs[job.issue_id]
+
+    def stats(self) -> dict:
+        """Per-stage throughput, utilization and queue wait statistics"""
+        from agents.matching_agent import matching_flights
+        from utils.gemini_client import gemini_flights
+        
+        return {
+            "running": self.started,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.active_jobs),
+            "stages": {name: stage.snapshot() for name, stage in self.stages.items()},
+            "priority_headstart_seconds": self.priority_headstart_seconds,
+            "time_to_plan": {level: _summarize_seconds(samples) for level, samples in self.time_to_plan.items()},
+            "single_flight": {
+                "matching": matching_flights.stats(),
+                "gemini": gemini_flights.stats()
+            },
+            "matching_pool": _matching_pool_stats(),
+            "candidate_index": _candidate_index_stats()
+        }
+
+
+def _matching_pool_stats():
+    if not get_settings().matching_process_pool_enabled:
+        return None
+    from agents.matching_pool import get_matching_pool
+    return get_matching_pool().stats()
+
+
+def _candidate_index_stats():
+    if not get_settings().candidate_index_enabled:
+        return None
+    from agents.candidate_index import get_candidate_index
+    return get_candidate_index().stats()
+
+
+def _summarize_seconds(samples) -> dict:
+    values = sorted(samples)
+    if not values:
+        return {"count": 0}
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+    return {"count": len(values), "p50_ms": pick(0.5), "p90_ms": pick(0.9), "max_ms": round(values[-1] * 1000, 1)}
+
+
+@lru_cache()
+def get_pipeline() -> AgentPipeline:
+    """Get the process-wide agent pipeline"""
+    settings = get_settings()
+    return AgentPipeline(
+        discovery_concurrency=settings.pipeline_discovery_concurrency,
+        planning_concurrency=settings.pipeline_planning_concurrency,
+        matching_concurrency=settings.pipeline_matching_concurrency,
+        queue_size=settings.pipeline_queue_size,
+        priority_headstart_seconds=settings.pipeline_priority_headstart_seconds
+    )
@@ -11,6 +11,8 @@ This agent:
 
 from utils.gemini_client import call_gemini
 from utils.supabase_client import get_db
+from utils.agent_log_stats import record_agent_log
+from utils.plan_index import find_reusable_plan, record_generated_plan
 from datetime import datetime
 import uuid
 import re
@@ -265,13 +267,20 @@ async def create_action_plan(issue_id: str) -> dict:
             location=issue["location"]
         )
         
-        # Call Gemini
         execution_start = datetime.utcnow()
-        plan_data = await call_gemini(
-            prompt=prompt,
-            system_instruction="You are an expert community project planner creating actionable plans."
-        )
+        
+        # Reuse a stored plan from a near-identical past issue when possible,
+        # otherwise call Gemini
+        plan_data = await find_reusable_plan(issue, discovery_analysis)
+        if plan_data:
+            print(f"♻️ Reusing action plan {plan_data['reused_from']['action_plan_id']} (similarity {plan_data['reused_from']['similarity']})")
+        else:
+            plan_data = await call_gemini(
+                prompt=prompt,
+                system_instruction="You are an expert community project planner creating actionable plans."
+            )
         execution_time = int((datetime.utcnow() - execution_start).total_seconds() * 1000)
+        generated_by_ai = "error" not in plan_data and not plan_data.get("reused_from")
         
         # Check for errors or use fallback for planning
         if "error" in plan_data:
@@ -292,6 +301,7 @@ async def create_action_plan(issue_id: str) -> dict:
         # Validate that plan_data has required fields
         if not plan_data.get("tasks"):
             plan_data = create_fallback_plan(issue)
+            generated_by_ai = False
         
         # Create action plan in database
         # Normalize priority to match database constraints
@@ -357,12 +367,25 @@ async def create_action_plan(issue_id: str) -> dict:
             }
         }).eq("id", issue_id).execute()
         
+        # Make AI-generated plans available for reuse by similar issues
+        if generated_by_ai:
+            record_generated_plan(
+                created_plan["id"],
+                issue,
+                discovery_analysis.get("category", issue["category"]),
+                plan_data
+            )
+        
         # Log successful execution
         await log_agent_execution(
             session_id=session_id,
             issue_id=issue_id,
             action="create_action_plan",
-            input_data={"title": issue["title"], "category": issue["category"]},
+            input_data={
+                "title": issue["title"],
+                "category": issue["category"],
+                "reused_from": plan_data.get("reused_from")
+            },
             output_data=plan_data,
             success=True,
             confidence_score=plan_data.get("confidence", 0.0),
@@ -430,5 +453,6 @@ async def log_agent_execution(
     
     try:
         db.table("agent_logs").insert(log_entry).execute()
+        record_agent_log(log_entry)
     except Exception as e:
         print(f"Failed to log agent execution: {e}")
@@ -0,0 +1,182 @@
+"""
+Task Scheduler - Orders an action plan's tasks using their prerequisites
+
+This module:
+1. Builds the prerequisite DAG from the Planning Agent's task names
+2. Detects cycles (and falls back to treating tasks as simultaneous)
+3. Computes earliest start/finish times from estimated_hours
+4. Finds the critical path and per-task slack
+5. Gives the Matching Agent time windows so one volunteer can take
+   several tasks that never overlap
+"""
+
+import re
+
+
+DEFAULT_TASK_HOURS = 2.0
+
+# Planning output names tasks "Task 1: Clear debris" but refers to them as "Task 1"
+_NAME_PREFIX = re.compile(r"^\s*([^:]+):")
+
+
+class ScheduleCycleError(ValueError):
+    """Raised when task prerequisites form a cycle"""
+
+    def __init__(self, cycle: list):
+        self.cycle = cycle
+        super().__init__(f"Task prerequisites form a cycle: {' -> '.join(cycle)}")
+
+
+def _normalize(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def build_task_graph(tasks: list) -> tuple:
+    """
+    Resolve prerequisite names to task ids
+
+    Returns (deps, unresolved) where deps maps task_id -> set of prerequisite
+    task ids and unresolved lists prerequisite names that matched no task.
+    """
+    by_name = {}
+    by_prefix = {}
+    for task in tasks:
+        name = _normalize(task.get('name'))
+        by_name[name] = task['id']
+        match = _NAME_PREFIX.match(task.get('name') or "")
+        if match:
+            by_prefix[_normalize(match.group(1))] = task['id']
+
+    deps = {}
+    unresolved = []
+    for task in tasks:
+        deps[task['id']] = set()
+        for ref in task.get('prerequisites') or []:
+            key = _normalize(ref)
+            prereq_id = by_name.get(key) or by_prefix.get(key)
+            if prereq_id is None:
+                # "Task 1: Something" referenced by its full name with a different suffix
+                match = _NAME_PREFIX.match(ref or "")
+                prereq_id = by_prefix.get(_normalize(match.group(1))) if match else None
+            if prereq_id and prereq_id != task['id']:
+                deps[task['id']].add(prereq_id)
+            elif prereq_id is None:
+                unresolved.append({"task": task.get('name'), "prerequisite": ref})
+
+    return deps, unresolved
+
+
+def topological_order(tasks: list, deps: dict) -> list:
+    """Kahn's algorithm; raises ScheduleCycleError naming one cycle"""
+    names = {t['id']: t.get('name', t['id']) for t in tasks}
+    remaining = {task_id: set(prereqs) for task_id, prereqs in deps.items()}
+    dependents = {task_id: [] for task_id in deps}
+    for task_id, prereqs in deps.items():
+        for p in prereqs:
+            dependents[p].append(task_id)
+
+    # Stable order: tasks without prerequisites in their original order
+    position = {t['id']: i for i, t in enumerate(tasks)}
+    ready = sorted((t for t, p in remaining.items() if not p), key=position.get)
+    order = []
+    while ready:
+        task_id = ready.pop(0)
+        order.append(task_id)
+        for child in dependents[task_id]:
+            remaining[child].discard(task_id)
+            if not remaining[child]:
+                ready.append(child)
+                ready.sort(key=position.get)
+
+    if len(order) < len(tasks):
+        raise ScheduleCycleError([names[t] for t in _find_cycle(deps, set(deps) - set(order))])
+    return order
+
+
+def _find_cycle(deps: dict, nodes: set) -> list:
+    """Walk prerequisite edges inside `nodes` until a task repeats"""
+    start = next(iter(nodes))
+    path, seen = [], {}
+    current = start
+    while current not in seen:
+        seen[current] = len(path)
+        path.append(current)
+        current = next(p for p in deps[current] if p in nodes)
+    return path[seen[current]:] + [current]
+
+
+def schedule_tasks(tasks: list) -> dict:
+    """
+    Compute an as-soon-as-possible schedule for a plan's tasks
+
+    Times are hours from plan start. Returns per-task windows and slack,
+    the critical path and total duration. If prerequisites are cyclic, every
+    task starts at hour 0 and the cycle is reported.
+    """
+    deps, unresolved = build_task_graph(tasks)
+    durations = {t['id']: float(t.get('estimated_hours') or DEFAULT_TASK_HOURS) for t in tasks}
+    names = {t['id']: t.get('name', t['id']) for t in tasks}
+
+    try:
+        order = topological_order(tasks, deps)
+        cycle = None
+    except ScheduleCycleError as e:
+        cycle = e.cycle
+        deps = {t['id']: set() for t in tasks}
+        order = [t['id'] for t in tasks]
+
+    # Forward pass: earliest start/finish
+    start, finish, critical_pred = {}, {}, {}
+    for task_id in order:
+        start[task_id] = max((finish[p] for p in deps[task_id]), default=0.0)
+        finish[task_id] = start[task_id] + durations[task_id]
+        critical_pred[task_id] = max(deps[task_id], key=lambda p: finish[p], default=None)
+
+    makespan = max(finish.values(), default=0.0)
+
+    # Backward pass: latest finish without delaying the plan
+    dependents = {task_id: [] for task_id in deps}
+    for task_id, prereqs in deps.items():
+        for p in prereqs:
+            dependents[p].append(task_id)
+    latest_finish = {}
+    for task_id in reversed(order):
+        latest_finish[task_id] = min(
+            (latest_finish[c] - durations[c] for c in dependents[task_id]),
+            default=makespan
+        )
+
+    # Critical path: follow the latest-finishing prerequisite back from the last task
+    critical_path = []
+    current = max(order, key=lambda t: finish[t]) if order else None
+    while current is not None:
+        critical_path.append(current)
+        current = critical_pred[current]
+    critical_path.reverse()
+
+    windows = {}
+    for task_id in order:
+        slack = round(latest_finish[task_id] - finish[task_id], 3)
+        windows[task_id] = {
+            "name": names[task_id],
+            "start_hour": round(start[task_id], 3),
+            "end_hour": round(finish[task_id], 3),
+            "slack_hours": slack,
+            "critical": slack <= 1e-6,
+            "prerequisites": sorted(deps[task_id])
+        }
+
+    return {
+        "tasks": windows,
+        "order": order,
+        "critical_path": critical_path,
+        "critical_path_names": [names[t] for t in critical_path],
+        "makespan_hours": round(makespan, 3),
+        "cycle": cycle,
+        "unresolved_prerequisites": unresolved
+    }
+
+
+def windows_overlap(a: dict, b: dict) -> bool:
+    """True if two task windows share any time"""
+    return a["start_hour"] < b["end_hour"] and b["start_hour"] < a["end_hour"]
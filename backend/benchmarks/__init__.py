@@ -0,0 +1 @@
+# Benchmarks package - performance and load test harnesses
@@ -0,0 +1,261 @@
+"""
+HTTP load-test harness for the issue intake path
+
+Drives the FastAPI app in-process (ASGI transport, default) or a running
+server (--base-url) with closed-loop virtual users. In-process runs use the
+in-memory database and Gemini replay mode, so agents keep working in the
+background without network access.
+
+Scenarios:
+    intake       POST /api/issues bursts
+    poll         GET /api/issues and /api/action-plans list polling
+    plan_detail  GET /api/action-plans/{id} and /{id}/tasks
+    mixed        weighted mix of all of the above
+
+Reports throughput, latency percentiles per endpoint and event-loop lag.
+
+Usage (from the backend folder):
+    python -m benchmarks.load_test --scenario intake --concurrency 1,8,32,64 --duration 10
+    python -m benchmarks.load_test --scenario mixed --base-url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+
+SCENARIOS = {
+    "intake": {"intake": 1.0},
+    "poll": {"list_issues": 0.5, "list_plans": 0.5},
+    "plan_detail": {"plan_detail": 0.5, "plan_tasks": 0.5},
+    "mixed": {"intake": 0.2, "list_issues": 0.3, "list_plans": 0.2, "plan_detail": 0.15, "plan_tasks": 0.15}
+}
+
+ISSUE_TEMPLATES = [
+    ("Park cleanup needed", "Trash and litter all over the park near the playground"),
+    ("Pothole on Main Street", "Large pothole damaging cars near the intersection"),
+    ("Graffiti on underpass", "Graffiti painted across the underpass walls"),
+    ("Food drive for shelter", "Local shelter is short on food for families this month"),
+    ("Broken streetlight", "Streetlight out on the corner, dangerous at night"),
+]
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def summarize(latencies_ms: list) -> dict:
+    values = sorted(latencies_ms)
+    return {
+        "p50_ms": round(percentile(values, 0.50), 2),
+        "p90_ms": round(percentile(values, 0.90), 2),
+        "p99_ms": round(percentile(values, 0.99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that asked to sleep `interval`"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags_ms = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags_ms.append(max(0.0, (time.perf_counter() - start - self.interval) * 1000))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        return summarize(self.lags_ms)
+
+
+def configure_offline_environment(volunteers: int, seed: int, gemini_latency: str):
+    """Point settings at the in-memory database and Gemini replay before the app is imported"""
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "load-test")
+    os.environ.setdefault("GEMINI_API_KEY", "load-test")
+    os.environ["DATABASE_BACKEND"] = "memory"
+    os.environ.setdefault("GEMINI_MODE", "replay")
+    os.environ.setdefault("GEMINI_REPLAY_LATENCY", gemini_latency)
+
+    from benchmarks.synthetic import generate_volunteers, generate_plans
+    from utils.supabase_client import get_db
+
+    plans = generate_plans(50, seed)
+    get_db().seed({
+        "volunteers": generate_volunteers(volunteers, seed),
+        "issues": [p["issue"] for p in plans],
+        "action_plans": [p["plan"] for p in plans],
+        "tasks": [t for p in plans for t in p["tasks"]]
+    })
+
+
+async def run_step(client, scenario: str, concurrency: int, duration: float, plan_ids: list, seed: int) -> dict:
+    """Run one closed-loop load step and collect per-endpoint latencies"""
+    weights = SCENARIOS[scenario]
+    operations = list(weights)
+    rng = random.Random(seed + concurrency)
+    latencies = {op: [] for op in operations}
+    errors = {op: 0 for op in operations}
+    deadline = time.perf_counter() + duration
+
+    async def call(op: str):
+        if op == "intake":
+            title, description = rng.choice(ISSUE_TEMPLATES)
+            return await client.post("/api/issues", json={
+                "title": title,
+                "description": description,
+                "category": "other",
+                "location": {"lat": 40.71 + rng.uniform(-0.05, 0.05), "lng": -74.0 + rng.uniform(-0.05, 0.05)}
+            })
+        if op == "list_issues":
+            return await client.get("/api/issues", params={"limit": 50})
+        if op == "list_plans":
+            return await client.get("/api/action-plans", params={"limit": 50})
+        plan_id = rng.choice(plan_ids)
+        if op == "plan_detail":
+            return await client.get(f"/api/action-plans/{plan_id}")
+        return await client.get(f"/api/action-plans/{plan_id}/tasks")
+
+    async def user():
+        while time.perf_counter() < deadline:
+            op = rng.choices(operations, weights=[weights[o] for o in operations])[0]
+            start = time.perf_counter()
+            try:
+                response = await call(op)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies[op].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[op] += 1
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    loop_lag = await monitor.stop()
+
+    endpoints = {}
+    total = 0
+    for op in operations:
+        count = len(latencies[op])
+        total += count
+        if count:
+            endpoints[op] = {
+                "requests": count,
+                "errors": errors[op],
+                "throughput_rps": round(count / elapsed, 2),
+                **summarize(latencies[op])
+            }
+
+    all_latencies = [l for op in operations for l in latencies[op]]
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "errors": sum(errors.values()),
+        **summarize(all_latencies),
+        "endpoints": endpoints,
+        "event_loop_lag": loop_lag
+    }
+
+
+async def main_async(args) -> dict:
+    import httpx
+
+    in_process = not args.base_url
+    if in_process:
+        configure_offline_environment(args.volunteers, args.seed, args.gemini_latency)
+        import main as app_module
+        from agents.pipeline import get_pipeline
+        from utils.supabase_client import get_db
+        transport = httpx.ASGITransport(app=app_module.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60)
+    else:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+
+    steps = []
+    async with client:
+        plans = (await client.get("/api/action-plans", params={"limit": 50})).json().get("action_plans", [])
+        plan_ids = [p["id"] for p in plans]
+        if not plan_ids and args.scenario in ("plan_detail", "mixed"):
+            raise SystemExit("No action plans available to fetch; run the intake scenario first")
+
+        for concurrency in args.concurrency:
+            print(f"🚦 {args.scenario}: {concurrency} users for {args.duration}s", flush=True)
+            step = await run_step(client, args.scenario, concurrency, args.duration, plan_ids, args.seed)
+            print(
+                f"   {step['throughput_rps']} req/s, p50 {step['p50_ms']} ms, p99 {step['p99_ms']} ms, "
+                f"errors {step['errors']}, loop lag p99 {step['event_loop_lag']['p99_ms']} ms",
+                flush=True
+            )
+            steps.append(step)
+
+    report = {
+        "benchmark": "load_test",
+        "scenario": args.scenario,
+        "mode": "in-process" if in_process else args.base_url,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "steps": steps
+    }
+
+    if in_process:
+        pipeline = get_pipeline()
+        report["pipeline"] = pipeline.stats()
+        report["database"] = {k: v for k, v in get_db().stats().items() if k != "queries_by_table"}
+        await pipeline.stop()
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the WEAVE API")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="intake")
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="Comma-separated virtual user counts; each runs as a separate step")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--volunteers", type=int, default=5000, help="Synthetic volunteers to seed (in-process)")
+    parser.add_argument("--gemini-latency", default="lognormal:800,0.4",
+                        help="Replay latency spec for in-process runs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    report = asyncio.run(main_async(args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{args.scenario}-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Synthetic-scale benchmark for the Matching Agent
+
+Runs the matching core (workload filtering, score_volunteer_for_task,
+ranking and assignment selection) against in-memory synthetic data at
+increasing roster sizes and reports wall time, peak memory and
+assignments/sec as JSON.
+
+Usage (from the backend folder):
+    python -m benchmarks.matching_benchmark
+    python -m benchmarks.matching_benchmark --sizes 1000,10000 --plans 3
+    python -m benchmarks.matching_benchmark --baseline benchmarks/results/matching-abc1234.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# The benchmark never talks to Supabase or Gemini; placeholders keep settings happy
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from agents.matching_agent import filter_available_volunteers, plan_task_assignments
+from benchmarks.synthetic import generate_volunteers, generate_workload, generate_plans
+
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(__file__)
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def run_matching(volunteers: list, workload: dict, plans: list) -> dict:
+    """Match every synthetic plan and return counters"""
+    assignments = 0
+    score_calls = 0
+
+    for entry in plans:
+        available, _ = filter_available_volunteers(volunteers, workload)
+        results = plan_task_assignments(entry["tasks"], available, entry["issue"]["location"])
+        score_calls += len(available) * len(entry["tasks"])
+        assignments += sum(len(r["assignments"]) for r in results)
+
+    return {"assignments": assignments, "score_calls": score_calls}
+
+
+def benchmark_size(size: int, plan_count: int, seed: int, measure_memory: bool) -> dict:
+    print(f"⏱️  {size:,} volunteers: generating data...", flush=True)
+    volunteers = generate_volunteers(size, seed)
+    workload = generate_workload(volunteers, seed)
+    plans = generate_plans(plan_count, seed)
+    task_count = sum(len(p["tasks"]) for p in plans)
+
+    start = time.perf_counter()
+    counters = run_matching(volunteers, workload, plans)
+    wall_time = time.perf_counter() - start
+
+    peak_memory_mb = None
+    if measure_memory:
+        # Separate pass: tracemalloc slows allocation-heavy code noticeably
+        tracemalloc.start()
+        run_matching(volunteers, workload, plans)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_memory_mb = round(peak / 1024 / 1024, 2)
+
+    result = {
+        "volunteers": size,
+        "plans": plan_count,
+        "tasks": task_count,
+        "busy_volunteers": sum(1 for c in workload.values() if c >= 10),
+        "wall_time_s": round(wall_time, 4),
+        "peak_memory_mb": peak_memory_mb,
+        "assignments": counters["assignments"],
+        "assignments_per_sec": round(counters["assignments"] / wall_time, 2) if wall_time else None,
+        "score_calls_per_sec": round(counters["score_calls"] / wall_time, 1) if wall_time else None,
+        "ms_per_plan": round(wall_time / plan_count * 1000, 2)
+    }
+    print(
+        f"   {result['wall_time_s']}s, {result['ms_per_plan']} ms/plan, "
+        f"{result['assignments_per_sec']} assignments/s, peak {peak_memory_mb} MB",
+        flush=True
+    )
+    return result
+
+
+def compare_to_baseline(results: list, baseline_path: str, tolerance: float) -> bool:
+    """Print per-size wall time deltas; return False if any size regressed beyond tolerance"""
+    with open(baseline_path) as f:
+        baseline = {r["volunteers"]: r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\n📈 Compared to {baseline_path}:")
+    for r in results:
+        base = baseline.get(r["volunteers"])
+        if not base:
+            continue
+        delta = (r["wall_time_s"] - base["wall_time_s"]) / base["wall_time_s"] if base["wall_time_s"] else 0.0
+        flag = "❌" if delta > tolerance else "✅"
+        print(f"   {flag} {r['volunteers']:>9,}: {base['wall_time_s']}s -> {r['wall_time_s']}s ({delta:+.1%})")
+        if delta > tolerance:
+            ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark volunteer matching on synthetic data")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated volunteer counts")
+    parser.add_argument("--plans", type=int, default=5, help="Action plans to match per size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed wall time regression vs baseline (fraction)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    commit = git_commit()
+
+    results = [benchmark_size(size, args.plans, args.seed, not args.skip_memory) for size in sizes]
+
+    report = {
+        "benchmark": "matching",
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"matching-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.baseline and not compare_to_baseline(results, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
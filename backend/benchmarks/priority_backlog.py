@@ -0,0 +1,203 @@
+"""
+Time-to-plan for urgent issues under a saturated pipeline backlog
+
+Floods the agent pipeline with a bulk import of low-priority reports, then
+submits a trickle of critical safety issues behind them and measures how
+long each group takes to get an action plan (submission -> Planning done).
+Runs once in plain submission order (headstart 0) and once with priority
+scheduling, in-process against the in-memory database and Gemini replay.
+
+Usage (from the backend folder):
+    python -m benchmarks.priority_backlog
+    python -m benchmarks.priority_backlog --bulk 400 --critical 10 --gemini-latency fixed:300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+BULK_TEMPLATES = [
+    ("Graffiti on underpass wall", "Graffiti painted across the underpass walls"),
+    ("Litter along the river path", "Trash and litter collecting along the river walking path"),
+    ("Faded paint on park bench", "The benches in the park need a repaint, paint is faded"),
+]
+
+CRITICAL_TEMPLATES = [
+    ("Gas leak next to school", "Strong smell of gas by the school gate, children are nearby"),
+    ("Live wire down on sidewalk", "Downed power line sparking on the sidewalk after the storm"),
+    ("Sinkhole opening on main road", "A sinkhole is opening on the main road, cars could fall in"),
+]
+
+
+def configure_offline_environment(args):
+    """Point settings at the in-memory database and Gemini replay before agents are imported"""
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ["DATABASE_BACKEND"] = "memory"
+    os.environ.setdefault("GEMINI_MODE", "replay")
+    os.environ["GEMINI_REPLAY_LATENCY"] = args.gemini_latency
+    os.environ["GEMINI_REPLAY_SEED"] = str(args.seed)
+    os.environ["PLAN_REUSE_ENABLED"] = "false"
+
+    from benchmarks.synthetic import generate_volunteers
+    from utils.supabase_client import get_db
+
+    get_db().seed({"volunteers": generate_volunteers(args.volunteers, args.seed)})
+
+
+def summarize_ms(values: list) -> dict:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+    return {"count": len(values), "p50_ms": pick(0.5), "p90_ms": pick(0.9), "max_ms": round(values[-1] * 1000, 1)}
+
+
+def create_issue(title: str, description: str, category: str) -> tuple:
+    """Insert an issue the way POST /api/issues does; returns (id, intake priority)"""
+    import uuid
+    from utils.supabase_client import get_db
+    from utils.triage import pre_score
+
+    triage = pre_score(title, description, category)
+    issue_id = str(uuid.uuid4())
+    get_db().table("issues").insert({
+        "id": issue_id,
+        "title": title,
+        "description": description,
+        "category": category,
+        "location": {"lat": 40.71, "lng": -74.0},
+        "images": [],
+        "status": "pending",
+        "priority": triage["priority"],
+        "created_at": datetime.utcnow().isoformat(),
+        "metadata": {"triage": triage}
+    }).execute()
+    return issue_id, triage["priority"]
+
+
+async def run_mode(name: str, headstart: float, args) -> dict:
+    from agents.pipeline import AgentPipeline
+
+    pipeline = AgentPipeline(
+        discovery_concurrency=args.discovery_concurrency,
+        planning_concurrency=args.planning_concurrency,
+        matching_concurrency=args.matching_concurrency,
+        queue_size=args.queue_size,
+        priority_headstart_seconds=headstart
+    )
+    started = time.monotonic()
+
+    # Bulk import: every report submitted at once, most producers block on the full queue
+    bulk = []
+    for i in range(args.bulk):
+        title, description = BULK_TEMPLATES[i % len(BULK_TEMPLATES)]
+        issue_id, priority = create_issue(f"{title} #{i}", description, "environment")
+        bulk.append(asyncio.create_task(pipeline.submit(issue_id, priority)))
+
+    await asyncio.sleep(args.critical_delay)
+
+    critical = []
+    for i in range(args.critical):
+        title, description = CRITICAL_TEMPLATES[i % len(CRITICAL_TEMPLATES)]
+        issue_id, priority = create_issue(f"{title} #{i}", description, "safety")
+        critical.append(asyncio.create_task(pipeline.submit(issue_id, priority)))
+        await asyncio.sleep(args.critical_interval)
+
+    bulk_jobs = await asyncio.gather(*bulk)
+    critical_jobs = await asyncio.gather(*critical)
+    await asyncio.gather(*(job.wait() for job in bulk_jobs + critical_jobs))
+    elapsed = time.monotonic() - started
+    stats = pipeline.stats()
+    await pipeline.stop()
+
+    def group(jobs):
+        planned = [j.planned_at - j.submitted_at for j in jobs if j.planned_at]
+        return {
+            "jobs": len(jobs),
+            "planned": len(planned),
+            "failed": sum(1 for j in jobs if j.status == "failed"),
+            "time_to_plan": summarize_ms(planned)
+        }
+
+    result = {
+        "mode": name,
+        "priority_headstart_seconds": headstart,
+        "elapsed_s": round(elapsed, 2),
+        "critical": group(critical_jobs),
+        "bulk": group(bulk_jobs),
+        "stages": {k: {m: v[m] for m in ("processed", "avg_queue_wait_ms", "max_queue_wait_ms")} for k, v in stats["stages"].items()}
+    }
+    crit, low = result["critical"]["time_to_plan"], result["bulk"]["time_to_plan"]
+    print(
+        f"   {name}: critical p50 {crit.get('p50_ms')} ms / max {crit.get('max_ms')} ms, "
+        f"bulk p50 {low.get('p50_ms')} ms / max {low.get('max_ms')} ms, total {result['elapsed_s']}s",
+        flush=True
+    )
+    return result
+
+
+async def main_async(args) -> dict:
+    configure_offline_environment(args)
+    from config import get_settings
+
+    headstart = args.headstart if args.headstart is not None else get_settings().pipeline_priority_headstart_seconds
+    print(f"🚦 {args.bulk} bulk + {args.critical} critical issues, Gemini {args.gemini_latency}", flush=True)
+    modes = [await run_mode("fifo", 0.0, args), await run_mode("priority", headstart, args)]
+
+    fifo, prio = (m["critical"]["time_to_plan"] for m in modes)
+    speedup = None
+    if fifo.get("p50_ms") and prio.get("p50_ms"):
+        speedup = round(fifo["p50_ms"] / prio["p50_ms"], 2)
+
+    return {
+        "benchmark": "priority_backlog",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "modes": modes,
+        "critical_p50_speedup": speedup
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time-to-plan for critical issues behind a bulk backlog")
+    parser.add_argument("--bulk", type=int, default=300, help="Low-priority issues submitted at once")
+    parser.add_argument("--critical", type=int, default=9, help="Critical issues submitted after the bulk import")
+    parser.add_argument("--critical-delay", type=float, default=1.0, help="Seconds after the bulk import")
+    parser.add_argument("--critical-interval", type=float, default=0.5, help="Seconds between critical issues")
+    parser.add_argument("--discovery-concurrency", type=int, default=4)
+    parser.add_argument("--planning-concurrency", type=int, default=4)
+    parser.add_argument("--matching-concurrency", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=50)
+    parser.add_argument("--headstart", type=float, help="Priority headstart seconds (default: settings)")
+    parser.add_argument("--volunteers", type=int, default=2000)
+    parser.add_argument("--gemini-latency", default="lognormal:300,0.3", help="Replay latency spec")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    print(f"\n⚡ Critical time-to-plan p50 speedup: {report['critical_p50_speedup']}x")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"priority-backlog-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Startup profiler for the API worker
+
+Measures what a cold worker pays before it can serve traffic:
+    import_time  - `python -X importtime -c "import main"`, broken down by
+                   top-level package (self and cumulative microseconds)
+    first_request - spawns uvicorn and polls GET /health until it answers
+
+Each measurement runs in a fresh interpreter so caches from earlier runs
+don't hide import cost. Placeholder credentials are used, so no network
+or real keys are needed.
+
+Usage (from the backend folder):
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --runs 10 --baseline benchmarks/results/startup-abc1234.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+from benchmarks.matching_benchmark import git_commit
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+PLACEHOLDER_ENV = {
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_ANON_KEY": "startup-profile",
+    "GEMINI_API_KEY": "startup-profile"
+}
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_env() -> dict:
+    env = dict(os.environ)
+    for key, value in PLACEHOLDER_ENV.items():
+        env.setdefault(key, value)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def measure_imports(module: str = "main") -> dict:
+    """Run one cold import under -X importtime and aggregate by top-level package"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=profile_env(), capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    packages = {}
+    ancestors = []
+    # importtime prints children before their parent; reversed, each import follows its importer
+    for line in reversed(proc.stderr.splitlines()):
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, depth, name = int(match.group(1)), int(match.group(2)), len(match.group(3)), match.group(4)
+        top = name.split(".")[0]
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+
+        entry = packages.setdefault(top, {"self_ms": 0.0, "cumulative_ms": 0.0, "modules": 0})
+        entry["self_ms"] += self_us / 1000
+        entry["modules"] += 1
+        # Cumulative time counts once per package, at its outermost import
+        if all(t != top for _, t in ancestors):
+            entry["cumulative_ms"] += cumulative_us / 1000
+        ancestors.append((depth, top))
+
+    total_self_ms = sum(p["self_ms"] for p in packages.values())
+    return {
+        "process_wall_ms": round(wall_ms, 1),
+        "import_self_ms": round(total_self_ms, 1),
+        "modules": sum(p["modules"] for p in packages.values()),
+        "packages": packages
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_request(timeout: float = 60.0) -> float:
+    """Milliseconds from spawning a uvicorn worker until GET /health succeeds"""
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=profile_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited early:\n{proc.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Worker did not answer within the timeout")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def summarize_runs(values: list) -> dict:
+    return {
+        "median_ms": round(statistics.median(values), 1),
+        "min_ms": round(min(values), 1),
+        "max_ms": round(max(values), 1)
+    }
+
+
+def compare_to_baseline(report: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\n📈 Compared to {baseline_path} ({baseline.get('commit')}):")
+    for key in ("import_main", "first_request"):
+        before = baseline[key]["median_ms"]
+        after = report[key]["median_ms"]
+        delta = (after - before) / before if before else 0.0
+        print(f"   {key:>14}: {before} ms -> {after} ms ({delta:+.1%})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile API worker startup")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure per metric")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list in the import breakdown")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure imports")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    import_runs = [measure_imports() for _ in range(args.runs)]
+    # Breakdown from the median run
+    breakdown = sorted(import_runs, key=lambda r: r["process_wall_ms"])[len(import_runs) // 2]
+    packages = sorted(breakdown["packages"].items(), key=lambda kv: kv[1]["cumulative_ms"], reverse=True)
+
+    print(f"⏱️  import main: {breakdown['process_wall_ms']} ms wall, {breakdown['modules']} modules")
+    for name, entry in packages[:args.top]:
+        print(f"   {name:<28} {entry['cumulative_ms']:>8.1f} ms cumulative  {entry['modules']:>4} modules")
+
+    report = {
+        "benchmark": "startup",
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "import_main": {
+            **summarize_runs([r["process_wall_ms"] for r in import_runs]),
+            "modules": breakdown["modules"],
+            "packages": {
+                name: {k: round(v, 1) if isinstance(v, float) else v for k, v in entry.items()}
+                for name, entry in packages
+            }
+        }
+    }
+
+    if not args.skip_server:
+        first_request = [measure_first_request() for _ in range(args.runs)]
+        report["first_request"] = summarize_runs(first_request)
+        print(f"🚀 time to first request: {report['first_request']['median_ms']} ms (median of {args.runs})")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.baseline and "first_request" in report:
+        compare_to_baseline(report, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
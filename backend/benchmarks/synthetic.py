@@ -0,0 +1,139 @@
+"""
+Deterministic synthetic data for benchmarks
+
+Generates volunteers (clustered around a set of city centres, with skills,
+reliability and active workload) and action plans with tasks. The same seed
+always produces the same data, so results are comparable across commits.
+"""
+
+import random
+import uuid
+
+
+SKILL_POOL = [
+    "manual labor", "coordination", "communication", "logistics", "documentation",
+    "assessment", "planning", "cleanup", "construction", "gardening", "painting",
+    "social media", "first aid", "driving", "cooking", "teaching", "photography",
+    "carpentry", "plumbing", "electrical", "fundraising", "translation", "tech support",
+    "event planning", "maintenance", "counseling", "data entry", "design", "legal", "medical"
+]
+
+CITY_CENTERS = [
+    (40.7128, -74.0060), (34.0522, -118.2437), (41.8781, -87.6298), (29.7604, -95.3698),
+    (33.4484, -112.0740), (39.9526, -75.1652), (29.4241, -98.4936), (32.7157, -117.1611),
+    (32.7767, -96.7970), (37.3382, -121.8863), (30.2672, -97.7431), (39.7392, -104.9903),
+    (47.6062, -122.3321), (42.3601, -71.0589), (25.7617, -80.1918), (45.5152, -122.6784),
+    (19.0760, 72.8777), (28.6139, 77.2090), (12.9716, 77.5946), (51.5074, -0.1278)
+]
+
+CATEGORIES = ["environment", "infrastructure", "social", "safety", "civic"]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _skill_weights():
+    # Zipf-like popularity: a few skills are very common, most are rare
+    return [1.0 / (rank + 1) for rank in range(len(SKILL_POOL))]
+
+
+def _location_near(rng: random.Random, center, spread_deg: float) -> dict:
+    lat, lng = center
+    return {
+        "lat": round(lat + rng.gauss(0, spread_deg), 6),
+        "lng": round(lng + rng.gauss(0, spread_deg), 6)
+    }
+
+
+def generate_volunteers(count: int, seed: int = 42) -> list:
+    """Generate `count` volunteer rows shaped like the volunteers table"""
+    rng = random.Random(seed)
+    weights = _skill_weights()
+    volunteers = []
+
+    for i in range(count):
+        skills = set(rng.choices(SKILL_POOL, weights=weights, k=rng.randint(0, 6)))
+        location = None
+        if rng.random() > 0.05:  # 5% never shared a location
+            location = _location_near(rng, rng.choice(CITY_CENTERS), 0.15)
+
+        volunteers.append({
+            "id": _uuid(rng),
+            "name": f"Volunteer {i}",
+            "email": f"volunteer{i}@example.org",
+            "location": location,
+            "skills": sorted(skills),
+            "availability": rng.choice([["Weekends"], ["Weekday evenings"], ["Flexible"], []]),
+            "reliability_score": round(min(1.0, max(0.0, rng.gauss(0.8, 0.1))), 3),
+            "created_at": "2025-01-01T00:00:00"
+        })
+
+    return volunteers
+
+
+def generate_workload(volunteers: list, seed: int = 42) -> dict:
+    """Active assignment counts per volunteer: mostly idle, a long tail of busy people"""
+    rng = random.Random(seed + 1)
+    counts = {}
+    for v in volunteers:
+        r = rng.random()
+        if r < 0.6:
+            continue
+        counts[v["id"]] = 12 if r > 0.98 else rng.randint(1, 9)
+    return counts
+
+
+def generate_plans(count: int, seed: int = 42) -> list:
+    """Generate `count` action plans, each {'plan', 'issue', 'tasks'}"""
+    rng = random.Random(seed + 2)
+    weights = _skill_weights()
+    plans = []
+
+    for i in range(count):
+        location = _location_near(rng, rng.choice(CITY_CENTERS), 0.05)
+        issue = {
+            "id": _uuid(rng),
+            "title": f"Synthetic issue {i}",
+            "description": "Generated for benchmarking the agent pipeline",
+            "category": rng.choice(CATEGORIES),
+            "location": location,
+            "status": "planning",
+            "priority": round(rng.random(), 2),
+            "created_at": "2025-01-01T00:00:00",
+            "metadata": {}
+        }
+        plan = {
+            "id": _uuid(rng),
+            "issue_id": issue["id"],
+            "title": f"Action Plan: {issue['title']}",
+            "status": "draft",
+            "priority": "medium",
+            "required_volunteers": 0,
+            "assigned_volunteers": 0,
+            "progress_percentage": 0.0,
+            "created_at": "2025-01-01T00:00:00",
+            "metadata": {}
+        }
+
+        tasks = []
+        for t in range(rng.randint(3, 7)):
+            tasks.append({
+                "id": _uuid(rng),
+                "action_plan_id": plan["id"],
+                "name": f"Task {t + 1}",
+                "description": "Synthetic task",
+                "required_people": rng.randint(1, 10),
+                "estimated_hours": rng.choice([1.0, 1.5, 2.0, 3.0, 4.0, 6.0]),
+                "status": "pending",
+                "priority": t + 1,
+                "prerequisites": [f"Task {t}"] if t else [],
+                "skills_required": sorted(set(rng.choices(SKILL_POOL, weights=weights, k=rng.randint(1, 3)))),
+                "location": location,
+                "created_at": "2025-01-01T00:00:00"
+            })
+        plan["required_volunteers"] = sum(t["required_people"] for t in tasks)
+
+        plans.append({"plan": plan, "issue": issue, "tasks": tasks})
+
+    return plans
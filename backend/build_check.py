@@ -5,6 +5,11 @@ import os
 # Add current directory to path
 sys.path.append(os.getcwd())
 
+# Clients are created lazily, so placeholder credentials are enough to import everything
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "build-check")
+os.environ.setdefault("GEMINI_API_KEY", "build-check")
+
 print("Checking backend imports and syntax...")
 
 try:
@@ -16,6 +21,11 @@ try:
     from agents import matching_agent, discovery_agent, planning_agent
     print("✅ Successfully imported agents")
     
+    # SDKs are imported lazily by the clients, so check they are installed
+    import google.generativeai
+    import supabase
+    print("✅ Successfully imported Gemini and Supabase SDKs")
+    
     print("\nBackend build check PASSED. Application structure is valid.")
     sys.exit(0)
 except ImportError as e:
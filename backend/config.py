@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -9,8 +10,22 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_anon_key: str
     
+    # "supabase" or "memory" (in-process stand-in for offline profiling/load tests)
+    database_backend: str = "supabase"
+    memory_db_latency_ms: float = 0.0
+    memory_db_latency_jitter_ms: float = 0.0
+    memory_db_seed_path: Optional[str] = None
+    
     # Gemini AI
     gemini_api_key: str
+    gemini_timeout_seconds: float = 60.0
+    
+    # "live", "record" (store fixtures) or "replay" (serve fixtures offline)
+    gemini_mode: str = "live"
+    gemini_fixture_path: str = "fixtures/gemini_fixtures.jsonl.gz"
+    gemini_replay_latency: str = "recorded"
+    gemini_replay_error_rate: float = 0.0
+    gemini_replay_seed: int = 42
     
     # Server
     host: str = "0.0.0.0"
@@ -20,6 +35,82 @@ class Settings(BaseSettings):
     # CORS
     frontend_url: str = "http://localhost:3000"
     
+    # Agent pipeline (workers per stage and bounded queue size)
+    pipeline_discovery_concurrency: int = 8
+    pipeline_planning_concurrency: int = 8
+    pipeline_matching_concurrency: int = 2
+    pipeline_queue_size: int = 100
+    # Seconds of queue time a priority 1.0 issue skips over priority 0.0 ones (0 = FIFO)
+    pipeline_priority_headstart_seconds: float = 600.0
+    batch_default_concurrency: int = 10
+    batch_page_size: int = 200
+    idempotency_key_ttl_seconds: int = 86400
+    
+    # Plan reuse (similarity search over past action plans)
+    plan_reuse_enabled: bool = True
+    plan_reuse_similarity_threshold: float = 0.8
+    plan_reuse_min_confidence: float = 0.75
+    plan_reuse_max_hit_rate: float = 0.9
+    plan_reuse_max_indexed_plans: int = 5000
+    plan_reuse_rebuild_seconds: int = 3600
+    
+    # agent_logs retention (rollup, archive, prune)
+    agent_log_retention_enabled: bool = True
+    agent_log_retention_days: int = 30
+    agent_log_retention_interval_seconds: int = 3600
+    agent_log_retention_max_hours_per_run: int = 168
+    agent_log_archive_dir: str = "archive/agent_logs"
+    agent_log_stats_relative_accuracy: float = 0.01
+    agent_log_stats_max_hours: int = 720
+    agent_log_stats_sync_seconds: int = 60
+    
+    # Assignments with no check-in this long after their scheduled start become no_show
+    no_show_sweep_enabled: bool = True
+    no_show_grace_minutes: int = 30
+    no_show_sweep_interval_seconds: int = 300
+    
+    # Region-sharded matching in worker processes (opt-in)
+    matching_process_pool_enabled: bool = False
+    matching_process_workers: int = 2
+    matching_shard_degrees: float = 0.5
+    matching_shard_region_rings: int = 1
+    matching_shard_refresh_seconds: int = 300
+    
+    # Precomputed top-K shortlists per (skill, map cell) for matching
+    candidate_index_enabled: bool = True
+    candidate_index_top_k: int = 50
+    candidate_index_zoom: int = 11
+    candidate_index_rings: int = 1
+    candidate_index_min_per_person: int = 3
+    candidate_index_sync_seconds: int = 60
+    candidate_index_rebuild_seconds: int = 21600
+    
+    # Volunteer availability (weekly hour slots in local time)
+    matching_availability_enabled: bool = True
+    availability_utc_offset_hours: float = 0.0
+    plan_start_earliest_hour: int = 8
+    plan_start_latest_hour: int = 18
+    plan_start_horizon_days: int = 7
+    
+    # Issue image preprocessing for Discovery
+    discovery_images_enabled: bool = True
+    image_store: str = "auto"  # auto, local, http
+    image_local_root: str = "uploads"
+    # Comma-separated hosts image URLs may point at (default: the SUPABASE_URL host)
+    image_allowed_hosts: str = ""
+    image_cache_dir: str = ".cache/images"
+    image_max_side: int = 768
+    image_jpeg_quality: int = 80
+    image_max_bytes: int = 15_000_000
+    image_max_per_issue: int = 3
+    image_dedupe_distance: int = 6
+    image_process_workers: int = 2
+    image_timeout_seconds: float = 10.0
+    
+    # Issue heatmap grid
+    heatmap_max_zoom: int = 16
+    heatmap_rebuild_seconds: int = 900
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
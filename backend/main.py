@@ -1,7 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from config import get_settings
-from routers import issues, agent_logs, action_plans, volunteers
+from routers import issues, agent_logs, action_plans, volunteers, impact
+from agents.pipeline import get_pipeline
+from utils.log_retention import get_log_retention
+from utils.no_show_sweep import get_no_show_sweep
+from utils.image_pipeline import get_image_pipeline
 
 settings = get_settings()
 
@@ -10,7 +15,8 @@ settings = get_settings()
 app = FastAPI(
     title="WEAVE API",
     description="Community-driven agentic AI platform for coordinated action",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -22,11 +28,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request query counting when running against the in-memory database
+if settings.database_backend == "memory":
+    from utils.memory_db import track_queries
+    
+    @app.middleware("http")
+    async def count_db_queries(request, call_next):
+        with track_queries() as counter:
+            response = await call_next(request)
+        response.headers["X-DB-Query-Count"] = str(counter.count)
+        return response
+
 # Include routers
 app.include_router(issues.router)
 app.include_router(agent_logs.router)
 app.include_router(action_plans.router)
 app.include_router(volunteers.router)
+app.include_router(impact.router)
 
 
 @app.get("/")
@@ -61,6 +79,23 @@ async def startup_event():
     if "your_gemini_api_key_here" in settings.gemini_api_key:
         print("\n\033[93mWARNING: Gemini API Key Missing!\033[0m")
         print("AI features will not work. Update backend/.env with your GEMINI_API_KEY.\n")
+    
+    if settings.agent_log_retention_enabled:
+        get_log_retention().start()
+    if settings.no_show_sweep_enabled:
+        get_no_show_sweep().start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop agent pipeline workers and background jobs"""
+    await get_pipeline().stop()
+    await get_log_retention().stop()
+    await get_no_show_sweep().stop()
+    get_image_pipeline().shutdown()
+    if settings.matching_process_pool_enabled:
+        from agents.matching_pool import get_matching_pool
+        get_matching_pool().shutdown()
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -0,0 +1,76 @@
+-- Materialized per-volunteer workload counter
+--
+-- Keeps volunteer_workload.active_assignments equal to the number of the
+-- volunteer's task_assignments in an active status ('assigned', 'in_progress'),
+-- so matching reads one small row per candidate instead of scanning every
+-- active assignment.
+
+create table if not exists volunteer_workload (
+    volunteer_id uuid primary key references volunteers(id) on delete cascade,
+    active_assignments integer not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists volunteer_workload_active_idx
+    on volunteer_workload (active_assignments)
+    where active_assignments > 0;
+
+create or replace function bump_volunteer_workload(v_id uuid, delta integer)
+returns void
+language plpgsql
+as $$
+begin
+    insert into volunteer_workload (volunteer_id, active_assignments, updated_at)
+    values (v_id, greatest(delta, 0), now())
+    on conflict (volunteer_id) do update
+        set active_assignments = greatest(volunteer_workload.active_assignments + delta, 0),
+            updated_at = now();
+end;
+$$;
+
+create or replace function task_assignments_workload_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+    old_active boolean := false;
+    new_active boolean := false;
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        old_active := old.status in ('assigned', 'in_progress');
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        new_active := new.status in ('assigned', 'in_progress');
+    end if;
+
+    if tg_op = 'UPDATE' and old.volunteer_id is distinct from new.volunteer_id then
+        if old_active then
+            perform bump_volunteer_workload(old.volunteer_id, -1);
+        end if;
+        if new_active then
+            perform bump_volunteer_workload(new.volunteer_id, 1);
+        end if;
+    elsif old_active and not new_active then
+        perform bump_volunteer_workload(old.volunteer_id, -1);
+    elsif new_active and not old_active then
+        perform bump_volunteer_workload(new.volunteer_id, 1);
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists task_assignments_workload on task_assignments;
+create trigger task_assignments_workload
+    after insert or delete or update of status, volunteer_id on task_assignments
+    for each row execute function task_assignments_workload_trigger();
+
+-- Backfill from existing assignments (safe to re-run)
+insert into volunteer_workload (volunteer_id, active_assignments, updated_at)
+select volunteer_id, count(*), now()
+from task_assignments
+where status in ('assigned', 'in_progress')
+group by volunteer_id
+on conflict (volunteer_id) do update
+    set active_assignments = excluded.active_assignments,
+        updated_at = now();
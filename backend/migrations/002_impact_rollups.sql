@@ -0,0 +1,198 @@
+-- Impact rollups per issue category
+--
+-- Trigger-maintained counters behind GET /api/impact, so the dashboard reads
+-- one row per category instead of every issue, plan and assignment.
+-- Resolved issues: status 'completed' or 'verified'.
+-- Volunteer hours: tasks.estimated_hours of each completed assignment.
+
+create table if not exists impact_rollups (
+    category text primary key,
+    issues_total integer not null default 0,
+    issues_resolved integer not null default 0,
+    plans_total integer not null default 0,
+    plans_completed integer not null default 0,
+    assignments_total integer not null default 0,
+    assignments_completed integer not null default 0,
+    volunteer_hours numeric not null default 0,
+    verifications_total integer not null default 0,
+    verifications_approved integer not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create or replace function bump_impact_rollup(cat text, col text, delta numeric)
+returns void
+language plpgsql
+as $$
+begin
+    if delta = 0 then
+        return;
+    end if;
+    insert into impact_rollups (category) values (coalesce(cat, 'other'))
+    on conflict (category) do nothing;
+    execute format(
+        'update impact_rollups set %I = %I + $1, updated_at = now() where category = $2',
+        col, col
+    ) using delta, coalesce(cat, 'other');
+end;
+$$;
+
+create or replace function plan_category(plan_id uuid)
+returns text
+language sql
+stable
+as $$
+    select i.category from action_plans p join issues i on i.id = p.issue_id where p.id = plan_id;
+$$;
+
+-- Issues: totals and resolved counts, moving between categories on re-classification
+create or replace function issues_impact_trigger()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_impact_rollup(old.category, 'issues_total', -1);
+        perform bump_impact_rollup(old.category, 'issues_resolved',
+            case when old.status in ('completed', 'verified') then -1 else 0 end);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_impact_rollup(new.category, 'issues_total', 1);
+        perform bump_impact_rollup(new.category, 'issues_resolved',
+            case when new.status in ('completed', 'verified') then 1 else 0 end);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists issues_impact on issues;
+create trigger issues_impact
+    after insert or delete or update of status, category on issues
+    for each row execute function issues_impact_trigger();
+
+-- Action plans
+create or replace function action_plans_impact_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+    cat text := (select category from issues where id = coalesce(new.issue_id, old.issue_id));
+begin
+    if tg_op = 'INSERT' then
+        perform bump_impact_rollup(cat, 'plans_total', 1);
+    elsif tg_op = 'DELETE' then
+        perform bump_impact_rollup(cat, 'plans_total', -1);
+    end if;
+    perform bump_impact_rollup(cat, 'plans_completed',
+        (case when tg_op <> 'DELETE' and new.status = 'completed' then 1 else 0 end)
+        - (case when tg_op <> 'INSERT' and old.status = 'completed' then 1 else 0 end));
+    return null;
+end;
+$$;
+
+drop trigger if exists action_plans_impact on action_plans;
+create trigger action_plans_impact
+    after insert or delete or update of status on action_plans
+    for each row execute function action_plans_impact_trigger();
+
+-- Task assignments: totals, completions and volunteer hours
+create or replace function task_assignments_impact_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+    t record;
+    was_done integer := 0;
+    is_done integer := 0;
+begin
+    select tk.estimated_hours, plan_category(tk.action_plan_id) as category
+      into t
+      from tasks tk where tk.id = coalesce(new.task_id, old.task_id);
+
+    if tg_op <> 'INSERT' and old.status = 'completed' then was_done := 1; end if;
+    if tg_op <> 'DELETE' and new.status = 'completed' then is_done := 1; end if;
+
+    if tg_op = 'INSERT' then
+        perform bump_impact_rollup(t.category, 'assignments_total', 1);
+    elsif tg_op = 'DELETE' then
+        perform bump_impact_rollup(t.category, 'assignments_total', -1);
+    end if;
+    perform bump_impact_rollup(t.category, 'assignments_completed', is_done - was_done);
+    perform bump_impact_rollup(t.category, 'volunteer_hours', (is_done - was_done) * coalesce(t.estimated_hours, 0));
+    return null;
+end;
+$$;
+
+drop trigger if exists task_assignments_impact on task_assignments;
+create trigger task_assignments_impact
+    after insert or delete or update of status on task_assignments
+    for each row execute function task_assignments_impact_trigger();
+
+-- Impact verifications
+create or replace function impact_verifications_impact_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+    cat text := plan_category(coalesce(new.action_plan_id, old.action_plan_id));
+begin
+    if tg_op = 'INSERT' then
+        perform bump_impact_rollup(cat, 'verifications_total', 1);
+    elsif tg_op = 'DELETE' then
+        perform bump_impact_rollup(cat, 'verifications_total', -1);
+    end if;
+    perform bump_impact_rollup(cat, 'verifications_approved',
+        (case when tg_op <> 'DELETE' and new.verification_status in ('approved', 'verified') then 1 else 0 end)
+        - (case when tg_op <> 'INSERT' and old.verification_status in ('approved', 'verified') then 1 else 0 end));
+    return null;
+end;
+$$;
+
+drop trigger if exists impact_verifications_impact on impact_verifications;
+create trigger impact_verifications_impact
+    after insert or delete or update of verification_status on impact_verifications
+    for each row execute function impact_verifications_impact_trigger();
+
+-- Full rebuild from source tables (backfill, or repair after manual edits)
+create or replace function refresh_impact_rollups()
+returns void
+language sql
+as $$
+    delete from impact_rollups;
+
+    insert into impact_rollups (category, issues_total, issues_resolved)
+    select coalesce(category, 'other'), count(*), count(*) filter (where status in ('completed', 'verified'))
+    from issues group by 1;
+
+    insert into impact_rollups (category, plans_total, plans_completed)
+    select coalesce(i.category, 'other'), count(*), count(*) filter (where p.status = 'completed')
+    from action_plans p left join issues i on i.id = p.issue_id group by 1
+    on conflict (category) do update
+        set plans_total = excluded.plans_total, plans_completed = excluded.plans_completed;
+
+    insert into impact_rollups (category, assignments_total, assignments_completed, volunteer_hours)
+    select coalesce(i.category, 'other'), count(*),
+           count(*) filter (where a.status = 'completed'),
+           coalesce(sum(t.estimated_hours) filter (where a.status = 'completed'), 0)
+    from task_assignments a
+    join tasks t on t.id = a.task_id
+    left join action_plans p on p.id = t.action_plan_id
+    left join issues i on i.id = p.issue_id
+    group by 1
+    on conflict (category) do update
+        set assignments_total = excluded.assignments_total,
+            assignments_completed = excluded.assignments_completed,
+            volunteer_hours = excluded.volunteer_hours;
+
+    insert into impact_rollups (category, verifications_total, verifications_approved)
+    select coalesce(i.category, 'other'), count(*),
+           count(*) filter (where v.verification_status in ('approved', 'verified'))
+    from impact_verifications v
+    left join action_plans p on p.id = v.action_plan_id
+    left join issues i on i.id = p.issue_id
+    group by 1
+    on conflict (category) do update
+        set verifications_total = excluded.verifications_total,
+            verifications_approved = excluded.verifications_approved;
+$$;
+
+select refresh_impact_rollups();
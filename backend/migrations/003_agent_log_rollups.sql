@@ -0,0 +1,38 @@
+-- Hourly agent_logs rollups and retention support
+--
+-- The retention job (utils/log_retention.py) rolls complete hours older than
+-- AGENT_LOG_RETENTION_DAYS into one row per (hour, agent_type, action),
+-- archives the raw rows to compressed NDJSON files and deletes them from
+-- agent_logs. Rollup rows are recomputed from the full hour each time, so
+-- re-running a partially finished hour is safe.
+
+create table if not exists agent_log_rollups (
+    hour timestamptz not null,
+    agent_type text not null,
+    action text not null,
+    count integer not null default 0,
+    success_count integer not null default 0,
+    fallback_count integer not null default 0,
+    confidence_sum double precision not null default 0,
+    confidence_count integer not null default 0,
+    latency_count integer not null default 0,
+    latency_sum_ms bigint not null default 0,
+    latency_min_ms integer,
+    latency_max_ms integer,
+    latency_p50_ms integer,
+    latency_p90_ms integer,
+    latency_p99_ms integer,
+    archive_path text,
+    rolled_up_at timestamptz not null default now(),
+    primary key (hour, agent_type, action)
+);
+
+create index if not exists agent_log_rollups_agent_hour_idx
+    on agent_log_rollups (agent_type, hour desc);
+
+-- Keep the hot-table listing and retention scans on an index
+create index if not exists agent_logs_created_at_idx
+    on agent_logs (created_at desc);
+
+create index if not exists agent_logs_agent_type_created_at_idx
+    on agent_logs (agent_type, created_at desc);
@@ -0,0 +1,106 @@
+-- Event-driven volunteer reliability
+--
+-- Each assignment outcome updates the volunteer's exponentially decayed
+-- success/failure weights in O(1), and the resulting score is copied to
+-- volunteers.reliability_score so matching always reads a fresh value.
+--
+--   completed          success 1.0
+--   no_show            failure 1.0
+--   dropped, withdrawn failure 0.5
+--
+-- Weights halve every 180 days. The score is a Beta-style estimate pulled
+-- towards a 0.8 prior with the weight of 2 outcomes, so volunteers with no
+-- history keep the old default. Keep these constants in sync with
+-- utils/reliability.py, which also backfills this table from history
+-- (POST /api/volunteers/reliability/backfill).
+
+create table if not exists volunteer_reliability (
+    volunteer_id uuid primary key references volunteers(id) on delete cascade,
+    completed_weight double precision not null default 0,
+    failed_weight double precision not null default 0,
+    score double precision not null default 0.8,
+    last_event_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+create or replace function reliability_outcome_weights(status text, out success double precision, out failure double precision)
+language sql
+immutable
+as $$
+    select case status when 'completed' then 1.0 else 0.0 end,
+           case status when 'no_show' then 1.0 when 'dropped' then 0.5 when 'withdrawn' then 0.5 else 0.0 end;
+$$;
+
+create or replace function record_reliability_event(v_id uuid, success double precision, failure double precision, event_at timestamptz default now())
+returns void
+language plpgsql
+as $$
+declare
+    half_life_seconds constant double precision := 180 * 86400;
+    prior constant double precision := 0.8;
+    prior_strength constant double precision := 2.0;
+begin
+    insert into volunteer_reliability (volunteer_id, last_event_at)
+    values (v_id, event_at)
+    on conflict (volunteer_id) do nothing;
+
+    update volunteer_reliability r
+    set completed_weight = r.completed_weight * d.decay + success,
+        failed_weight = r.failed_weight * d.decay + failure,
+        score = (r.completed_weight * d.decay + success + prior * prior_strength)
+              / (r.completed_weight * d.decay + success + r.failed_weight * d.decay + failure + prior_strength),
+        last_event_at = greatest(r.last_event_at, event_at),
+        updated_at = now()
+    from (
+        select exp(-ln(2) * greatest(extract(epoch from (event_at - last_event_at)), 0) / half_life_seconds) as decay
+        from volunteer_reliability
+        where volunteer_id = v_id
+        for update
+    ) d
+    where r.volunteer_id = v_id;
+end;
+$$;
+
+create or replace function task_assignments_reliability_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+    w record;
+begin
+    if tg_op = 'UPDATE' and old.status is not distinct from new.status then
+        return null;
+    end if;
+
+    select * into w from reliability_outcome_weights(new.status);
+    if w.success > 0 or w.failure > 0 then
+        perform record_reliability_event(new.volunteer_id, w.success, w.failure, now());
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists task_assignments_reliability on task_assignments;
+create trigger task_assignments_reliability
+    after insert or update of status on task_assignments
+    for each row execute function task_assignments_reliability_trigger();
+
+-- Copy scores (from events or the backfill job) onto the volunteer row
+create or replace function volunteer_reliability_sync_trigger()
+returns trigger
+language plpgsql
+as $$
+begin
+    update volunteers
+    set reliability_score = round(new.score::numeric, 4)
+    where id = new.volunteer_id
+      and reliability_score is distinct from round(new.score::numeric, 4);
+    return null;
+end;
+$$;
+
+drop trigger if exists volunteer_reliability_sync on volunteer_reliability;
+create trigger volunteer_reliability_sync
+    after insert or update of score on volunteer_reliability
+    for each row execute function volunteer_reliability_sync_trigger();
@@ -0,0 +1,14 @@
+-- Structured check-in / check-out fields on task_assignments
+--
+-- Check-in and check-out used to be JSON strings packed into notes, so every
+-- check-out read the row before writing it. The bulk endpoints under
+-- /api/volunteers/assignments write these columns directly (started_at and
+-- completed_at hold the check-in and check-out times).
+
+alter table task_assignments add column if not exists check_in_location jsonb;
+alter table task_assignments add column if not exists check_out_location jsonb;
+alter table task_assignments add column if not exists completion_notes text;
+alter table task_assignments add column if not exists status_updated_at timestamptz;
+
+create index if not exists task_assignments_task_status_idx
+    on task_assignments (task_id, status);
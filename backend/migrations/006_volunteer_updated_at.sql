@@ -0,0 +1,26 @@
+-- Change tracking on volunteers
+--
+-- The matching candidate index (agents/candidate_index.py) keeps top-K
+-- volunteer lists per skill and map cell. Between full rebuilds it only
+-- re-reads volunteers whose updated_at moved past its last sync, which
+-- includes reliability_score changes copied in by
+-- 004_volunteer_reliability.sql.
+
+alter table volunteers add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists volunteers_updated_at_idx on volunteers (updated_at);
+
+create or replace function volunteers_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists volunteers_touch_updated_at on volunteers;
+create trigger volunteers_touch_updated_at
+    before update on volunteers
+    for each row execute function volunteers_touch_updated_at();
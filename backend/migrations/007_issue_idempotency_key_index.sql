@@ -0,0 +1,10 @@
+-- Index for Idempotency-Key lookups on issue intake
+--
+-- POST /api/issues looks a key up with metadata->>'idempotency_key' whenever
+-- the in-process cache misses (the first request for every key, and any
+-- retry answered by another worker). Without this index each of those
+-- lookups scans the whole issues table.
+
+create index if not exists issues_idempotency_key_idx
+    on issues ((metadata->>'idempotency_key'))
+    where (metadata->>'idempotency_key') is not null;
@@ -0,0 +1,15 @@
+-- Lease rows for background jobs
+--
+-- Each uvicorn worker starts the same background loops. Jobs that must run
+-- in one worker at a time (agent_logs retention, utils/log_retention.py)
+-- renew or take their row here with a conditional update before each run
+-- (utils/job_lease.py); a lease held by a crashed worker expires after
+-- expires_at.
+
+create table if not exists job_leases (
+    name text primary key,
+    holder text,
+    expires_at timestamptz not null default '-infinity'
+);
+
+insert into job_leases (name) values ('agent_log_retention') on conflict (name) do nothing;
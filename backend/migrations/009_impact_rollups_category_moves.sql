@@ -0,0 +1,68 @@
+-- Move dependent impact counts when an issue is re-classified
+--
+-- issues_impact_trigger() (002_impact_rollups.sql) moved the issue's own
+-- counts to its new category, but the plans, assignments, volunteer hours
+-- and verifications under the issue stayed counted under the old one, so
+-- both categories drifted until refresh_impact_rollups() was run by hand.
+-- The trigger now moves those too, from one aggregate read per table.
+
+create or replace function issues_impact_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+    plans record;
+    assignments record;
+    verifications record;
+    moves text[][];
+    i integer;
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_impact_rollup(old.category, 'issues_total', -1);
+        perform bump_impact_rollup(old.category, 'issues_resolved',
+            case when old.status in ('completed', 'verified') then -1 else 0 end);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_impact_rollup(new.category, 'issues_total', 1);
+        perform bump_impact_rollup(new.category, 'issues_resolved',
+            case when new.status in ('completed', 'verified') then 1 else 0 end);
+    end if;
+
+    if tg_op = 'UPDATE' and coalesce(old.category, 'other') <> coalesce(new.category, 'other') then
+        select count(*) as total, count(*) filter (where p.status = 'completed') as completed
+          into plans
+          from action_plans p where p.issue_id = new.id;
+
+        select count(*) as total,
+               count(*) filter (where a.status = 'completed') as completed,
+               coalesce(sum(t.estimated_hours) filter (where a.status = 'completed'), 0) as hours
+          into assignments
+          from task_assignments a
+          join tasks t on t.id = a.task_id
+          join action_plans p on p.id = t.action_plan_id
+         where p.issue_id = new.id;
+
+        select count(*) as total,
+               count(*) filter (where v.verification_status in ('approved', 'verified')) as approved
+          into verifications
+          from impact_verifications v
+          join action_plans p on p.id = v.action_plan_id
+         where p.issue_id = new.id;
+
+        moves := array[
+            ['plans_total', plans.total::text],
+            ['plans_completed', plans.completed::text],
+            ['assignments_total', assignments.total::text],
+            ['assignments_completed', assignments.completed::text],
+            ['volunteer_hours', assignments.hours::text],
+            ['verifications_total', verifications.total::text],
+            ['verifications_approved', verifications.approved::text]
+        ];
+        for i in 1 .. array_length(moves, 1) loop
+            perform bump_impact_rollup(old.category, moves[i][1], -moves[i][2]::numeric);
+            perform bump_impact_rollup(new.category, moves[i][1], moves[i][2]::numeric);
+        end loop;
+    end if;
+    return null;
+end;
+$$;
@@ -0,0 +1,8 @@
+-- Lease row for the no-show sweep
+--
+-- utils/no_show_sweep.py marks assignments with no check-in past their
+-- scheduled start as 'no_show' (so 004_volunteer_reliability.sql records
+-- the failure). Every worker starts the sweep loop; this row in
+-- job_leases (008_job_leases.sql) lets one of them run it at a time.
+
+insert into job_leases (name) values ('no_show_sweep') on conflict (name) do nothing;
@@ -29,6 +29,16 @@ class IssueResponse(BaseModel):
     metadata: Optional[dict] = {}
 
 
+class IssueBatchProcessRequest(BaseModel):
+    """Schema for re-running the agent pipeline over many issues"""
+    issue_ids: Optional[List[str]] = None
+    status: Optional[str] = None
+    category: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    concurrency: Optional[int] = Field(default=None, ge=1, le=100)
+
+
 # Action Plans
 class ActionPlanResponse(BaseModel):
     """Schema for action plan response"""
@@ -74,6 +84,34 @@ class VolunteerResponse(BaseModel):
     created_at: str
 
 
+# Task Assignments
+class AssignmentStatusUpdate(BaseModel):
+    """One assignment status transition"""
+    assignment_id: str
+    status: str
+    location: Optional[dict] = None  # {lat, lng, address} for check-in/check-out
+    notes: Optional[str] = None
+    at: Optional[datetime] = None
+
+
+class AssignmentStatusBatch(BaseModel):
+    """Schema for bulk assignment status transitions"""
+    updates: List[AssignmentStatusUpdate] = Field(..., min_length=1, max_length=1000)
+
+
+class AssignmentCheckEvent(BaseModel):
+    """One volunteer checking in to or out of an assignment"""
+    assignment_id: str
+    location: Optional[dict] = None  # {lat, lng, address}
+    notes: Optional[str] = None
+    at: Optional[datetime] = None
+
+
+class AssignmentCheckBatch(BaseModel):
+    """Schema for bulk check-in / check-out"""
+    events: List[AssignmentCheckEvent] = Field(..., min_length=1, max_length=1000)
+
+
 # Agent Logs
 class AgentLog(BaseModel):
     """Schema for agent execution log"""
@@ -1,18 +1,25 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from utils.supabase_client import get_db
+from utils.plan_index import get_plan_index
+from agents.scheduler import schedule_tasks
+from utils.projection import build_select, ACTION_PLAN_COLUMNS, ACTION_PLAN_LIST_FIELDS, ACTION_PLAN_RELATIONS
 
 router = APIRouter(prefix="/api/action-plans", tags=["Action Plans"])
 
 
 @router.get("")
-async def get_action_plans(status: str = None, limit: int = 50):
+async def get_action_plans(status: str = None, limit: int = 50, fields: str = None):
     """
     Get all action plans, optionally filtered by status
+    `fields` picks columns (comma-separated, or * for all); metadata is left out by default
     """
     try:
         db = get_db()
         
-        query = db.table("action_plans").select("*, issues(title, category, location)")
+        query = db.table("action_plans").select(
+            build_select(fields, ACTION_PLAN_COLUMNS, ACTION_PLAN_LIST_FIELDS, ACTION_PLAN_RELATIONS)
+        )
         
         if status:
             query = query.eq("status", status)
@@ -21,15 +28,25 @@ async def get_action_plans(status: str = None, limit: int = 50):
         
         result = query.execute()
         
-        return {
+        return ORJSONResponse({
             "action_plans": result.data,
             "count": len(result.data)
-        }
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/reuse/stats")
+async def get_plan_reuse_stats():
+    """
+    Get hit rate and size of the plan reuse similarity index
+    """
+    return get_plan_index().stats()
+
+
 @router.get("/{plan_id}")
 async def get_action_plan(plan_id: str):
     """
@@ -103,3 +120,28 @@ async def get_plan_tasks(plan_id: str):
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{plan_id}/schedule")
+async def get_plan_schedule(plan_id: str):
+    """
+    Get the prerequisite-ordered schedule for a plan's tasks
+    Includes per-task time windows, slack and the critical path
+    """
+    try:
+        db = get_db()
+        
+        tasks_result = db.table("tasks").select("id, name, estimated_hours, prerequisites, required_people, status").eq("action_plan_id", plan_id).execute()
+        
+        if not tasks_result.data:
+            raise HTTPException(status_code=404, detail="No tasks found for this action plan")
+        
+        return {
+            "action_plan_id": plan_id,
+            **schedule_tasks(tasks_result.data)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
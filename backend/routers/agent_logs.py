@@ -1,18 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from utils.supabase_client import get_db
+from utils.projection import build_select, AGENT_LOG_COLUMNS, AGENT_LOG_LIST_FIELDS
+from utils.log_retention import get_log_retention, parse_timestamp
+from utils.agent_log_stats import get_agent_log_stats
+from config import get_settings
+import asyncio
 
 router = APIRouter(prefix="/api/agent-logs", tags=["Agent Logs"])
 
 
 @router.get("")
-async def get_agent_logs(limit: int = 50, agent_type: str = None):
+async def get_agent_logs(limit: int = 50, agent_type: str = None, fields: str = None):
     """
     Get agent execution logs for observability
+    `fields` picks columns (comma-separated, or * for all); input/output payloads are left out by default
     """
     try:
         db = get_db()
         
-        query = db.table("agent_logs").select("*")
+        query = db.table("agent_logs").select(build_select(fields, AGENT_LOG_COLUMNS, AGENT_LOG_LIST_FIELDS))
         
         if agent_type:
             query = query.eq("agent_type", agent_type)
@@ -21,11 +28,116 @@ async def get_agent_logs(limit: int = 50, agent_type: str = None):
         
         result = query.execute()
         
-        return {
+        return ORJSONResponse({
             "logs": result.data,
             "count": len(result.data)
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stats")
+async def get_agent_log_stats_summary(
+    agent_type: str = None,
+    since: str = None,
+    until: str = None,
+    bucket: str = Query("hour", pattern="^(hour|day|all)$")
+):
+    """
+    Get p50/p90/p99 execution time, success rate, fallback rate and average
+    confidence per agent type and time bucket
+    Served from streaming quantile sketches (about 1% relative error)
+    """
+    try:
+        stats = get_agent_log_stats()
+        await stats.ensure_built(get_settings().agent_log_stats_sync_seconds)
+        
+        try:
+            since_at = parse_timestamp(since) if since else None
+            until_at = parse_timestamp(until) if until else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="since/until must be ISO timestamps")
+        
+        return {
+            "bucket": bucket,
+            "agents": stats.query(agent_type, since_at, until_at, bucket),
+            "relative_accuracy": stats.relative_accuracy
         }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/rollups")
+async def get_agent_log_rollups(
+    agent_type: str = None,
+    action: str = None,
+    since: str = None,
+    until: str = None,
+    limit: int = 168
+):
+    """
+    Get hourly aggregates of agent executions that have aged out of agent_logs
+    Filter by agent_type/action and an hour range (ISO timestamps)
+    """
+    try:
+        db = get_db()
+        
+        query = db.table("agent_log_rollups").select("*")
+        
+        if agent_type:
+            query = query.eq("agent_type", agent_type)
+        if action:
+            query = query.eq("action", action)
+        if since:
+            query = query.gte("hour", since)
+        if until:
+            query = query.lt("hour", until)
+        
+        result = query.order("hour", desc=True).limit(limit).execute()
+        
+        rollups = []
+        for row in result.data:
+            count = row.get("count") or 0
+            latency_count = row.get("latency_count") or 0
+            confidence_count = row.get("confidence_count") or 0
+            rollups.append({
+                **row,
+                "success_rate": round(row["success_count"] / count, 4) if count else None,
+                "fallback_rate": round(row["fallback_count"] / count, 4) if count else None,
+                "avg_latency_ms": round(row["latency_sum_ms"] / latency_count, 1) if latency_count else None,
+                "avg_confidence": round(row["confidence_sum"] / confidence_count, 4) if confidence_count else None
+            })
+        
+        return ORJSONResponse({
+            "rollups": rollups,
+            "count": len(rollups)
+        })
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/retention")
+async def get_retention_status():
+    """
+    Get the agent_logs retention job status
+    """
+    return get_log_retention().stats()
+
+
+@router.post("/retention/run")
+async def run_retention():
+    """
+    Roll up, archive and prune expired agent_logs now instead of waiting for the next cycle
+    """
+    try:
+        return await asyncio.to_thread(get_log_retention().run_once)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
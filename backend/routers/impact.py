@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException
+from utils.supabase_client import get_db
+
+router = APIRouter(prefix="/api/impact", tags=["Impact"])
+
+ROLLUP_COUNTERS = [
+    "issues_total",
+    "issues_resolved",
+    "plans_total",
+    "plans_completed",
+    "assignments_total",
+    "assignments_completed",
+    "volunteer_hours",
+    "verifications_total",
+    "verifications_approved"
+]
+
+
+def _rate(part, whole) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+def summarize_rollup(row: dict) -> dict:
+    """Counters for one category (or the totals) plus derived rates"""
+    counters = {key: row.get(key) or 0 for key in ROLLUP_COUNTERS}
+    counters["volunteer_hours"] = round(float(counters["volunteer_hours"]), 2)
+    return {
+        **counters,
+        "resolution_rate": _rate(counters["issues_resolved"], counters["issues_total"]),
+        "plan_completion_rate": _rate(counters["plans_completed"], counters["plans_total"]),
+        "assignment_completion_rate": _rate(counters["assignments_completed"], counters["assignments_total"]),
+        "verification_approval_rate": _rate(counters["verifications_approved"], counters["verifications_total"])
+    }
+
+
+@router.get("")
+async def get_impact_summary():
+    """
+    Get platform-wide impact: issues resolved, volunteer hours, completion
+    and verification rates, overall and per category
+
+    Reads the trigger-maintained impact_rollups table (one row per category),
+    so the cost does not grow with history.
+    """
+    try:
+        db = get_db()
+        
+        result = db.table("impact_rollups").select("*").order("category").execute()
+        
+        totals = {key: 0 for key in ROLLUP_COUNTERS}
+        by_category = {}
+        last_updated = None
+        for row in result.data:
+            for key in ROLLUP_COUNTERS:
+                totals[key] += row.get(key) or 0
+            by_category[row['category']] = summarize_rollup(row)
+            if row.get('updated_at') and (last_updated is None or row['updated_at'] > last_updated):
+                last_updated = row['updated_at']
+        
+        return {
+            "totals": summarize_rollup(totals),
+            "by_category": by_category,
+            "updated_at": last_updated
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,106 +1,144 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from models.database import IssueCreate, IssueResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Header
+from fastapi.responses import ORJSONResponse
+from models.database import IssueCreate, IssueResponse, IssueBatchProcessRequest
 from utils.supabase_client import get_db
-from agents.discovery_agent import analyze_issue
-from agents.planning_agent import create_action_plan
+from utils.geo_grid import get_geo_grid, record_issue_location
+from utils.projection import build_select, ISSUE_COLUMNS, ISSUE_LIST_FIELDS
+from utils.idempotency import get_idempotency_cache, intake_flights
+from utils.triage import pre_score
+from config import get_settings
+from agents.pipeline import get_pipeline
+from agents import batch_processor
 from datetime import datetime
+from typing import Optional
 import uuid
 
 router = APIRouter(prefix="/api/issues", tags=["Issues"])
 
 
-async def process_issue_with_agents(issue_id: str):
+async def process_issue_with_agents(issue_id: str, priority: float = None) -> dict:
     """
-    Background task to process issue through AI agents
+    Run an issue through the agent pipeline and wait for it to finish
+    """
+    job = await get_pipeline().submit(issue_id, priority)
+    await job.wait()
+    return job.to_dict()
+
+
+async def queue_issue_for_agents(issue_id: str, priority: float = None):
+    """
+    Background task to hand an issue to the agent pipeline
+    Returns once the issue is queued; the pipeline workers do the rest
     """
     try:
-        # Phase 2: Discovery Agent
-        print(f"🤖 Starting Discovery Agent for issue {issue_id}")
-        discovery_result = await analyze_issue(issue_id)
-        print(f"✅ Discovery Agent completed: {discovery_result.get('success', False)}")
-        
-        # Phase 3: Planning Agent (only if discovery succeeded AND issue is valid)
-        discovery_analysis = discovery_result.get('analysis', {})
-        is_valid = discovery_analysis.get('is_valid', True)
-        
-        if discovery_result.get('success') and is_valid:
-            print(f"📋 Starting Planning Agent for issue {issue_id}")
-            planning_result = await create_action_plan(issue_id)
-            print(f"✅ Planning Agent completed: {planning_result.get('success', False)}")
-            
-            # Phase 4: Matching Agent (if planning succeeded)
-            if planning_result.get('success'):
-                from agents.matching_agent import match_volunteers_to_tasks
-                
-                # Extract action_plan_id handling both new and existing plan formats
-                action_plan_id = None
-                if 'action_plan' in planning_result:
-                    action_plan_id = planning_result['action_plan'].get('id')
-                elif 'action_plan_id' in planning_result:
-                     action_plan_id = planning_result['action_plan_id']
-                
-                if action_plan_id:
-                    print(f"👥 Starting Matching Agent for action plan {action_plan_id}")
-                    matching_result = await match_volunteers_to_tasks(action_plan_id)
-                    print(f"✅ Matching Agent completed: {matching_result.get('success', False)}")
-                    if matching_result.get('success'):
-                        summary = matching_result.get('summary', {})
-                        print(f"   📊 Assigned {summary.get('total_assignments_made', 0)} volunteers to {summary.get('tasks_fully_assigned', 0)}/{summary.get('total_tasks', 0)} tasks")
-                else:
-                    print("⚠️ Could not find action_plan_id to trigger matching")
-        
+        await get_pipeline().submit(issue_id, priority)
     except Exception as e:
-        print(f"❌ Agent processing failed: {e}")
+        print(f"❌ Failed to queue issue {issue_id} for agent processing: {e}")
+
+
+async def insert_issue(issue: IssueCreate, idempotency_key: str = None) -> dict:
+    """Insert a new issue row and add it to the heatmap grid"""
+    db = get_db()
+    
+    # Keyword/category pre-score orders the issue in the pipeline until Discovery re-scores it
+    triage = pre_score(issue.title, issue.description, issue.category)
+    metadata = {"triage": triage}
+    if idempotency_key:
+        metadata["idempotency_key"] = idempotency_key
+    
+    # Prepare issue data
+    issue_data = {
+        "id": str(uuid.uuid4()),
+        "title": issue.title,
+        "description": issue.description,
+        "category": issue.category,
+        "location": issue.location,
+        "images": issue.images or [],
+        "status": "pending",
+        "priority": triage["priority"],
+        "created_at": datetime.utcnow().isoformat(),
+        "metadata": metadata
+    }
+    
+    # Insert into database
+    result = db.table("issues").insert(issue_data).execute()
+    
+    if not result.data:
+        raise HTTPException(status_code=500, detail="Failed to create issue")
+    
+    created_issue = result.data[0]
+    record_issue_location(created_issue)
+    return created_issue
+
+
+async def find_or_insert_issue(issue: IssueCreate, idempotency_key: str) -> tuple:
+    """
+    Return (issue, created) for a request carrying an Idempotency-Key
+    
+    A key seen before returns the issue it created, found through the
+    in-process cache or metadata->>idempotency_key in the database.
+    """
+    db = get_db()
+    cache = get_idempotency_cache()
+    
+    issue_id = cache.get(idempotency_key)
+    if issue_id:
+        query = db.table("issues").select("*").eq("id", issue_id)
+    else:
+        query = db.table("issues").select("*").eq("metadata->>idempotency_key", idempotency_key)
+    existing = query.limit(1).execute().data
+    if existing:
+        cache.put(idempotency_key, existing[0]["id"])
+        return existing[0], False
+    
+    created_issue = await insert_issue(issue, idempotency_key)
+    cache.put(idempotency_key, created_issue["id"])
+    return created_issue, True
 
 
 @router.post("", response_model=IssueResponse, status_code=201)
-async def create_issue(issue: IssueCreate, background_tasks: BackgroundTasks):
+async def create_issue(
+    issue: IssueCreate,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, max_length=255)
+):
     """
     Create a new community issue and trigger agent processing
+    Retries with the same Idempotency-Key header return the original issue
     """
     try:
-        db = get_db()
-        
-        # Prepare issue data
-        issue_data = {
-            "id": str(uuid.uuid4()),
-            "title": issue.title,
-            "description": issue.description,
-            "category": issue.category,
-            "location": issue.location,
-            "images": issue.images or [],
-            "status": "pending",
-            "priority": 0.5,
-            "created_at": datetime.utcnow().isoformat(),
-            "metadata": {}
-        }
-        
-        # Insert into database
-        result = db.table("issues").insert(issue_data).execute()
+        if idempotency_key:
+            # Requests that join an in-flight creation get its issue but didn't create it
+            joined = intake_flights.is_in_flight(idempotency_key)
+            created_issue, created = await intake_flights.do(
+                idempotency_key, find_or_insert_issue, issue, idempotency_key
+            )
+            created = created and not joined
+        else:
+            created_issue, created = await insert_issue(issue), True
         
-        if not result.data:
-            raise HTTPException(status_code=500, detail="Failed to create issue")
-        
-        created_issue = result.data[0]
-        
-        # Trigger Discovery Agent in background
-        background_tasks.add_task(process_issue_with_agents, created_issue["id"])
+        # Trigger Discovery Agent in background (the pipeline ignores issues already in flight)
+        if created:
+            background_tasks.add_task(queue_issue_for_agents, created_issue["id"], created_issue.get("priority"))
         
         return created_issue
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("")
-async def get_issues(status: str = None, limit: int = 50):
+async def get_issues(status: str = None, limit: int = 50, fields: str = None):
     """
     Get all issues, optionally filtered by status
+    `fields` picks columns (comma-separated, or * for all); metadata is left out by default
     """
     try:
         db = get_db()
         
-        query = db.table("issues").select("*")
+        query = db.table("issues").select(build_select(fields, ISSUE_COLUMNS, ISSUE_LIST_FIELDS))
         
         if status:
             query = query.eq("status", status)
@@ -109,15 +147,114 @@ async def get_issues(status: str = None, limit: int = 50):
         
         result = query.execute()
         
-        return {
+        return ORJSONResponse({
             "issues": result.data,
             "count": len(result.data)
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/heatmap")
+async def get_issue_heatmap(
+    zoom: int = Query(10, ge=0, le=22),
+    min_lat: float = Query(-85.05, ge=-90, le=90),
+    min_lng: float = Query(-180.0, ge=-180, le=180),
+    max_lat: float = Query(85.05, ge=-90, le=90),
+    max_lng: float = Query(180.0, ge=-180, le=180)
+):
+    """
+    Get issue counts and priority/urgency aggregates per map tile
+    Cells are slippy-map tiles at `zoom` that intersect the bounding box
+    """
+    try:
+        if min_lat > max_lat:
+            raise HTTPException(status_code=400, detail="min_lat must not exceed max_lat")
+        
+        grid = get_geo_grid()
+        await grid.ensure_built(get_settings().heatmap_rebuild_seconds)
+        
+        cells = grid.query(zoom, min_lat, min_lng, max_lat, max_lng)
+        
+        return {
+            "zoom": min(zoom, grid.max_zoom),
+            "cells": cells,
+            "count": len(cells),
+            "issues": sum(c["count"] for c in cells)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/pipeline/stats")
+async def get_pipeline_stats():
+    """
+    Get per-stage throughput and queue wait statistics for the agent pipeline
+    """
+    return get_pipeline().stats()
+
+
+@router.post("/process-batch", response_model=dict, status_code=202)
+async def process_issues_batch(request: IssueBatchProcessRequest):
+    """
+    Re-run AI agent processing for many issues at once
+    Select issues by id list or by status/category/created_at filters
+    """
+    filters = {
+        "status": request.status,
+        "category": request.category,
+        "created_after": request.created_after.isoformat() if request.created_after else None,
+        "created_before": request.created_before.isoformat() if request.created_before else None
+    }
+    filters = {k: v for k, v in filters.items() if v}
+
+    if not request.issue_ids and not filters:
+        raise HTTPException(status_code=400, detail="Provide issue_ids or at least one filter")
+
+    batch = batch_processor.start_batch(filters, request.issue_ids, request.concurrency)
+    return batch.to_dict()
+
+
+@router.get("/process-batch")
+async def get_process_batches():
+    """
+    List tracked batch reprocessing jobs
+    """
+    batches = [b.to_dict() for b in batch_processor.list_batches()]
+    return {
+        "batches": batches,
+        "count": len(batches)
+    }
+
+
+@router.get("/process-batch/{batch_id}")
+async def get_process_batch(batch_id: str):
+    """
+    Get progress, throughput and failures for a batch reprocessing job
+    """
+    batch = batch_processor.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch.to_dict()
+
+
+@router.post("/process-batch/{batch_id}/cancel")
+async def cancel_process_batch(batch_id: str):
+    """
+    Stop feeding new issues from a batch into the pipeline
+    """
+    batch = batch_processor.cancel_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch.to_dict()
+
+
 @router.get("/{issue_id}", response_model=IssueResponse)
 async def get_issue(issue_id: str):
     """
@@ -154,8 +291,18 @@ async def trigger_agent_processing(issue_id: str, background_tasks: BackgroundTa
         if not result.data:
             raise HTTPException(status_code=404, detail="Issue not found")
         
+        # A run already in the pipeline is shared rather than started again
+        running = get_pipeline().active_jobs.get(issue_id)
+        if running is not None and not running.done:
+            return {
+                "success": True,
+                "message": "AI agents already processing this issue",
+                "issue_id": issue_id,
+                "job": running.to_dict()
+            }
+        
         # Trigger agent processing in background
-        background_tasks.add_task(process_issue_with_agents, issue_id)
+        background_tasks.add_task(queue_issue_for_agents, issue_id, result.data[0].get("priority"))
         
         return {
             "success": True,
@@ -3,9 +3,20 @@ Volunteers and Task Assignments Router
 Endpoints for viewing volunteers and their task assignments
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from utils.supabase_client import get_db
+from utils.workload import get_workload_counts, get_active_windows, overlapping_count, scheduled_window
+from agents.matching_agent import MAX_CONCURRENT_TASKS
+from utils.projection import (
+    build_select, VOLUNTEER_COLUMNS, VOLUNTEER_LIST_FIELDS,
+    ASSIGNMENT_WITH_TASK_SELECT, ASSIGNMENT_WITH_VOLUNTEER_SELECT
+)
+from utils.assignments import apply_status_updates
+from utils.no_show_sweep import get_no_show_sweep
+from models.database import AssignmentStatusBatch, AssignmentCheckBatch
 from typing import Optional
+import asyncio
 
 router = APIRouter(prefix="/api/volunteers", tags=["volunteers"])
 
@@ -14,15 +25,17 @@ router = APIRouter(prefix="/api/volunteers", tags=["volunteers"])
 async def get_volunteers(
     limit: int = 50,
     skills: Optional[str] = None,
-    available: Optional[bool] = None
+    available: Optional[bool] = None,
+    fields: Optional[str] = None
 ):
     """
     Get list of volunteers
     Optional filters: skills (comma-separated), available
+    `fields` picks columns (comma-separated, or * for all)
     """
     try:
         db = get_db()
-        query = db.table("volunteers").select("*")
+        query = db.table("volunteers").select(build_select(fields, VOLUNTEER_COLUMNS, VOLUNTEER_LIST_FIELDS))
         
         # Apply filters if provided
         # Note: Advanced filtering would require database functions
@@ -30,14 +43,97 @@ async def get_volunteers(
         query = query.limit(limit)
         result = query.execute()
         
-        return {
+        return ORJSONResponse({
             "volunteers": result.data,
             "count": len(result.data)
-        }
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reliability/backfill")
+async def backfill_volunteer_reliability(batch_size: int = Query(1000, ge=100, le=10000)):
+    """Rebuild every volunteer's reliability score from assignment history (run once after migrating)"""
+    try:
+        from utils.reliability import backfill_reliability
+        
+        return await backfill_reliability(batch_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/candidate-index/rebuild")
+async def rebuild_candidate_index():
+    """Rebuild the matching shortlists per skill and map cell from the whole roster"""
+    try:
+        from agents.candidate_index import get_candidate_index
+        
+        index = get_candidate_index()
+        await index.ensure_fresh(rebuild_seconds=0, sync_seconds=0)
+        return index.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/assignments/status")
+async def bulk_update_assignment_status(request: AssignmentStatusBatch):
+    """
+    Apply many assignment status transitions in one batch
+    
+    Invalid transitions are reported per item; the rest are written together
+    and task/plan progress is recomputed once.
+    """
+    try:
+        return ORJSONResponse(apply_status_updates([_status_update(u, u.status) for u in request.updates]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/assignments/check-in")
+async def bulk_check_in(request: AssignmentCheckBatch):
+    """Check volunteers in (status in_progress, check-in time and location)"""
+    try:
+        return ORJSONResponse(apply_status_updates([_status_update(e, "in_progress") for e in request.events]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/assignments/check-out")
+async def bulk_check_out(request: AssignmentCheckBatch):
+    """Check volunteers out (status completed, check-out time, location and notes)"""
+    try:
+        return ORJSONResponse(apply_status_updates([_status_update(e, "completed") for e in request.events]))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/assignments/no-shows")
+async def get_no_show_sweep_status():
+    """Get the no-show sweep job status"""
+    return get_no_show_sweep().stats()
+
+
+@router.post("/assignments/no-shows/sweep")
+async def run_no_show_sweep():
+    """Mark assignments with no check-in past their scheduled start as no_show now"""
+    try:
+        return ORJSONResponse(await asyncio.to_thread(get_no_show_sweep().run_once))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _status_update(item, status: str) -> dict:
+    return {
+        "assignment_id": item.assignment_id,
+        "status": status,
+        "location": item.location,
+        "notes": item.notes,
+        "at": item.at.isoformat() if item.at else None
+    }
+
+
 @router.get("/{volunteer_id}")
 async def get_volunteer(volunteer_id: str):
     """Get specific volunteer by ID"""
@@ -50,7 +146,7 @@ async def get_volunteer(volunteer_id: str):
         
         # Get volunteer's task assignments
         assignments = db.table("task_assignments").select(
-            "*, tasks(*, action_plans(*, issues(*)))"
+            ASSIGNMENT_WITH_TASK_SELECT
         ).eq("volunteer_id", volunteer_id).execute()
         
         volunteer = result.data[0]
@@ -69,7 +165,7 @@ async def get_volunteer_assignments(volunteer_id: str, status: Optional[str] = N
     try:
         db = get_db()
         query = db.table("task_assignments").select(
-            "*, tasks(*, action_plans(*, issues(*)))"
+            ASSIGNMENT_WITH_TASK_SELECT
         ).eq("volunteer_id", volunteer_id)
         
         if status:
@@ -77,11 +173,29 @@ async def get_volunteer_assignments(volunteer_id: str, status: Optional[str] = N
         
         result = query.execute()
         
-        return {
+        return ORJSONResponse({
             "volunteer_id": volunteer_id,
             "assignments": result.data,
             "count": len(result.data)
-        }
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{volunteer_id}/reliability")
+async def get_volunteer_reliability(volunteer_id: str):
+    """Decayed outcome weights behind a volunteer's reliability score"""
+    try:
+        from utils.reliability import RELIABILITY_PRIOR
+        
+        db = get_db()
+        result = db.table("volunteer_reliability").select("*").eq("volunteer_id", volunteer_id).execute()
+        
+        if not result.data:
+            # No completed or failed assignments yet
+            return {"volunteer_id": volunteer_id, "score": RELIABILITY_PRIOR, "completed_weight": 0, "failed_weight": 0}
+        
+        return result.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -92,7 +206,7 @@ async def get_task_assignments(task_id: str):
     try:
         db = get_db()
         result = db.table("task_assignments").select(
-            "*, volunteers(*)"
+            ASSIGNMENT_WITH_VOLUNTEER_SELECT
         ).eq("task_id", task_id).execute()
         
         return {
@@ -122,6 +236,20 @@ async def manually_assign_volunteer(task_id: str, volunteer_id: str):
         if not volunteer.data:
             raise HTTPException(status_code=404, detail="Volunteer not found")
         
+        # Same burnout rule as matching: at the cap, a volunteer can still take a
+        # scheduled task that overlaps fewer than MAX_CONCURRENT_TASKS active ones;
+        # tasks without a scheduled window are left to the organizer
+        active_count = get_workload_counts([volunteer_id]).get(volunteer_id, 0)
+        if active_count >= MAX_CONCURRENT_TASKS and task.data[0].get("action_plan_id"):
+            plan = db.table("action_plans").select("id, metadata").eq("id", task.data[0]["action_plan_id"]).execute().data
+            bounds = scheduled_window(plan[0], task_id) if plan else None
+            overlapping = overlapping_count(get_active_windows([volunteer_id]).get(volunteer_id) or [], *bounds) if bounds else 0
+            if overlapping >= MAX_CONCURRENT_TASKS:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Volunteer already has {overlapping} active assignments overlapping this task (limit {MAX_CONCURRENT_TASKS})"
+                )
+        
         # Create assignment
         assignment = {
             "id": str(uuid.uuid4()),
@@ -138,9 +266,30 @@ async def manually_assign_volunteer(task_id: str, volunteer_id: str):
         
         return {
             "success": True,
-            "assignment": result.data[0]
+            "assignment": result.data[0],
+            "active_assignments": active_count + 1
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/tasks/{task_id}/rematch")
+async def rematch_task_volunteers(task_id: str):
+    """Fill a task's open slots after a drop-out without re-matching the whole plan"""
+    try:
+        from agents.matching_agent import rematch_task
+        
+        result = await rematch_task(task_id)
+        
+        if result.get("error") == "Task not found":
+            raise HTTPException(status_code=404, detail="Task not found")
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
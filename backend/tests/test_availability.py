@@ -0,0 +1,65 @@
+"""
+Availability parsing: free-text entries that must not become hard filters
+
+Run from the backend folder: python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.availability import ALWAYS, parse_availability, parse_entry  # noqa: E402
+
+
+def slots(mask: int) -> dict:
+    """day -> hours set in a weekly mask"""
+    result = {}
+    for slot in range(168):
+        if mask >> slot & 1:
+            result.setdefault(slot // 24, []).append(slot % 24)
+    return result
+
+
+def hours(start: int, end: int) -> list:
+    return list(range(start, end))
+
+
+def test_hours_per_week_is_not_a_time_of_day():
+    assert parse_entry("2-3 hours per week") is None
+    assert parse_entry("10 hrs a month") is None
+
+
+def test_hours_per_week_keeps_the_rest_of_the_entry():
+    assert slots(parse_entry("10 hrs a month, weekends")) == {5: hours(0, 24), 6: hours(0, 24)}
+
+
+def test_negated_entries_are_unconstrained():
+    assert parse_entry("Not available Mondays") is None
+    assert parse_entry("no weekends") is None
+    assert parse_entry("Any day except Sunday") is None
+
+
+def test_bare_after_time_is_read_as_evening():
+    assert slots(parse_entry("Weekdays after 5")) == {day: hours(17, 24) for day in range(5)}
+
+
+def test_bare_range_needs_a_day_or_part_of_day():
+    assert parse_entry("9-5") is None
+    assert slots(parse_entry("Mon-Fri 9-5")) == {day: hours(9, 17) for day in range(5)}
+
+
+def test_ranges_with_am_pm_or_colon_stand_alone():
+    assert slots(parse_entry("9am-5pm")) == {day: hours(9, 17) for day in range(7)}
+    assert slots(parse_entry("Fri 22:00-02:00")) == {4: hours(22, 24), 5: hours(0, 2)}
+
+
+def test_common_entries():
+    assert slots(parse_entry("Weekends")) == {5: hours(0, 24), 6: hours(0, 24)}
+    assert slots(parse_entry("Weekday evenings")) == {day: hours(17, 22) for day in range(5)}
+    assert parse_entry("Flexible") == ALWAYS
+
+
+def test_unparseable_entries_leave_volunteer_unconstrained():
+    assert parse_availability(["2-3 hours per week", "Not available Mondays"]) is None
+    assert parse_availability([]) is None
@@ -0,0 +1,305 @@
+"""
+Streaming latency analytics over agent executions
+
+Keeps one DDSketch (relative-error quantile sketch) plus success, fallback
+and confidence counters per agent_type and hour. Sketches are updated as
+each agent writes its log row and merged at query time, so
+GET /api/agent-logs/stats costs O(buckets) no matter how many executions
+were logged. On first use the sketches are backfilled from agent_logs;
+hours already rolled up by retention are served by /api/agent-logs/rollups.
+
+A process only sees the executions it ran itself, so every
+AGENT_LOG_STATS_SYNC_SECONDS the hours since the previous read (plus a
+margin for late inserts) are re-read from agent_logs and replace the local
+buckets. Every worker then answers from the shared table, at most one sync
+interval behind.
+"""
+
+from config import get_settings
+from utils.supabase_client import get_db
+from utils.log_retention import parse_timestamp, is_fallback_log
+from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import math
+import time
+
+
+class DDSketch:
+    """
+    Quantile sketch with bounded relative error (Masson et al., VLDB 2019)
+
+    Values map to logarithmic bins of ratio gamma = (1 + a) / (1 - a), so any
+    quantile is returned within relative accuracy `a`. Sketches with the same
+    accuracy merge by adding bin counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "DDSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                # Midpoint of the bin (in relative terms) keeps error within `a`
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class ExecutionStats:
+    """Counters and latency sketch for one agent_type over one bucket"""
+
+    def __init__(self, relative_accuracy: float):
+        self.latency = DDSketch(relative_accuracy)
+        self.count = 0
+        self.success = 0
+        self.fallback = 0
+        self.confidence_sum = 0.0
+        self.confidence_count = 0
+
+    def add(self, row: dict):
+        self.count += 1
+        if row.get("success"):
+            self.success += 1
+        if is_fallback_log(row):
+            self.fallback += 1
+        if row.get("confidence_score") is not None:
+            self.confidence_sum += float(row["confidence_score"])
+            self.confidence_count += 1
+        if row.get("execution_time_ms") is not None:
+            self.latency.add(float(row["execution_time_ms"]))
+
+    def merge(self, other: "ExecutionStats"):
+        self.latency.merge(other.latency)
+        self.count += other.count
+        self.success += other.success
+        self.fallback += other.fallback
+        self.confidence_sum += other.confidence_sum
+        self.confidence_count += other.confidence_count
+
+    def summary(self) -> dict:
+        def latency(q):
+            value = self.latency.quantile(q)
+            return round(value, 1) if value is not None else None
+
+        return {
+            "count": self.count,
+            "p50_ms": latency(0.50),
+            "p90_ms": latency(0.90),
+            "p99_ms": latency(0.99),
+            "max_ms": self.latency.max,
+            "success_rate": round(self.success / self.count, 4) if self.count else None,
+            "fallback_rate": round(self.fallback / self.count, 4) if self.count else None,
+            "avg_confidence": round(self.confidence_sum / self.confidence_count, 4) if self.confidence_count else None
+        }
+
+
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+# Rows can land after their created_at (stamped before the insert); re-read this far back
+LATE_WRITE_MARGIN = timedelta(minutes=5)
+
+
+class AgentLogStats:
+    """Hourly ExecutionStats per agent_type, merged into coarser buckets on read"""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_hours: int = 720):
+        self.relative_accuracy = relative_accuracy
+        self.max_hours = max_hours
+        self.hours = {}
+        self.recorded = 0
+        self.built_at = None
+        self.synced_at = None
+        self.syncs = 0
+        self._read_from = None
+        self._lock = asyncio.Lock()
+        self._recorded_during_backfill = None
+
+    @staticmethod
+    def _hour(created_at) -> datetime:
+        moment = parse_timestamp(created_at) if isinstance(created_at, str) else (created_at or datetime.utcnow())
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    def record(self, row: dict):
+        key = (row.get("agent_type") or "unknown", self._hour(row.get("created_at")))
+        stats = self.hours.get(key)
+        if stats is None:
+            stats = self.hours[key] = ExecutionStats(self.relative_accuracy)
+            self._prune()
+        stats.add(row)
+        self.recorded += 1
+
+    def _prune(self):
+        oldest = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=self.max_hours)
+        for key in [k for k in self.hours if k[1] < oldest]:
+            del self.hours[key]
+
+    def query(self, agent_type: str = None, since: datetime = None, until: datetime = None, bucket: str = "hour") -> dict:
+        """Merge hourly stats into `bucket` ("hour", "day" or "all") per agent_type"""
+        merged = {}
+        for (agent, hour), stats in self.hours.items():
+            if agent_type and agent != agent_type:
+                continue
+            if (since and hour < since) or (until and hour >= until):
+                continue
+            if bucket == "all":
+                bucket_start = None
+            else:
+                seconds = BUCKET_SECONDS[bucket]
+                epoch = int((hour - datetime(1970, 1, 1)).total_seconds())
+                bucket_start = datetime(1970, 1, 1) + timedelta(seconds=epoch - epoch % seconds)
+            target = merged.get((agent, bucket_start))
+            if target is None:
+                target = merged[(agent, bucket_start)] = ExecutionStats(self.relative_accuracy)
+            target.merge(stats)
+
+        by_agent = {}
+        for (agent, bucket_start), stats in sorted(merged.items(), key=lambda kv: (kv[0][0], kv[0][1] or datetime.min)):
+            by_agent.setdefault(agent, []).append({
+                "bucket_start": bucket_start.isoformat() if bucket_start else None,
+                **stats.summary()
+            })
+        return by_agent
+
+    def stats(self) -> dict:
+        return {
+            "hour_buckets": len(self.hours),
+            "recorded": self.recorded,
+            "relative_accuracy": self.relative_accuracy,
+            "built_at": self.built_at,
+            "synced_at": self.synced_at,
+            "syncs": self.syncs
+        }
+
+    def _load(self, since: str, started: str, page_size: int) -> tuple:
+        """
+        (new stats, ids of rows logged from `started` on) read from agent_logs
+        (blocking database reads)
+        """
+        db = get_db()
+        fresh = AgentLogStats(self.relative_accuracy, self.max_hours)
+        late_ids = set()
+        last_id = None
+        while True:
+            # Only the fields the sketches need, not the full input/output payloads
+            query = db.table("agent_logs").select(
+                "id, agent_type, created_at, execution_time_ms, success, confidence_score, "
+                "error_message, reasoning:output_data->>reasoning"
+            ).gte("created_at", since)
+            if last_id:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(page_size).execute().data
+
+            for row in rows:
+                row["output_data"] = {"reasoning": row.pop("reasoning", None)}
+                fresh.record(row)
+                if str(row.get("created_at") or "") >= started:
+                    late_ids.add(row["id"])
+
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1]["id"]
+        return fresh, late_ids
+
+    async def ensure_built(self, sync_seconds: int, page_size: int = 1000):
+        """
+        Backfill from agent_logs on first use, then re-read recent hours every sync_seconds
+
+        A sync replaces whole hour buckets from the hour before the last
+        read (less LATE_WRITE_MARGIN), so executions logged by other workers
+        are counted and this worker's own are not counted twice. The reads
+        run in a worker thread; executions logged meanwhile are kept aside
+        and added afterwards unless the read already saw them.
+        """
+        if self.synced_at and time.time() - self.synced_at < sync_seconds:
+            return
+
+        async with self._lock:
+            if self.synced_at and time.time() - self.synced_at < sync_seconds:
+                return
+
+            now = datetime.utcnow()
+            if self._read_from is None:
+                since = now - timedelta(hours=self.max_hours)
+            else:
+                since = (self._read_from - LATE_WRITE_MARGIN).replace(minute=0, second=0, microsecond=0)
+            self._recorded_during_backfill = []
+            try:
+                fresh, late_ids = await asyncio.to_thread(self._load, since.isoformat(), now.isoformat(), page_size)
+                for row in self._recorded_during_backfill:
+                    if row.get("id") not in late_ids:
+                        fresh.record(row)
+            finally:
+                self._recorded_during_backfill = None
+
+            for key in [k for k in self.hours if k[1] >= since]:
+                del self.hours[key]
+            self.hours.update(fresh.hours)
+            self._prune()
+            self.recorded = sum(stats.count for stats in self.hours.values())
+            self._read_from = now
+            self.synced_at = time.time()
+            if self.built_at is None:
+                self.built_at = self.synced_at
+                print(f"📈 Agent log stats backfilled from {fresh.recorded} executions")
+            else:
+                self.syncs += 1
+
+
+def record_agent_log(log_entry: dict):
+    """Update the latency sketches after an agent writes its log row"""
+    stats = get_agent_log_stats()
+    if stats._recorded_during_backfill is not None:
+        stats._recorded_during_backfill.append(log_entry)
+        return
+    if not stats.built_at:
+        return  # The backfill will read this row from agent_logs
+    try:
+        stats.record(log_entry)
+    except Exception as e:
+        print(f"Failed to record agent log stats: {e}")
+
+
+@lru_cache()
+def get_agent_log_stats() -> AgentLogStats:
+    """Get the process-wide agent execution statistics"""
+    settings = get_settings()
+    return AgentLogStats(
+        relative_accuracy=settings.agent_log_stats_relative_accuracy,
+        max_hours=settings.agent_log_stats_max_hours
+    )
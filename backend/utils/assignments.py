@@ -0,0 +1,257 @@
+"""
+Bulk task assignment status transitions
+
+Event days bring hundreds of check-ins at once. This module applies a batch
+of status updates with:
+1. One read of all affected assignments, then targeted updates of only the
+   changed columns, one per group of rows with identical changes (so a
+   check-in batch without locations is a single update)
+2. Structured check-in/check-out columns (see
+   migrations/005_assignment_check_ins.sql) instead of JSON-string notes
+3. Task status and plan progress recomputed once per batch for the tasks
+   and plans the batch touched
+
+Workload counters, impact rollups and reliability scores follow from the
+trigger-maintained tables, so they need no extra work here.
+"""
+
+from utils.supabase_client import get_db
+from datetime import datetime
+import json
+
+
+# Allowed moves from each status; repeating the current status is a no-op
+ASSIGNMENT_TRANSITIONS = {
+    "assigned": {"accepted", "in_progress", "declined", "withdrawn", "no_show", "cancelled"},
+    "accepted": {"in_progress", "withdrawn", "no_show", "cancelled"},
+    "in_progress": {"completed", "dropped", "withdrawn"},
+    "completed": set(),
+    "declined": set(),
+    "withdrawn": set(),
+    "dropped": set(),
+    "no_show": set(),
+    "cancelled": set()
+}
+
+ASSIGNMENT_STATUSES = set(ASSIGNMENT_TRANSITIONS)
+
+# Keep in_() filters comfortably inside URL length limits
+ID_CHUNK_SIZE = 200
+
+
+def _select_in(table: str, columns: str, column: str, values: list) -> list:
+    db = get_db()
+    rows = []
+    for i in range(0, len(values), ID_CHUNK_SIZE):
+        rows.extend(db.table(table).select(columns).in_(column, values[i:i + ID_CHUNK_SIZE]).execute().data)
+    return rows
+
+
+def update_in_groups(table: str, changes: dict, guards: dict = None) -> list:
+    """
+    Write per-row column changes as a few targeted updates
+
+    Only changed columns are sent, so concurrent writes to other columns
+    survive. Rows with identical changes share one update filtered by id.
+
+    Args:
+        changes: row id -> {column: new value}
+        guards: row id -> {column: expected value}; a row whose guard
+            columns no longer match is left untouched
+
+    Returns:
+        The updated rows (rows skipped by a guard are missing)
+    """
+    db = get_db()
+    guards = guards or {}
+    groups = {}
+    for row_id, columns in changes.items():
+        key = json.dumps([columns, guards.get(row_id, {})], sort_keys=True, default=str)
+        groups.setdefault(key, []).append(row_id)
+
+    written = []
+    for ids in groups.values():
+        columns = changes[ids[0]]
+        guard = guards.get(ids[0], {})
+        for i in range(0, len(ids), ID_CHUNK_SIZE):
+            query = db.table(table).update(columns).in_("id", ids[i:i + ID_CHUNK_SIZE])
+            for column, value in guard.items():
+                query = query.eq(column, value)
+            written.extend(query.execute().data)
+    return written
+
+
+def apply_transition(row: dict, update: dict) -> str:
+    """
+    Apply one status update to an assignment row in place
+
+    Returns "updated" or "unchanged"; raises ValueError for a disallowed move.
+    """
+    status = update["status"]
+    current = row.get("status")
+    if status == current:
+        return "unchanged"
+    if status not in ASSIGNMENT_TRANSITIONS.get(current, ASSIGNMENT_STATUSES):
+        raise ValueError(f"Cannot move assignment from '{current}' to '{status}'")
+
+    at = update.get("at") or datetime.utcnow().isoformat()
+    row["status"] = status
+    row["status_updated_at"] = at
+    if status == "in_progress":
+        row["started_at"] = at
+        if update.get("location") is not None:
+            row["check_in_location"] = update["location"]
+    elif status == "completed":
+        row["completed_at"] = at
+        if update.get("location") is not None:
+            row["check_out_location"] = update["location"]
+    if update.get("notes"):
+        row["completion_notes"] = update["notes"]
+    return "updated"
+
+
+def task_status_from_assignments(task: dict, assignments: list) -> str:
+    """Task status implied by its assignments (None leaves the task as is)"""
+    completed = sum(1 for a in assignments if a["status"] == "completed")
+    if completed and completed >= (task.get("required_people") or 1):
+        return "completed"
+    if completed or any(a["status"] == "in_progress" for a in assignments):
+        return "in_progress"
+    return None
+
+
+def plan_progress(tasks: list) -> tuple:
+    """(progress_percentage, status or None) from a plan's task statuses"""
+    if not tasks:
+        return 0.0, None
+    completed = sum(1 for t in tasks if t.get("status") == "completed")
+    progress = round(100.0 * completed / len(tasks), 1)
+    if completed == len(tasks):
+        return progress, "completed"
+    if completed or any(t.get("status") == "in_progress" for t in tasks):
+        return progress, "in_progress"
+    return progress, None
+
+
+def refresh_task_progress(task_ids: list) -> dict:
+    """
+    Recompute task statuses and plan progress for the given tasks
+
+    Four reads (assignments, tasks, sibling tasks, plans) however many
+    assignments changed; writes only the status/progress columns, grouped
+    by value.
+    """
+    if not task_ids:
+        return {"tasks_updated": 0, "plans_updated": []}
+
+    assignments = _select_in("task_assignments", "task_id, status", "task_id", task_ids)
+    by_task = {}
+    for a in assignments:
+        by_task.setdefault(a["task_id"], []).append(a)
+
+    tasks = _select_in("tasks", "id, action_plan_id, status, required_people", "id", task_ids)
+    changed_tasks = []
+    for task in tasks:
+        status = task_status_from_assignments(task, by_task.get(task["id"], []))
+        if status and status != task.get("status"):
+            task["status"] = status
+            changed_tasks.append(task)
+    update_in_groups("tasks", {t["id"]: {"status": t["status"]} for t in changed_tasks})
+
+    plan_ids = sorted(set(t["action_plan_id"] for t in tasks if t.get("action_plan_id")))
+    if not plan_ids:
+        return {"tasks_updated": len(changed_tasks), "plans_updated": []}
+
+    # Sibling tasks (with this batch's changes) give each plan's progress
+    changed_by_id = {t["id"]: t for t in changed_tasks}
+    plan_tasks = {}
+    for t in _select_in("tasks", "id, action_plan_id, status", "action_plan_id", plan_ids):
+        plan_tasks.setdefault(t["action_plan_id"], []).append(changed_by_id.get(t["id"], t))
+
+    plans = _select_in("action_plans", "id, progress_percentage, status", "id", plan_ids)
+    changed_plans = []
+    plan_changes = {}
+    for plan in plans:
+        progress, status = plan_progress(plan_tasks.get(plan["id"], []))
+        updates = {}
+        if progress != plan.get("progress_percentage"):
+            updates["progress_percentage"] = progress
+        if status and status != plan.get("status"):
+            updates["status"] = status
+        if updates:
+            plan.update(updates)
+            changed_plans.append(plan)
+            plan_changes[plan["id"]] = updates
+    update_in_groups("action_plans", plan_changes)
+
+    return {
+        "tasks_updated": len(changed_tasks),
+        "plans_updated": [
+            {"id": p["id"], "progress_percentage": p["progress_percentage"], "status": p["status"]}
+            for p in changed_plans
+        ]
+    }
+
+
+def apply_status_updates(updates: list) -> dict:
+    """
+    Apply a batch of assignment status transitions
+
+    Args:
+        updates: Dicts with assignment_id, status and optional location,
+            notes and at (ISO timestamp). Updates to the same assignment are
+            applied in order.
+
+    Returns:
+        Counts, per-item failures, the written rows and the task/plan
+        progress changes
+    """
+    ids = list(dict.fromkeys(u["assignment_id"] for u in updates))
+    rows = {r["id"]: r for r in _select_in("task_assignments", "*", "id", ids)}
+    original = {row_id: dict(row) for row_id, row in rows.items()}
+    batch_at = datetime.utcnow().isoformat()
+
+    changed = {}
+    unchanged = 0
+    failed = []
+    for update in updates:
+        row = rows.get(update["assignment_id"])
+        if row is None:
+            failed.append({"assignment_id": update["assignment_id"], "error": "Assignment not found"})
+            continue
+        if update["status"] not in ASSIGNMENT_STATUSES:
+            failed.append({"assignment_id": update["assignment_id"], "error": f"Unknown status '{update['status']}'"})
+            continue
+        try:
+            outcome = apply_transition(row, {"at": batch_at, **{k: v for k, v in update.items() if v is not None}})
+        except ValueError as e:
+            failed.append({"assignment_id": update["assignment_id"], "error": str(e)})
+            continue
+        if outcome == "updated":
+            changed[row["id"]] = row
+        else:
+            unchanged += 1
+
+    # Only the columns this batch changed, and only if nobody moved the status meanwhile
+    changes = {
+        row_id: {k: v for k, v in row.items() if original[row_id].get(k) != v}
+        for row_id, row in changed.items()
+    }
+    guards = {row_id: {"status": original[row_id]["status"]} for row_id in changed if original[row_id].get("status")}
+    written = update_in_groups("task_assignments", changes, guards)
+
+    written_ids = set(r["id"] for r in written)
+    for row_id in changed:
+        if row_id not in written_ids:
+            failed.append({"assignment_id": row_id, "error": "Assignment status changed concurrently; retry"})
+
+    progress = refresh_task_progress(sorted(set(changed[i]["task_id"] for i in written_ids)))
+
+    print(f"✅ Assignment batch: {len(written)} updated, {unchanged} unchanged, {len(failed)} failed")
+    return {
+        "updated": len(written),
+        "unchanged": unchanged,
+        "failed": failed,
+        "assignments": written,
+        **progress
+    }
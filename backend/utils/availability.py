@@ -0,0 +1,306 @@
+"""
+Volunteer availability as weekly hour bitmaps
+
+Volunteers describe when they can help in free text ("Weekends", "Weekday
+evenings", "Mon-Fri 9am-5pm", "Flexible"). This module:
+1. Parses those entries into a 168-bit mask, one bit per hour of the week
+   (bit 0 = Monday 00:00-01:00)
+2. Turns a task's scheduled window into the same kind of mask
+3. Keeps each volunteer's parsed mask in an index so matching can drop
+   candidates who are not free for a task's whole window before scoring
+4. Suggests a plan start time when most of the needed people are free
+
+All times are wall-clock hours in the community's local time. Entries that
+are empty, "flexible", negated ("not available Mondays") or can't be parsed
+leave a volunteer unconstrained, since the mask is a hard filter.
+"""
+
+from config import get_settings
+from collections import Counter
+from datetime import datetime, timedelta
+from functools import lru_cache
+import re
+
+
+WEEK_HOURS = 168
+ALWAYS = (1 << WEEK_HOURS) - 1
+
+FLEXIBLE_PATTERN = re.compile(
+    r"\b(flexible|anytime|any time|always|whenever|all the time|24/7)\b"
+)
+
+DAY_NAMES = {
+    "monday": 0, "mon": 0,
+    "tuesday": 1, "tues": 1, "tue": 1,
+    "wednesday": 2, "wed": 2,
+    "thursday": 3, "thurs": 3, "thur": 3, "thu": 3,
+    "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6
+}
+_DAY = "|".join(sorted(DAY_NAMES, key=len, reverse=True))
+DAY_PATTERN = re.compile(rf"\b({_DAY})s?\b")
+DAY_RANGE_PATTERN = re.compile(rf"\b({_DAY})s?\s*(?:-|–|to|through|thru|until)\s*({_DAY})s?\b")
+
+DAY_GROUPS = [
+    (re.compile(r"\b(daily|every ?day|any ?day|all week|7 days)\b"), range(7)),
+    (re.compile(r"\bweek ?days?\b"), range(5)),
+    (re.compile(r"\bweek ?ends?\b"), (5, 6))
+]
+
+# Parts of the day as [start, end) hours
+DAY_PARTS = [
+    (re.compile(r"\bmornings?\b"), (6, 12)),
+    (re.compile(r"\bafternoons?\b"), (12, 17)),
+    (re.compile(r"\bevenings?\b"), (17, 22)),
+    (re.compile(r"\b(nights?|overnight)\b"), (20, 24)),
+    (re.compile(r"\b(daytime|business hours|working hours|office hours)\b"), (9, 17))
+]
+
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?"
+TIME_RANGE_PATTERN = re.compile(rf"\b{_TIME}\s*(?:-|–|to|until|till)\s*{_TIME}")
+AFTER_PATTERN = re.compile(rf"\b(?:after|from)\s+{_TIME}")
+BEFORE_PATTERN = re.compile(rf"\b(?:before|until|till)\s+{_TIME}")
+
+# Amounts of time, not times of day ("2-3 hours per week", "10 hrs a month")
+DURATION_PATTERN = re.compile(
+    r"\b\d+(?:\.\d+)?(?:\s*(?:-|–|to)\s*\d+(?:\.\d+)?)?\s*(?:hours?|hrs?|h)\b"
+    r"(?:\s*(?:per|a|an|each|every|/)\s*(?:week|wk|month|day|weekend))?"
+)
+
+# Entries that say when someone is NOT free; inverting them is too error-prone
+NEGATION_PATTERN = re.compile(
+    r"\b(not|no|never|except|unavailable|busy|cannot|can't|cant|won't|don't)\b"
+)
+
+# A bare "9-5" or "after 5" only counts as a time next to one of these words
+CONTEXT_PATTERN = re.compile(
+    rf"\b({_DAY})s?\b|\b(daily|every ?day|any ?day|all week|week ?days?|week ?ends?|mornings?|afternoons?"
+    r"|evenings?|nights?|overnight|daytime|business hours|working hours|office hours)\b"
+)
+CONTEXT_CHARS = 15
+
+
+def _to_24h(hour: int, minute: int, meridiem: str) -> float:
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.startswith("p") else 0)
+    return hour + minute / 60
+
+
+def _time_range(match) -> tuple:
+    """[start, end) hours from a "9-5" / "9am-5pm" / "18:00-21:00" match"""
+    h1, m1, ap1, h2, m2, ap2 = match.groups()
+    h1, h2 = int(h1), int(h2)
+    m1, m2 = int(m1 or 0), int(m2 or 0)
+    if ap2 and not ap1 and h1 <= 12:
+        # "10-2pm" is 10am-2pm, "7-9pm" is 7pm-9pm
+        same_half = (h1 % 12) < (h2 % 12) or (h1 % 12 == h2 % 12 and m1 < m2)
+        ap1 = ap2 if same_half else ("am" if ap2.startswith("p") else "pm")
+    start = _to_24h(h1, m1, ap1)
+    end = _to_24h(h2, m2, ap2)
+    if not ap1 and not ap2 and start < 12 and end <= start:
+        # "9-5" means 9am-5pm
+        end += 12
+    if end <= start:
+        # Overnight ("22:00-02:00") runs into the next day
+        end += 24
+    return start, end
+
+
+def _bare_hour(hour: int, meridiem: str, bound: str) -> tuple:
+    """Guess the half of day for "after 5" / "before 10" without am/pm"""
+    if meridiem or hour > 12:
+        return hour, meridiem
+    if bound == "after":
+        return hour, "pm" if hour < 8 else "am"
+    return hour, "pm" if hour < 7 else "am"
+
+
+def _is_time(text: str, match) -> bool:
+    """A time match counts if it has am/pm or a colon, or sits next to a day or part-of-day word"""
+    groups = match.groups()
+    if any(groups[i] for i in range(2, len(groups), 3)):
+        return True
+    if ":" in match.group(0):
+        return True
+    nearby = text[max(0, match.start() - CONTEXT_CHARS):match.end() + CONTEXT_CHARS]
+    return bool(CONTEXT_PATTERN.search(nearby))
+
+
+def parse_entry(entry: str):
+    """
+    Parse one availability entry into a weekly mask
+
+    Returns ALWAYS for "flexible"-style entries and None (unconstrained) for
+    negated entries or if nothing in the entry describes a day or a time.
+    """
+    text = (entry or "").lower().strip()
+    if not text:
+        return None
+    if FLEXIBLE_PATTERN.search(text):
+        return ALWAYS
+    if NEGATION_PATTERN.search(text):
+        return None
+
+    text = DURATION_PATTERN.sub(" ", text)
+    clean = text
+
+    days = set()
+    for pattern, group in DAY_GROUPS:
+        if pattern.search(text):
+            days.update(group)
+            text = pattern.sub(" ", text)
+    for match in DAY_RANGE_PATTERN.finditer(text):
+        first, last = DAY_NAMES[match.group(1)], DAY_NAMES[match.group(2)]
+        days.update((first + i) % 7 for i in range((last - first) % 7 + 1))
+    text = DAY_RANGE_PATTERN.sub(" ", text)
+    days.update(DAY_NAMES[m.group(1)] for m in DAY_PATTERN.finditer(text))
+
+    hours = [_time_range(m) for m in TIME_RANGE_PATTERN.finditer(clean) if _is_time(clean, m)]
+    if not hours:
+        for pattern, bound in ((AFTER_PATTERN, "after"), (BEFORE_PATTERN, "before")):
+            for m in pattern.finditer(clean):
+                if not _is_time(clean, m):
+                    continue
+                h, ap = _bare_hour(int(m.group(1)), m.group(3), bound)
+                at = _to_24h(h, int(m.group(2) or 0), ap)
+                hours.append((at, 24) if bound == "after" else (0, at))
+    hours.extend(span for pattern, span in DAY_PARTS if pattern.search(text))
+
+    if not days and not hours:
+        return None
+    days = days or set(range(7))
+    hours = [h for h in hours if 0 <= h[0] < h[1] <= 48] or [(0, 24)]
+
+    mask = 0
+    for day in days:
+        for start, end in hours:
+            for hour in range(int(start), int(end) + (end % 1 > 0)):
+                mask |= 1 << ((day * 24 + hour) % WEEK_HOURS)
+    return mask
+
+
+@lru_cache(maxsize=4096)
+def _parse_entries(entries: tuple):
+    masks = [m for m in (parse_entry(e) for e in entries) if m is not None]
+    if not masks:
+        return None
+    mask = 0
+    for m in masks:
+        mask |= m
+    return mask
+
+
+def parse_availability(entries) -> int:
+    """
+    Combined weekly mask for a volunteer's availability entries
+
+    Returns None (unconstrained) when there are no entries or none parse.
+    """
+    if isinstance(entries, str):
+        entries = [entries]
+    return _parse_entries(tuple(e for e in (entries or []) if isinstance(e, str)))
+
+
+def hour_of_week(moment: datetime) -> int:
+    return moment.weekday() * 24 + moment.hour
+
+
+def window_mask(start: datetime, end: datetime) -> int:
+    """Mask of every hour slot a [start, end) window touches"""
+    first = start.replace(minute=0, second=0, microsecond=0)
+    hours = max(1, int(-(-(end - first).total_seconds() // 3600)))
+    if hours >= WEEK_HOURS:
+        return ALWAYS
+    offset = hour_of_week(first)
+    mask = ((1 << hours) - 1) << offset
+    # Wrap past Sunday midnight back to Monday
+    return (mask | (mask >> WEEK_HOURS)) & ALWAYS
+
+
+class AvailabilityIndex:
+    """Parsed weekly masks per volunteer, refreshed when their availability text changes"""
+
+    def __init__(self):
+        self._entries = {}  # volunteer_id -> (raw availability tuple, mask)
+        self.parses = 0
+
+    def mask_for(self, volunteer: dict) -> int:
+        """A volunteer's weekly mask (ALWAYS when unconstrained)"""
+        raw = tuple(volunteer.get('availability') or ())
+        entry = self._entries.get(volunteer['id'])
+        if entry is not None and entry[0] == raw:
+            return entry[1]
+        parsed = parse_availability(raw)
+        mask = ALWAYS if parsed is None else parsed
+        self._entries[volunteer['id']] = (raw, mask)
+        self.parses += 1
+        return mask
+
+    def remove(self, volunteer_id: str):
+        self._entries.pop(volunteer_id, None)
+
+    def filter_free(self, volunteers: list, start: datetime, end: datetime) -> list:
+        """Volunteers free for the whole [start, end) window"""
+        needed = window_mask(start, end)
+        return [v for v in volunteers if self.mask_for(v) & needed == needed]
+
+    def suggest_start(self, volunteers: list, task_windows: list, now: datetime,
+                      earliest_hour: int = 8, latest_hour: int = 18, horizon_days: int = 7) -> datetime:
+        """
+        Plan start within the horizon that lets the most required people be free
+
+        Args:
+            volunteers: Candidate volunteers
+            task_windows: (start_hour, end_hour, required_people) per task,
+                in hours from plan start
+            now: Current local time; candidates start at the next full hour
+            earliest_hour / latest_hour: Allowed local start hours (inclusive)
+            horizon_days: How far ahead to look
+
+        Returns:
+            The earliest start with the highest staffable head count
+        """
+        # Volunteers sharing a mask are counted together, so each candidate
+        # start costs one check per distinct mask instead of per volunteer
+        mask_counts = Counter(self.mask_for(v) for v in volunteers)
+        free_cache = {}
+
+        def free_count(needed):
+            if needed not in free_cache:
+                free_cache[needed] = sum(c for m, c in mask_counts.items() if m & needed == needed)
+            return free_cache[needed]
+
+        base = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        best, best_score = None, -1
+        for offset in range(horizon_days * 24):
+            start = base + timedelta(hours=offset)
+            if not earliest_hour <= start.hour <= latest_hour:
+                continue
+            score = sum(
+                min(required, free_count(window_mask(start + timedelta(hours=s), start + timedelta(hours=e))))
+                for s, e, required in task_windows
+            )
+            if score > best_score:
+                best, best_score = start, score
+        return best or base
+
+    def stats(self) -> dict:
+        masks = [mask for _, mask in self._entries.values()]
+        return {
+            "volunteers": len(masks),
+            "unconstrained": sum(1 for m in masks if m == ALWAYS),
+            "distinct_masks": len(set(masks)),
+            "parses": self.parses
+        }
+
+
+def local_now() -> datetime:
+    """Current wall-clock time in the community's timezone"""
+    return datetime.utcnow() + timedelta(hours=get_settings().availability_utc_offset_hours)
+
+
+@lru_cache()
+def get_availability_index() -> AvailabilityIndex:
+    """Get the process-wide availability index"""
+    return AvailabilityIndex()
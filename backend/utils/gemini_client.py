@@ -1,20 +1,103 @@
-import google.generativeai as genai
 from config import get_settings
+from utils.gemini_fixtures import FixtureStore, FixturePlayer, fingerprint
+from utils.single_flight import SingleFlight
+from functools import lru_cache
+import asyncio
 import json
 import re
+import time
 
-settings = get_settings()
+MODEL_NAME = 'models/gemini-2.5-flash'
 
-# Configure Gemini API
-genai.configure(api_key=settings.gemini_api_key)
+# Concurrent calls with byte-identical prompts share one request
+gemini_flights = SingleFlight("gemini")
 
-# Initialize Gemini model - using the actual available model
-model = genai.GenerativeModel('models/gemini-2.5-flash')
+
+@lru_cache()
+def get_model():
+    """
+    Configure the Gemini SDK and build the model on first use
+    
+    google.generativeai is heavy to import and needs a real API key, so
+    workers that never call Gemini (or run in replay mode) don't pay for it.
+    """
+    import google.generativeai as genai
+    
+    genai.configure(api_key=get_settings().gemini_api_key)
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+@lru_cache()
+def get_fixture_store() -> FixtureStore:
+    """Fixture store used by record/replay modes"""
+    return FixtureStore(get_settings().gemini_fixture_path)
+
+
+@lru_cache()
+def get_fixture_player() -> FixturePlayer:
+    """Offline responder used when GEMINI_MODE=replay"""
+    settings = get_settings()
+    return FixturePlayer(
+        get_fixture_store(),
+        latency_spec=settings.gemini_replay_latency,
+        error_rate=settings.gemini_replay_error_rate,
+        seed=settings.gemini_replay_seed
+    )
+
+
+async def generate_text(full_prompt: str, images: list = None) -> str:
+    """
+    Get raw response text for a prompt
+    
+    live:   call Gemini
+    record: call Gemini and store prompt fingerprint, response, latency and tokens
+    replay: serve a stored response offline with simulated latency/errors
+    
+    images are JPEG bytes sent alongside the prompt and are part of the fingerprint.
+    """
+    settings = get_settings()
+    key = fingerprint(full_prompt, images)
+    
+    if settings.gemini_mode == "replay":
+        return await get_fixture_player().replay(key)
+    
+    start = time.perf_counter()
+    contents = [full_prompt] + [{"mime_type": "image/jpeg", "data": image} for image in images or []]
+    response = await get_model().generate_content_async(
+        contents if images else full_prompt,
+        generation_config={
+            "temperature": 0.7,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": 2048,
+        }
+    )
+    text = response.text
+    
+    if settings.gemini_mode == "record":
+        usage = getattr(response, "usage_metadata", None)
+        await get_fixture_store().record(
+            key,
+            full_prompt,
+            text,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            usage={
+                "prompt_tokens": getattr(usage, "prompt_token_count", None),
+                "response_tokens": getattr(usage, "candidates_token_count", None)
+            },
+            model_name=MODEL_NAME
+        )
+    
+    return text
 
 
-async def call_gemini(prompt: str, system_instruction: str = None) -> dict:
+async def generate_text_with_timeout(full_prompt: str, images: list = None) -> str:
+    return await asyncio.wait_for(generate_text(full_prompt, images), timeout=get_settings().gemini_timeout_seconds)
+
+
+async def call_gemini(prompt: str, system_instruction: str = None, images: list = None) -> dict:
     """
-    Call Gemini API with a prompt and return structured JSON response
+    Call Gemini API with a prompt (and optional JPEG image bytes) and return structured JSON response
     Falls back to rule-based analysis if Gemini fails
     """
     try:
@@ -23,19 +106,14 @@ async def call_gemini(prompt: str, system_instruction: str = None) -> dict:
         if system_instruction:
             full_prompt = f"{system_instruction}\n\n{prompt}"
         
-        # Generate response
-        response = model.generate_content(
-            full_prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.7,
-                top_p=0.95,
-                top_k=40,
-                max_output_tokens=2048,
-            )
+        # Generate response (async so concurrent pipeline workers can overlap LLM calls).
+        # Callers with an identical prompt in flight await that call and its timeout.
+        text = await gemini_flights.do(
+            fingerprint(full_prompt, images), generate_text_with_timeout, full_prompt, images
         )
         
         # Extract text and parse JSON
-        text = response.text.strip()
+        text = text.strip()
         
         # Try to extract JSON from markdown code blocks
         # Match ```json...``` or ```...```
@@ -133,5 +211,6 @@ async def fallback_analysis(prompt: str) -> dict:
         "estimated_duration_days": 2 if scope == "small" else 5,
         "confidence": 0.75,
         "reasoning": f"Analyzed as {category} issue with {urgency} urgency based on keyword analysis. Fallback agent used.",
-        "tags": tags if tags else ["community"]
+        "tags": tags if tags else ["community"],
+        "fallback": True
     }
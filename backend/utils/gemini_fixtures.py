@@ -0,0 +1,162 @@
+"""
+Record/replay fixtures for Gemini calls
+
+Record mode stores every prompt fingerprint with the raw response text,
+observed latency and token counts in a gzip-compressed JSONL file. Replay
+mode serves those responses offline with a configurable latency
+distribution and injected error rate, so pipeline benchmarks and
+timeout/fallback behaviour are reproducible without network access.
+
+Latency specs (GEMINI_REPLAY_LATENCY):
+    recorded            - the latency observed when the fixture was recorded
+    fixed:<ms>          - constant
+    uniform:<lo>,<hi>   - uniform between lo and hi ms
+    normal:<mean>,<sd>  - gaussian, clipped at 0
+    lognormal:<median>,<sigma> - long-tailed, like real LLM latency
+"""
+
+from datetime import datetime
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+
+
+class GeminiReplayError(Exception):
+    """Raised for injected failures and missing fixtures in replay mode"""
+
+
+def fingerprint(full_prompt: str, images: list = None) -> str:
+    """Stable key for a prompt (plus any attached image bytes)"""
+    digest = hashlib.sha256(full_prompt.encode("utf-8"))
+    for image in images or []:
+        digest.update(hashlib.sha256(image).digest())
+    return digest.hexdigest()
+
+
+class LatencyModel:
+    """Samples simulated call latency (ms) from a spec string"""
+
+    def __init__(self, spec: str, rng: random.Random):
+        self.rng = rng
+        kind, _, params = (spec or "recorded").partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+
+    def sample(self, recorded_ms: float = None) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            return p[0]
+        if self.kind == "uniform":
+            return self.rng.uniform(p[0], p[1])
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(p[0], p[1]))
+        if self.kind == "lognormal":
+            return self.rng.lognormvariate(math.log(p[0]), p[1])
+        return recorded_ms or 0.0
+
+
+class FixtureStore:
+    """Gzip JSONL store of recorded Gemini responses keyed by prompt fingerprint"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        # Each record() call appends a gzip member; gzip.open reads them all
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.records.setdefault(record["fingerprint"], []).append(record)
+
+    def lookup(self, key: str) -> list:
+        return self.records.get(key, [])
+
+    async def record(self, key: str, full_prompt: str, text: str, latency_ms: float, usage: dict, model_name: str):
+        """Store a response for replay; the compressed append runs in a worker thread"""
+        record = {
+            "fingerprint": key,
+            "prompt_preview": full_prompt[:160],
+            "response_text": text,
+            "latency_ms": round(latency_ms, 1),
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "response_tokens": usage.get("response_tokens"),
+            "model": model_name,
+            "recorded_at": datetime.utcnow().isoformat()
+        }
+        self.records.setdefault(key, []).append(record)
+        await asyncio.to_thread(self._append, record)
+
+    def _append(self, record: dict):
+        # The lock keeps concurrent appends from interleaving gzip members
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "prompts": len(self.records),
+            "recordings": sum(len(r) for r in self.records.values())
+        }
+
+
+class FixturePlayer:
+    """Serves recorded responses with simulated latency and failures"""
+
+    def __init__(self, store: FixtureStore, latency_spec: str, error_rate: float, seed: int):
+        self.store = store
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency_spec, self.rng)
+        self.error_rate = error_rate
+        self.hits = 0
+        self.misses = 0
+        self.injected_errors = 0
+        recorded = [r["latency_ms"] for rs in store.records.values() for r in rs if r.get("latency_ms")]
+        self.mean_recorded_ms = sum(recorded) / len(recorded) if recorded else 0.0
+
+    async def replay(self, key: str) -> str:
+        """
+        Return the recorded response text for a fingerprint
+
+        Latency is simulated for misses too, so runs without fixtures still
+        behave like a slow upstream before falling back.
+        """
+        recordings = self.store.lookup(key)
+        recording = self.rng.choice(recordings) if recordings else None
+
+        delay_ms = self.latency.sample(recording["latency_ms"] if recording else self.mean_recorded_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.injected_errors += 1
+            raise GeminiReplayError("Injected replay failure")
+
+        if recording is None:
+            self.misses += 1
+            raise GeminiReplayError(f"No fixture recorded for prompt {key[:12]}")
+
+        self.hits += 1
+        return recording["response_text"]
+
+    def stats(self) -> dict:
+        return {
+            **self.store.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "injected_errors": self.injected_errors,
+            "latency": self.latency.kind,
+            "error_rate": self.error_rate
+        }
@@ -0,0 +1,211 @@
+"""
+Geo-aggregated issue grid for map heatmaps
+
+Issues are bucketed into slippy-map (Web Mercator XYZ) tiles at every zoom
+level up to a configured maximum. Each cell keeps a count, priority sum/max,
+urgency and status breakdowns and a coordinate centroid, so a map viewport is
+answered from the cells it covers instead of every issue. The grid is built
+lazily from the database and updated as issues are created or re-scored by
+the Discovery Agent.
+"""
+
+from config import get_settings
+from utils.supabase_client import get_db
+from functools import lru_cache
+import asyncio
+import math
+import time
+
+
+RESOLVED_STATUSES = ("completed", "verified")
+
+# Web Mercator is undefined at the poles
+MAX_LATITUDE = 85.05112878
+
+
+def lat_lng_to_tile(lat: float, lng: float, zoom: int) -> tuple:
+    """Slippy-map tile (x, y) containing a point at a zoom level"""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    n = 1 << zoom
+    x = int((lng + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> dict:
+    """Lat/lng bounding box of a tile"""
+    n = 1 << zoom
+
+    def lat(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return {
+        "min_lat": round(lat(y + 1), 6),
+        "max_lat": round(lat(y), 6),
+        "min_lng": round(x / n * 360.0 - 180.0, 6),
+        "max_lng": round((x + 1) / n * 360.0 - 180.0, 6)
+    }
+
+
+def issue_point(issue: dict) -> dict:
+    """Extract what the grid aggregates from an issue row, or None without coordinates"""
+    location = issue.get("location") or {}
+    try:
+        lat = float(location.get("lat"))
+        lng = float(location.get("lng"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if math.isnan(lat) or math.isnan(lng):
+        return None
+
+    analysis = (issue.get("metadata") or {}).get("discovery_analysis") or {}
+    return {
+        "lat": lat,
+        "lng": lng,
+        "priority": float(issue.get("priority") or 0.0),
+        "urgency": analysis.get("urgency") or "unknown",
+        "status": issue.get("status") or "pending"
+    }
+
+
+class GeoGrid:
+    """Per-zoom tile aggregates over issue locations"""
+
+    def __init__(self, max_zoom: int = 16):
+        self.max_zoom = max_zoom
+        self.levels = [dict() for _ in range(max_zoom + 1)]
+        self.points = {}
+        self.built_at = None
+        self._lock = asyncio.Lock()
+
+    def _apply(self, point: dict, sign: int):
+        for zoom, cells in enumerate(self.levels):
+            key = lat_lng_to_tile(point["lat"], point["lng"], zoom)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = {
+                    "count": 0, "open": 0, "priority_sum": 0.0, "priority_max": 0.0,
+                    "lat_sum": 0.0, "lng_sum": 0.0, "urgency": {}, "status": {}
+                }
+            cell["count"] += sign
+            cell["open"] += sign if point["status"] not in RESOLVED_STATUSES else 0
+            cell["priority_sum"] += sign * point["priority"]
+            cell["lat_sum"] += sign * point["lat"]
+            cell["lng_sum"] += sign * point["lng"]
+            for field in ("urgency", "status"):
+                counts = cell[field]
+                counts[point[field]] = counts.get(point[field], 0) + sign
+                if not counts[point[field]]:
+                    del counts[point[field]]
+
+            if cell["count"] <= 0:
+                del cells[key]
+            elif sign > 0:
+                # Removals leave max_priority as an upper bound until the next rebuild
+                cell["priority_max"] = max(cell["priority_max"], point["priority"])
+
+    def upsert(self, issue: dict):
+        """Add an issue or move/re-score one already in the grid"""
+        previous = self.points.pop(issue["id"], None)
+        if previous:
+            self._apply(previous, -1)
+        point = issue_point(issue)
+        if point:
+            self.points[issue["id"]] = point
+            self._apply(point, 1)
+
+    def remove(self, issue_id: str):
+        previous = self.points.pop(issue_id, None)
+        if previous:
+            self._apply(previous, -1)
+
+    def query(self, zoom: int, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> list:
+        """Cells at `zoom` intersecting a bounding box"""
+        zoom = max(0, min(zoom, self.max_zoom))
+        cells = self.levels[zoom]
+        x0, y0 = lat_lng_to_tile(max_lat, min_lng, zoom)
+        x1, y1 = lat_lng_to_tile(min_lat, max_lng, zoom)
+
+        # Antimeridian-crossing viewports wrap around
+        if min_lng > max_lng:
+            xs = list(range(x0, 1 << zoom)) + list(range(0, x1 + 1))
+        else:
+            xs = range(x0, x1 + 1)
+
+        # Scan whichever is smaller: the tiles in view or the populated cells
+        if len(xs) * (y1 - y0 + 1) <= len(cells):
+            keys = [(x, y) for x in xs for y in range(y0, y1 + 1) if (x, y) in cells]
+        else:
+            x_set = set(xs)
+            keys = [k for k in cells if k[0] in x_set and y0 <= k[1] <= y1]
+
+        return [self._cell_summary(zoom, key, cells[key]) for key in sorted(keys)]
+
+    @staticmethod
+    def _cell_summary(zoom: int, key: tuple, cell: dict) -> dict:
+        count = cell["count"]
+        return {
+            "zoom": zoom,
+            "x": key[0],
+            "y": key[1],
+            "bounds": tile_bounds(key[0], key[1], zoom),
+            "centroid": {"lat": round(cell["lat_sum"] / count, 6), "lng": round(cell["lng_sum"] / count, 6)},
+            "count": count,
+            "open": cell["open"],
+            "avg_priority": round(cell["priority_sum"] / count, 3),
+            "max_priority": round(cell["priority_max"], 3),
+            "urgency": dict(cell["urgency"]),
+            "status": dict(cell["status"])
+        }
+
+    def stats(self) -> dict:
+        return {
+            "issues": len(self.points),
+            "max_zoom": self.max_zoom,
+            "cells_by_zoom": [len(cells) for cells in self.levels],
+            "built_at": self.built_at
+        }
+
+    async def ensure_built(self, rebuild_seconds: int, page_size: int = 500):
+        """Stream issues from the database on first use and periodically after"""
+        if self.built_at and time.time() - self.built_at < rebuild_seconds:
+            return
+
+        async with self._lock:
+            if self.built_at and time.time() - self.built_at < rebuild_seconds:
+                return
+
+            db = get_db()
+            fresh = GeoGrid(self.max_zoom)
+            last_id = None
+            while True:
+                query = db.table("issues").select("id, location, priority, status, metadata")
+                if last_id:
+                    query = query.gt("id", last_id)
+                rows = query.order("id").limit(page_size).execute().data
+
+                for row in rows:
+                    fresh.upsert(row)
+
+                if len(rows) < page_size:
+                    break
+                last_id = rows[-1]["id"]
+
+            self.levels = fresh.levels
+            self.points = fresh.points
+            self.built_at = time.time()
+            print(f"🗺️ Issue heatmap grid built with {len(self.points)} issues")
+
+
+def record_issue_location(issue: dict):
+    """Keep the heatmap grid current after an issue is created or updated"""
+    grid = get_geo_grid()
+    if grid.built_at:
+        grid.upsert(issue)
+
+
+@lru_cache()
+def get_geo_grid() -> GeoGrid:
+    """Get the process-wide issue heatmap grid"""
+    return GeoGrid(get_settings().heatmap_max_zoom)
@@ -0,0 +1,64 @@
+"""
+Idempotency keys for create endpoints
+
+Clients send an `Idempotency-Key` header with POST requests they may
+retry. The key is stored with the created row (issues.metadata.idempotency_key)
+so a retry returns the original row instead of creating a duplicate. A
+short-lived in-process map answers most retries without a database lookup,
+and concurrent retries with the same key share one creation via SingleFlight.
+"""
+
+from config import get_settings
+from utils.single_flight import SingleFlight
+from collections import OrderedDict
+from functools import lru_cache
+import time
+
+
+class IdempotencyCache:
+    """TTL map from idempotency key to the id of the row it created"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self):
+        now = time.monotonic()
+        # Entries are appended in expiry order since the TTL is constant
+        while self.entries and (next(iter(self.entries.values()))[1] <= now or len(self.entries) > self.max_entries):
+            self.entries.popitem(last=False)
+
+    def get(self, key: str):
+        self._evict()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, value):
+        self.entries.pop(key, None)
+        self.entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._evict()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+# Concurrent requests carrying the same key share one creation
+intake_flights = SingleFlight("issue_intake")
+
+
+@lru_cache()
+def get_idempotency_cache() -> IdempotencyCache:
+    """Get the process-wide idempotency key cache"""
+    return IdempotencyCache(get_settings().idempotency_key_ttl_seconds)
@@ -0,0 +1,343 @@
+"""
+Image preprocessing for multimodal Discovery
+
+Issue photos are fetched from a pluggable store (HTTP URLs such as Supabase
+Storage public links, or files under a local root), then in a process pool:
+1. EXIF orientation is applied and all metadata (GPS, camera) dropped
+2. The image is downsampled so its long side fits IMAGE_MAX_SIDE, which
+   keeps it to roughly one Gemini image tile's worth of tokens
+3. A 64-bit difference hash (dHash) is computed for dedupe
+
+Processed JPEGs are cached on disk by source reference, and near-identical
+photos (small Hamming distance between hashes) are sent to the model once.
+"""
+
+from config import get_settings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import asyncio
+from urllib.parse import urlsplit
+import hashlib
+import io
+import ipaddress
+import json
+import os
+import socket
+
+
+class ImageFetchError(Exception):
+    """Raised when an image can't be read from its store"""
+
+
+class LocalImageStore:
+    """Reads images from files under a root directory"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    async def fetch(self, ref: str, max_bytes: int) -> bytes:
+        path = os.path.abspath(os.path.join(self.root, ref.lstrip("/")))
+        if not path.startswith(self.root + os.sep):
+            raise ImageFetchError(f"Image path escapes the store root: {ref}")
+        if not os.path.isfile(path):
+            raise ImageFetchError(f"Image not found: {ref}")
+        if os.path.getsize(path) > max_bytes:
+            raise ImageFetchError(f"Image too large: {ref}")
+        return await asyncio.to_thread(_read_file, path)
+
+
+def is_public_address(address: str) -> bool:
+    """False for loopback, private, link-local (cloud metadata), reserved and multicast IPs"""
+    try:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+    except ValueError:
+        return False
+    if getattr(ip, "ipv4_mapped", None):
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def allowed_image_hosts(settings) -> set:
+    """IMAGE_ALLOWED_HOSTS, or the Supabase project host when unset"""
+    hosts = [h.strip().lower() for h in settings.image_allowed_hosts.split(",") if h.strip()]
+    if not hosts:
+        host = urlsplit(settings.supabase_url).hostname
+        hosts = [host.lower()] if host else []
+    return set(hosts)
+
+
+def _public_resolver():
+    """aiohttp resolver that refuses to connect to non-public addresses"""
+    from aiohttp.resolver import ThreadedResolver
+
+    class PublicResolver(ThreadedResolver):
+        async def resolve(self, host, port=0, family=socket.AF_INET):
+            infos = await super().resolve(host, port, family)
+            blocked = [info["host"] for info in infos if not is_public_address(info["host"])]
+            if blocked:
+                raise ImageFetchError(f"Image host {host} resolves to a non-public address")
+            return infos
+
+    return PublicResolver()
+
+
+class HTTPImageStore:
+    """
+    Downloads images from http(s) URLs on allowlisted hosts
+
+    Image references come from anonymous issue reports, so requests are
+    limited to `allowed_hosts` (the Supabase Storage host by default),
+    redirects are not followed and hosts resolving to private, loopback or
+    link-local addresses are refused at connect time.
+    """
+
+    def __init__(self, timeout_seconds: float, allowed_hosts: set):
+        self.timeout_seconds = timeout_seconds
+        self.allowed_hosts = allowed_hosts
+
+    def check_url(self, ref: str):
+        parts = urlsplit(ref)
+        host = (parts.hostname or "").lower()
+        if parts.scheme not in ("http", "https") or not host:
+            raise ImageFetchError(f"Not an http(s) image URL: {ref}")
+        if host not in self.allowed_hosts:
+            raise ImageFetchError(f"Image host not allowed: {host}")
+        try:
+            literal = ipaddress.ip_address(host)
+        except ValueError:
+            literal = None
+        if literal is not None and not is_public_address(host):
+            raise ImageFetchError(f"Image host is a non-public address: {host}")
+
+    async def fetch(self, ref: str, max_bytes: int) -> bytes:
+        import aiohttp
+
+        self.check_url(ref)
+        timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+        connector = aiohttp.TCPConnector(resolver=_public_resolver())
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            async with session.get(ref, allow_redirects=False) as response:
+                if response.status != 200:
+                    raise ImageFetchError(f"HTTP {response.status} fetching {ref}")
+                data = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    data.extend(chunk)
+                    if len(data) > max_bytes:
+                        raise ImageFetchError(f"Image too large: {ref}")
+                return bytes(data)
+
+
+class AutoImageStore:
+    """Routes http(s) references to HTTPImageStore and everything else to LocalImageStore"""
+
+    def __init__(self, local: LocalImageStore, http: HTTPImageStore):
+        self.local = local
+        self.http = http
+
+    async def fetch(self, ref: str, max_bytes: int) -> bytes:
+        store = self.http if ref.startswith(("http://", "https://")) else self.local
+        return await store.fetch(ref, max_bytes)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def preprocess_image(data: bytes, max_side: int, quality: int) -> tuple:
+    """
+    Decode, orient, strip metadata, downsample and hash one image
+
+    Runs in a worker process. Returns (jpeg_bytes, dhash, width, height).
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        # A fresh save without exif= writes no EXIF/XMP/GPS metadata
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+
+        # dHash: 9x8 grayscale, one bit per horizontal gradient
+        small = image.convert("L").resize((9, 8), Image.LANCZOS)
+        pixels = list(small.getdata())
+        dhash = 0
+        for row in range(8):
+            for col in range(8):
+                left = pixels[row * 9 + col]
+                right = pixels[row * 9 + col + 1]
+                dhash = (dhash << 1) | (1 if left > right else 0)
+
+        return output.getvalue(), dhash, image.width, image.height
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class PreparedImage:
+    """A preprocessed image ready to attach to a Gemini request"""
+
+    def __init__(self, ref: str, data: bytes, dhash: int, width: int, height: int, cached: bool):
+        self.ref = ref
+        self.data = data
+        self.dhash = dhash
+        self.width = width
+        self.height = height
+        self.cached = cached
+        self.mime_type = "image/jpeg"
+
+    def to_dict(self) -> dict:
+        return {
+            "ref": self.ref,
+            "bytes": len(self.data),
+            "width": self.width,
+            "height": self.height,
+            "dhash": f"{self.dhash:016x}",
+            "cached": self.cached
+        }
+
+
+class ImagePipeline:
+    """Fetch → preprocess (process pool) → cache → dedupe"""
+
+    def __init__(self, store, cache_dir: str, max_side: int, quality: int, max_bytes: int,
+                 max_images: int, dedupe_distance: int, workers: int, timeout_seconds: float):
+        self.store = store
+        self.cache_dir = cache_dir
+        self.max_side = max_side
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.max_images = max_images
+        self.dedupe_distance = dedupe_distance
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self._executor = None
+        self.processed = 0
+        self.cache_hits = 0
+        self.duplicates = 0
+        self.failures = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _cache_paths(self, ref: str) -> tuple:
+        # Settings are part of the key so changing resolution doesn't serve stale sizes
+        key = hashlib.sha256(f"{ref}|{self.max_side}|{self.quality}".encode("utf-8")).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(directory, f"{key}.jpg"), os.path.join(directory, f"{key}.json")
+
+    def _read_cache(self, ref: str):
+        image_path, meta_path = self._cache_paths(ref)
+        if not (os.path.exists(image_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return PreparedImage(ref, _read_file(image_path), int(meta["dhash"], 16), meta["width"], meta["height"], cached=True)
+
+    def _write_cache(self, image: PreparedImage):
+        image_path, meta_path = self._cache_paths(image.ref)
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        for path, content, mode in (
+            (image_path, image.data, "wb"),
+            (meta_path, json.dumps({"dhash": f"{image.dhash:016x}", "width": image.width, "height": image.height}), "w")
+        ):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+    async def prepare_one(self, ref: str) -> PreparedImage:
+        cached = await asyncio.to_thread(self._read_cache, ref)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        data = await self.store.fetch(ref, self.max_bytes)
+        loop = asyncio.get_running_loop()
+        jpeg, dhash, width, height = await loop.run_in_executor(
+            self.executor, preprocess_image, data, self.max_side, self.quality
+        )
+        image = PreparedImage(ref, jpeg, dhash, width, height, cached=False)
+        await asyncio.to_thread(self._write_cache, image)
+        self.processed += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(jpeg)
+        return image
+
+    async def prepare(self, refs: list) -> dict:
+        """
+        Prepare an issue's images for the model
+
+        Returns {"images": [PreparedImage], "skipped": [{ref, reason}]}.
+        Failed or slow images are skipped rather than failing the analysis.
+        """
+        refs = [r for r in dict.fromkeys(refs or []) if isinstance(r, str) and r.strip()]
+        considered = refs[:self.max_images * 2]  # headroom for duplicates and failures
+        skipped = [{"ref": r, "reason": "over image limit"} for r in refs[len(considered):]]
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self.prepare_one(ref), timeout=self.timeout_seconds) for ref in considered),
+            return_exceptions=True
+        )
+
+        images = []
+        for ref, result in zip(considered, results):
+            if isinstance(result, BaseException):
+                self.failures += 1
+                skipped.append({"ref": ref, "reason": str(result) or type(result).__name__})
+                continue
+            if any(hamming_distance(result.dhash, kept.dhash) <= self.dedupe_distance for kept in images):
+                self.duplicates += 1
+                skipped.append({"ref": ref, "reason": "near-duplicate"})
+                continue
+            if len(images) >= self.max_images:
+                skipped.append({"ref": ref, "reason": "over image limit"})
+                continue
+            images.append(result)
+
+        return {"images": images, "skipped": skipped}
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "cache_hits": self.cache_hits,
+            "duplicates": self.duplicates,
+            "failures": self.failures,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "max_side": self.max_side
+        }
+
+
+@lru_cache()
+def get_image_pipeline() -> ImagePipeline:
+    """Get the process-wide image pipeline"""
+    settings = get_settings()
+    local = LocalImageStore(settings.image_local_root)
+    http = HTTPImageStore(settings.image_timeout_seconds, allowed_image_hosts(settings))
+    store = {"local": local, "http": http}.get(settings.image_store) or AutoImageStore(local, http)
+    return ImagePipeline(
+        store=store,
+        cache_dir=settings.image_cache_dir,
+        max_side=settings.image_max_side,
+        quality=settings.image_jpeg_quality,
+        max_bytes=settings.image_max_bytes,
+        max_images=settings.image_max_per_issue,
+        dedupe_distance=settings.image_dedupe_distance,
+        workers=settings.image_process_workers,
+        timeout_seconds=settings.image_timeout_seconds
+    )
@@ -0,0 +1,61 @@
+"""
+Database lease rows for background jobs
+
+Every uvicorn worker starts the same background loops. A job that must run
+in one place at a time (see migrations/008_job_leases.sql) takes a lease
+row before each run:
+1. The current holder renews its own lease
+2. Anyone else takes it only once it has expired, so a crashed worker is
+   replaced after one lease period
+3. Both are single conditional UPDATEs, so two workers can't both win
+
+Session-level advisory locks don't fit here: PostgREST hands each request
+a pooled connection, so a lock taken by one call isn't held for the next.
+"""
+
+from utils.supabase_client import get_db
+from datetime import datetime, timedelta
+import os
+import socket
+import uuid
+
+
+class JobLease:
+    """A named lease held by this process for ttl_seconds at a time"""
+
+    def __init__(self, name: str, ttl_seconds: int):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.held_until = None
+
+    def acquire(self) -> bool:
+        """Renew or take the lease (blocking database calls); False if another process holds it"""
+        db = get_db()
+        now = datetime.utcnow()
+        values = {"holder": self.holder, "expires_at": (now + timedelta(seconds=self.ttl_seconds)).isoformat()}
+
+        renewed = db.table("job_leases").update(values).eq("name", self.name).eq("holder", self.holder).execute().data
+        taken = renewed or db.table("job_leases").update(values).eq("name", self.name).lt(
+            "expires_at", now.isoformat()
+        ).execute().data
+        if not taken and not db.table("job_leases").select("name").eq("name", self.name).execute().data:
+            # No row yet (the migration seeds one; in-memory databases start empty)
+            try:
+                db.table("job_leases").insert({"name": self.name, **values}).execute()
+                taken = True
+            except Exception:
+                taken = False  # Another process created it first
+
+        self.held_until = values["expires_at"] if taken else None
+        return bool(taken)
+
+    def release(self):
+        """Let another process take the lease right away"""
+        get_db().table("job_leases").update({"expires_at": datetime.utcnow().isoformat()}).eq(
+            "name", self.name
+        ).eq("holder", self.holder).execute()
+        self.held_until = None
+
+    def stats(self) -> dict:
+        return {"name": self.name, "holder": self.holder, "held_until": self.held_until}
@@ -0,0 +1,240 @@
+"""
+agent_logs retention: hourly rollups, compressed archival and pruning
+
+Periodically takes the oldest complete hour of agent_logs older than the
+retention window and, for that hour:
+1. Aggregates rows per agent_type/action (count, success, fallback,
+   confidence, latency min/max/mean/p50/p90/p99) into agent_log_rollups
+2. Writes the raw rows to a compressed NDJSON file (zstd when the optional
+   `zstandard` package is installed, gzip otherwise)
+3. Deletes the hour from agent_logs
+
+Hours are processed whole and rollups overwritten, so a run interrupted
+part-way can simply run again. Every worker starts the loop, but each run
+first takes the agent_log_retention lease (migrations/008_job_leases.sql),
+so only one worker archives and prunes at a time.
+"""
+
+from config import get_settings
+from utils.supabase_client import get_db
+from utils.job_lease import JobLease
+from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import gzip
+import json
+import os
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a database timestamp into naive UTC"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def is_fallback_log(row: dict) -> bool:
+    """True if an agent used its rule-based fallback instead of Gemini"""
+    if "fallback" in (row.get("error_message") or "").lower():
+        return True
+    output = row.get("output_data") or {}
+    return isinstance(output, dict) and "fallback" in str(output.get("reasoning", "")).lower()
+
+
+def exact_percentile(sorted_values: list, q: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def rollup_rows(hour: datetime, rows: list) -> list:
+    """Aggregate one hour of agent_logs rows per (agent_type, action)"""
+    groups = {}
+    for row in rows:
+        key = (row.get("agent_type") or "unknown", row.get("action") or "unknown")
+        groups.setdefault(key, []).append(row)
+
+    rollups = []
+    for (agent_type, action), group in groups.items():
+        latencies = sorted(r["execution_time_ms"] for r in group if r.get("execution_time_ms") is not None)
+        confidences = [r["confidence_score"] for r in group if r.get("confidence_score") is not None]
+        rollups.append({
+            "hour": hour.isoformat(),
+            "agent_type": agent_type,
+            "action": action,
+            "count": len(group),
+            "success_count": sum(1 for r in group if r.get("success")),
+            "fallback_count": sum(1 for r in group if is_fallback_log(r)),
+            "confidence_sum": float(sum(confidences)),
+            "confidence_count": len(confidences),
+            "latency_count": len(latencies),
+            "latency_sum_ms": sum(latencies),
+            "latency_min_ms": latencies[0] if latencies else None,
+            "latency_max_ms": latencies[-1] if latencies else None,
+            "latency_p50_ms": exact_percentile(latencies, 0.50),
+            "latency_p90_ms": exact_percentile(latencies, 0.90),
+            "latency_p99_ms": exact_percentile(latencies, 0.99),
+            "rolled_up_at": datetime.utcnow().isoformat()
+        })
+    return rollups
+
+
+def write_archive(archive_dir: str, hour: datetime, rows: list) -> str:
+    """Write one hour of raw rows as compressed NDJSON, returning the file path"""
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+
+    os.makedirs(archive_dir, exist_ok=True)
+    base = os.path.join(archive_dir, f"agent_logs-{hour:%Y%m%dT%H}.ndjson")
+    payload = "".join(json.dumps(row, default=str) + "\n" for row in rows).encode("utf-8")
+
+    if zstandard is not None:
+        path = base + ".zst"
+        data = zstandard.ZstdCompressor(level=10).compress(payload)
+    else:
+        path = base + ".gz"
+        data = gzip.compress(payload, compresslevel=9)
+
+    # Write then rename so a crash never leaves a truncated archive behind
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+class LogRetention:
+    """Periodic rollup, archive and prune job for agent_logs"""
+
+    def __init__(self, retention_days: int, archive_dir: str, interval_seconds: int,
+                 max_hours_per_run: int, page_size: int = 1000):
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.interval_seconds = interval_seconds
+        self.max_hours_per_run = max_hours_per_run
+        self.page_size = page_size
+        self.runs = 0
+        self.hours_processed = 0
+        self.rows_archived = 0
+        self.last_run = None
+        self.last_error = None
+        self.skipped_runs = 0
+        # Outlives the gap between runs so the holder keeps it while alive
+        self.lease = JobLease("agent_log_retention", ttl_seconds=2 * interval_seconds)
+        self._task = None
+
+    def cutoff(self) -> datetime:
+        """Start of the newest hour that is entirely outside the retention window"""
+        boundary = datetime.utcnow() - timedelta(days=self.retention_days)
+        return boundary.replace(minute=0, second=0, microsecond=0)
+
+    def _fetch_hour(self, db, hour: datetime) -> list:
+        rows, last_id = [], None
+        end = hour + timedelta(hours=1)
+        while True:
+            query = db.table("agent_logs").select("*").gte("created_at", hour.isoformat()).lt("created_at", end.isoformat())
+            if last_id:
+                query = query.gt("id", last_id)
+            page = query.order("id").limit(self.page_size).execute().data
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            last_id = page[-1]["id"]
+
+    def run_once(self) -> dict:
+        """Process up to max_hours_per_run of the oldest expired hours (if this worker holds the lease)"""
+        db = get_db()
+        cutoff = self.cutoff()
+        hours = []
+
+        if not self.lease.acquire():
+            self.skipped_runs += 1
+            return {"cutoff": cutoff.isoformat(), "hours": [], "skipped": "Another worker holds the retention lease"}
+
+        while len(hours) < self.max_hours_per_run:
+            oldest = db.table("agent_logs").select("created_at").lt(
+                "created_at", cutoff.isoformat()
+            ).order("created_at").limit(1).execute().data
+            if not oldest:
+                break
+
+            hour = parse_timestamp(oldest[0]["created_at"]).replace(minute=0, second=0, microsecond=0)
+            rows = self._fetch_hour(db, hour)
+            if not rows:
+                break  # Timestamp formats disagree with the hour filter; don't spin
+
+            archive_path = write_archive(self.archive_dir, hour, rows)
+            rollups = rollup_rows(hour, rows)
+            for rollup in rollups:
+                rollup["archive_path"] = archive_path
+            db.table("agent_log_rollups").upsert(rollups, on_conflict="hour,agent_type,action").execute()
+            db.table("agent_logs").delete().gte("created_at", hour.isoformat()).lt(
+                "created_at", (hour + timedelta(hours=1)).isoformat()
+            ).execute()
+
+            hours.append({"hour": hour.isoformat(), "rows": len(rows), "archive": archive_path})
+            self.rows_archived += len(rows)
+
+        self.runs += 1
+        self.hours_processed += len(hours)
+        self.last_run = datetime.utcnow().isoformat()
+        if hours:
+            print(f"🗄️ Agent log retention: archived {sum(h['rows'] for h in hours)} rows from {len(hours)} hours")
+        return {"cutoff": cutoff.isoformat(), "hours": hours}
+
+    async def _loop(self):
+        while True:
+            try:
+                # Database calls are blocking; keep them off the event loop
+                await asyncio.to_thread(self.run_once)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ Agent log retention failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Run periodically in the background (must run inside the event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(), name="agent-log-retention")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            if self.lease.held_until:
+                try:
+                    await asyncio.to_thread(self.lease.release)
+                except Exception as e:
+                    print(f"⚠️ Could not release the retention lease: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "retention_days": self.retention_days,
+            "cutoff": self.cutoff().isoformat(),
+            "archive_dir": self.archive_dir,
+            "runs": self.runs,
+            "skipped_runs": self.skipped_runs,
+            "lease": self.lease.stats(),
+            "hours_processed": self.hours_processed,
+            "rows_archived": self.rows_archived,
+            "last_run": self.last_run,
+            "last_error": self.last_error
+        }
+
+
+@lru_cache()
+def get_log_retention() -> LogRetention:
+    """Get the process-wide agent_logs retention job"""
+    settings = get_settings()
+    return LogRetention(
+        retention_days=settings.agent_log_retention_days,
+        archive_dir=settings.agent_log_archive_dir,
+        interval_seconds=settings.agent_log_retention_interval_seconds,
+        max_hours_per_run=settings.agent_log_retention_max_hours_per_run
+    )
@@ -0,0 +1,551 @@
+"""
+In-memory stand-in for the Supabase client
+
+Implements the slice of the postgrest query-builder API this backend uses
+(table().select/insert/update/upsert/delete, eq/neq/in_/gt/gte/lt/lte,
+order/limit/range, execute) including embedded relations such as
+"*, issues(*)" or "tasks(*, action_plans(*, issues(*)))".
+
+Meant for offline profiling and load testing: per-call latency can be
+injected and queries are counted globally and per request.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import copy
+import json
+import random
+import threading
+import time
+import uuid
+
+
+_current_counter = ContextVar("memory_db_query_counter", default=None)
+
+
+class QueryCounter:
+    """Counts queries executed while it is the active counter"""
+
+    def __init__(self):
+        self.count = 0
+        self.by_table = {}
+
+    def record(self, table: str, operation: str):
+        self.count += 1
+        key = f"{operation}:{table}"
+        self.by_table[key] = self.by_table.get(key, 0) + 1
+
+
+@contextmanager
+def track_queries():
+    """Count every query executed in this context (e.g. one HTTP request)"""
+    counter = QueryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+class MemoryResponse:
+    """Mimics postgrest's APIResponse"""
+
+    def __init__(self, data: list, count: int = None):
+        self.data = data
+        self.count = count
+
+
+def _singular(table: str) -> str:
+    return table[:-1] if table.endswith("s") else table
+
+
+def _split_top_level(text: str) -> list:
+    """Split a select string on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def parse_select(columns: str) -> list:
+    """
+    Parse a postgrest select string into a tree
+
+    "*, issues(title, location)" -> [("*", None), ("issues", [("title", None), ("location", None)])]
+    Columns may be renamed with "alias:column".
+    """
+    tree = []
+    for part in _split_top_level(columns or "*"):
+        if "(" in part and part.endswith(")"):
+            name = part[:part.index("(")].strip()
+            tree.append((name, parse_select(part[part.index("(") + 1:-1])))
+        else:
+            tree.append((part, None))
+    return tree
+
+
+def get_path(row: dict, column: str):
+    """Read a column, following JSON operators like metadata->>key or a->b->>c"""
+    if "->" not in column:
+        return row.get(column)
+    parts = column.replace("->>", "->").split("->")
+    value = row.get(parts[0])
+    for key in parts[1:]:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _comparable(value):
+    # Mixed types (e.g. None vs str) compare as strings, like text columns
+    return (value is None, value if isinstance(value, (int, float)) else str(value) if value is not None else "")
+
+
+class MemoryQuery:
+    """Chainable query builder for one table"""
+
+    def __init__(self, client: "InMemoryClient", table: str):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.columns = "*"
+        self.count_mode = None
+        self.payload = None
+        self.on_conflict = "id"
+        self.filters = []
+        self.orders = []
+        self.limit_count = None
+        self.offset = 0
+
+    # Operations
+    def select(self, columns: str = "*", count: str = None):
+        self.operation = "select"
+        self.columns = columns
+        self.count_mode = count
+        return self
+
+    def insert(self, rows):
+        self.operation = "insert"
+        self.payload = rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id"):
+        self.operation = "upsert"
+        self.payload = rows
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, values: dict):
+        self.operation = "update"
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    # Filters
+    def eq(self, column, value):
+        self.filters.append((column, lambda v: v == value or (v is not None and str(v) == str(value))))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append((column, lambda v: v != value))
+        return self
+
+    def in_(self, column, values):
+        allowed = set(str(v) for v in values)
+        self.filters.append((column, lambda v: v is not None and str(v) in allowed))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append((column, lambda v: v is not None and _comparable(v) > _comparable(value)))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append((column, lambda v: v is not None and _comparable(v) >= _comparable(value)))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append((column, lambda v: v is not None and _comparable(v) < _comparable(value)))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append((column, lambda v: v is not None and _comparable(v) <= _comparable(value)))
+        return self
+
+    def is_(self, column, value):
+        expected = None if value in (None, "null") else value
+        self.filters.append((column, lambda v: v is expected or v == expected))
+        return self
+
+    # Modifiers
+    def order(self, column, desc: bool = False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count: int):
+        self.limit_count = count
+        return self
+
+    def range(self, start: int, end: int):
+        self.offset = start
+        self.limit_count = end - start + 1
+        return self
+
+    def _matches(self, row: dict) -> bool:
+        return all(test(get_path(row, column)) for column, test in self.filters)
+
+    def execute(self) -> MemoryResponse:
+        return self.client._execute(self)
+
+
+class InMemoryClient:
+    """Drop-in replacement for supabase.Client backed by Python dicts"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = None):
+        self.tables = {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.query_count = 0
+        self.queries_by_table = {}
+        self.triggers = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    # Alias used by newer supabase-py versions
+    def from_(self, name: str) -> MemoryQuery:
+        return self.table(name)
+
+    def register_trigger(self, table: str, fn):
+        """Call fn(client, operation, old_row, new_row) after every row change on table"""
+        self.triggers.setdefault(table, []).append(fn)
+
+    def seed(self, data: dict):
+        """Bulk-load rows: {table_name: [rows]} without latency or query counting"""
+        with self._lock:
+            for table, rows in data.items():
+                target = self.tables.setdefault(table, [])
+                for row in copy.deepcopy(rows):
+                    target.append(row)
+                    self._fire(table, "INSERT", None, row)
+
+    def load_seed_file(self, path: str):
+        with open(path) as f:
+            self.seed(json.load(f))
+
+    def reset_stats(self):
+        self.query_count = 0
+        self.queries_by_table = {}
+
+    def stats(self) -> dict:
+        return {
+            "query_count": self.query_count,
+            "queries_by_table": dict(self.queries_by_table),
+            "rows": {name: len(rows) for name, rows in self.tables.items()}
+        }
+
+    def _inject_latency(self):
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += self._rng.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _record(self, table: str, operation: str):
+        self.query_count += 1
+        key = f"{operation}:{table}"
+        self.queries_by_table[key] = self.queries_by_table.get(key, 0) + 1
+        counter = _current_counter.get()
+        if counter is not None:
+            counter.record(table, operation)
+
+    def _fire(self, table: str, operation: str, old_row, new_row):
+        for fn in self.triggers.get(table, []):
+            fn(self, operation, old_row, new_row)
+
+    def _execute(self, query: MemoryQuery) -> MemoryResponse:
+        self._record(query.table, query.operation)
+        self._inject_latency()
+
+        with self._lock:
+            rows = self.tables.setdefault(query.table, [])
+
+            if query.operation == "select":
+                matched = [r for r in rows if query._matches(r)]
+                for column, desc in reversed(query.orders):
+                    matched.sort(key=lambda r: _comparable(get_path(r, column)), reverse=desc)
+                total = len(matched)
+                if query.offset:
+                    matched = matched[query.offset:]
+                if query.limit_count is not None:
+                    matched = matched[:query.limit_count]
+                tree = parse_select(query.columns)
+                data = [self._project(query.table, r, tree) for r in matched]
+                return MemoryResponse(data, total if query.count_mode else None)
+
+            if query.operation == "insert":
+                new_rows = query.payload if isinstance(query.payload, list) else [query.payload]
+                inserted = []
+                for row in new_rows:
+                    row = copy.deepcopy(row)
+                    row.setdefault("id", str(uuid.uuid4()))
+                    row.setdefault("created_at", datetime.utcnow().isoformat())
+                    rows.append(row)
+                    inserted.append(row)
+                    self._fire(query.table, "INSERT", None, row)
+                return MemoryResponse(copy.deepcopy(inserted))
+
+            if query.operation == "upsert":
+                new_rows = query.payload if isinstance(query.payload, list) else [query.payload]
+                keys = [k.strip() for k in query.on_conflict.split(",")]
+                written = []
+                for row in new_rows:
+                    existing = next((r for r in rows if all(r.get(k) == row.get(k) for k in keys)), None)
+                    if existing is not None:
+                        old = copy.deepcopy(existing)
+                        existing.update(copy.deepcopy(row))
+                        written.append(existing)
+                        self._fire(query.table, "UPDATE", old, existing)
+                    else:
+                        row = copy.deepcopy(row)
+                        row.setdefault("id", str(uuid.uuid4()))
+                        row.setdefault("created_at", datetime.utcnow().isoformat())
+                        rows.append(row)
+                        written.append(row)
+                        self._fire(query.table, "INSERT", None, row)
+                return MemoryResponse(copy.deepcopy(written))
+
+            if query.operation == "update":
+                updated = []
+                for row in rows:
+                    if query._matches(row):
+                        old = copy.deepcopy(row)
+                        row.update(copy.deepcopy(query.payload))
+                        updated.append(row)
+                        self._fire(query.table, "UPDATE", old, row)
+                return MemoryResponse(copy.deepcopy(updated))
+
+            if query.operation == "delete":
+                kept, deleted = [], []
+                for row in rows:
+                    (deleted if query._matches(row) else kept).append(row)
+                self.tables[query.table] = kept
+                for row in deleted:
+                    self._fire(query.table, "DELETE", row, None)
+                return MemoryResponse(deleted)
+
+        raise ValueError(f"Unsupported operation: {query.operation}")
+
+    def _project(self, table: str, row: dict, tree: list) -> dict:
+        """Apply a parsed select tree to a row, resolving embedded relations"""
+        result = {}
+        for name, children in tree:
+            if children is None:
+                if name == "*":
+                    result.update(copy.deepcopy(row))
+                elif ":" in name:
+                    # Renamed column: "alias:column" (e.g. "reasoning:output_data->>reasoning")
+                    alias, column = name.split(":", 1)
+                    result[alias.strip()] = copy.deepcopy(get_path(row, column.strip()))
+                else:
+                    result[name] = copy.deepcopy(get_path(row, name))
+                continue
+
+            # Many-to-one: this row holds <relation>_id (e.g. tasks.action_plan_id -> action_plans)
+            fk = f"{_singular(name)}_id"
+            related_rows = self.tables.get(name, [])
+            if fk in row:
+                target = next((r for r in related_rows if r.get("id") == row[fk]), None)
+                result[name] = self._project(name, target, children) if target else None
+            else:
+                # One-to-many: related rows hold <this table>_id
+                back_fk = f"{_singular(table)}_id"
+                result[name] = [
+                    self._project(name, r, children)
+                    for r in related_rows if r.get(back_fk) == row.get("id")
+                ]
+        return result
+
+
+def volunteer_workload_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    """Python twin of migrations/001_volunteer_workload.sql"""
+    active = ("assigned", "in_progress")
+    old_active = bool(old) and old.get("status") in active
+    new_active = bool(new) and new.get("status") in active
+
+    def bump(volunteer_id, delta):
+        counters = client.tables.setdefault("volunteer_workload", [])
+        row = next((r for r in counters if r["volunteer_id"] == volunteer_id), None)
+        if row is None:
+            row = {"volunteer_id": volunteer_id, "active_assignments": 0}
+            counters.append(row)
+        row["active_assignments"] = max(0, row["active_assignments"] + delta)
+        row["updated_at"] = datetime.utcnow().isoformat()
+
+    if old and new and old.get("volunteer_id") != new.get("volunteer_id"):
+        if old_active:
+            bump(old["volunteer_id"], -1)
+        if new_active:
+            bump(new["volunteer_id"], 1)
+    elif old_active and not new_active:
+        bump(old["volunteer_id"], -1)
+    elif new_active and not old_active:
+        bump(new["volunteer_id"], 1)
+
+
+RESOLVED_ISSUE_STATUSES = ("completed", "verified")
+APPROVED_VERIFICATION_STATUSES = ("approved", "verified")
+
+
+def _find(client: InMemoryClient, table: str, row_id):
+    return next((r for r in client.tables.get(table, []) if r.get("id") == row_id), None) if row_id else None
+
+
+def _plan_category(client: InMemoryClient, plan_id):
+    plan = _find(client, "action_plans", plan_id)
+    issue = _find(client, "issues", plan.get("issue_id")) if plan else None
+    return issue.get("category") if issue else None
+
+
+def bump_impact_rollup(client: InMemoryClient, category, column: str, delta):
+    """Python twin of bump_impact_rollup() in migrations/002_impact_rollups.sql"""
+    if not delta:
+        return
+    rollups = client.tables.setdefault("impact_rollups", [])
+    category = category or "other"
+    row = next((r for r in rollups if r["category"] == category), None)
+    if row is None:
+        row = {"category": category, "issues_total": 0, "issues_resolved": 0, "plans_total": 0,
+               "plans_completed": 0, "assignments_total": 0, "assignments_completed": 0,
+               "volunteer_hours": 0, "verifications_total": 0, "verifications_approved": 0}
+        rollups.append(row)
+    row[column] += delta
+    row["updated_at"] = datetime.utcnow().isoformat()
+
+
+def _flag(row: dict, column: str, values) -> int:
+    return 1 if row and row.get(column) in values else 0
+
+
+def issues_impact_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    if old:
+        bump_impact_rollup(client, old.get("category"), "issues_total", -1)
+        bump_impact_rollup(client, old.get("category"), "issues_resolved", -_flag(old, "status", RESOLVED_ISSUE_STATUSES))
+    if new:
+        bump_impact_rollup(client, new.get("category"), "issues_total", 1)
+        bump_impact_rollup(client, new.get("category"), "issues_resolved", _flag(new, "status", RESOLVED_ISSUE_STATUSES))
+    if old and new and (old.get("category") or "other") != (new.get("category") or "other"):
+        for column, delta in _issue_dependent_counts(client, new.get("id")).items():
+            bump_impact_rollup(client, old.get("category"), column, -delta)
+            bump_impact_rollup(client, new.get("category"), column, delta)
+
+
+def _issue_dependent_counts(client: InMemoryClient, issue_id) -> dict:
+    """Impact counts of an issue's plans, assignments and verifications (migrations/009)"""
+    plans = [p for p in client.tables.get("action_plans", []) if p.get("issue_id") == issue_id]
+    plan_ids = set(p["id"] for p in plans)
+    tasks = {t["id"]: t for t in client.tables.get("tasks", []) if t.get("action_plan_id") in plan_ids}
+    assignments = [a for a in client.tables.get("task_assignments", []) if a.get("task_id") in tasks]
+    completed = [a for a in assignments if a.get("status") == "completed"]
+    verifications = [v for v in client.tables.get("impact_verifications", []) if v.get("action_plan_id") in plan_ids]
+    return {
+        "plans_total": len(plans),
+        "plans_completed": sum(_flag(p, "status", ("completed",)) for p in plans),
+        "assignments_total": len(assignments),
+        "assignments_completed": len(completed),
+        "volunteer_hours": sum(tasks[a["task_id"]].get("estimated_hours") or 0 for a in completed),
+        "verifications_total": len(verifications),
+        "verifications_approved": sum(_flag(v, "verification_status", APPROVED_VERIFICATION_STATUSES) for v in verifications)
+    }
+
+
+def action_plans_impact_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    row = new or old
+    issue = _find(client, "issues", row.get("issue_id"))
+    category = issue.get("category") if issue else None
+    bump_impact_rollup(client, category, "plans_total", (1 if not old else 0) - (1 if not new else 0))
+    bump_impact_rollup(client, category, "plans_completed",
+                       _flag(new, "status", ("completed",)) - _flag(old, "status", ("completed",)))
+
+
+def task_assignments_impact_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    task = _find(client, "tasks", (new or old).get("task_id")) or {}
+    category = _plan_category(client, task.get("action_plan_id"))
+    done_delta = _flag(new, "status", ("completed",)) - _flag(old, "status", ("completed",))
+    bump_impact_rollup(client, category, "assignments_total", (1 if not old else 0) - (1 if not new else 0))
+    bump_impact_rollup(client, category, "assignments_completed", done_delta)
+    bump_impact_rollup(client, category, "volunteer_hours", done_delta * (task.get("estimated_hours") or 0))
+
+
+def impact_verifications_impact_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    category = _plan_category(client, (new or old).get("action_plan_id"))
+    bump_impact_rollup(client, category, "verifications_total", (1 if not old else 0) - (1 if not new else 0))
+    bump_impact_rollup(client, category, "verifications_approved",
+                       _flag(new, "verification_status", APPROVED_VERIFICATION_STATUSES)
+                       - _flag(old, "verification_status", APPROVED_VERIFICATION_STATUSES))
+
+
+def task_assignments_reliability_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    """Python twin of migrations/004_volunteer_reliability.sql"""
+    from utils.reliability import outcome_weights, apply_outcome
+
+    if not new or (old and old.get("status") == new.get("status")):
+        return
+    success, failure = outcome_weights(new.get("status"))
+    if not success and not failure:
+        return
+    rows = client.tables.setdefault("volunteer_reliability", [])
+    row = next((r for r in rows if r["volunteer_id"] == new["volunteer_id"]), None)
+    updated = apply_outcome(row, success, failure, datetime.utcnow())
+    if row is None:
+        old_row, row = None, {"volunteer_id": new["volunteer_id"]}
+        rows.append(row)
+    else:
+        old_row = dict(row)
+    row.update(updated)
+    client._fire("volunteer_reliability", "UPDATE" if old_row else "INSERT", old_row, row)
+
+
+def volunteer_reliability_sync_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    if new and new.get("score") is not None:
+        volunteer = _find(client, "volunteers", new.get("volunteer_id"))
+        score = round(new["score"], 4)
+        if volunteer is not None and volunteer.get("reliability_score") != score:
+            volunteer["reliability_score"] = score
+            volunteer["updated_at"] = datetime.utcnow().isoformat()
+
+
+def volunteers_touch_updated_at_trigger(client: InMemoryClient, operation: str, old: dict, new: dict):
+    """Python twin of migrations/006_volunteer_updated_at.sql (stamps the stored row in place)"""
+    if operation == "INSERT":
+        new.setdefault("updated_at", datetime.utcnow().isoformat())
+    elif operation == "UPDATE":
+        new["updated_at"] = datetime.utcnow().isoformat()
+
+
+def install_default_triggers(client: InMemoryClient):
+    """Register Python equivalents of the SQL triggers in migrations/"""
+    client.register_trigger("task_assignments", volunteer_workload_trigger)
+    client.register_trigger("issues", issues_impact_trigger)
+    client.register_trigger("action_plans", action_plans_impact_trigger)
+    client.register_trigger("task_assignments", task_assignments_impact_trigger)
+    client.register_trigger("impact_verifications", impact_verifications_impact_trigger)
+    client.register_trigger("task_assignments", task_assignments_reliability_trigger)
+    client.register_trigger("volunteer_reliability", volunteer_reliability_sync_trigger)
+    client.register_trigger("volunteers", volunteers_touch_updated_at_trigger)
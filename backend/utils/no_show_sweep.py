@@ -0,0 +1,158 @@
+"""
+No-shows from missing check-ins
+
+A volunteer who never checks in leaves their assignment 'assigned' (or
+'accepted') forever, so the reliability trigger
+(migrations/004_volunteer_reliability.sql) never sees the no-show.
+Periodically this job:
+1. Pages through assignments still waiting for a check-in
+2. Looks up each one's wall-clock window from the schedule matching stored
+   on its plan (utils.workload.scheduled_window)
+3. Marks those whose window started more than NO_SHOW_GRACE_MINUTES ago
+   as 'no_show' through apply_status_updates, so task progress, workload
+   counters and reliability follow as for a manual status change
+
+Assignments whose plan has no scheduled start are left alone. Like log
+retention, each run first takes a lease (migrations/008_job_leases.sql) so
+only one worker sweeps at a time.
+"""
+
+from config import get_settings
+from utils.supabase_client import get_db
+from utils.assignments import apply_status_updates
+from utils.availability import local_now
+from utils.job_lease import JobLease
+from utils.workload import scheduled_window
+from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+
+
+# Statuses of assignments whose volunteer hasn't checked in yet
+AWAITING_CHECK_IN_STATUSES = ["assigned", "accepted"]
+
+# Keep in_() filters comfortably inside URL length limits
+ID_CHUNK_SIZE = 200
+
+
+def _select_in(table: str, columns: str, column: str, values: list) -> list:
+    db = get_db()
+    rows = []
+    for i in range(0, len(values), ID_CHUNK_SIZE):
+        rows.extend(db.table(table).select(columns).in_(column, values[i:i + ID_CHUNK_SIZE]).execute().data)
+    return rows
+
+
+def overdue_assignments(assignments: list, now: datetime, grace: timedelta) -> list:
+    """Ids of assignments whose task window started before now - grace (two reads: tasks, plans)"""
+    task_ids = sorted(set(a["task_id"] for a in assignments))
+    plan_by_task = {t["id"]: t.get("action_plan_id") for t in _select_in("tasks", "id, action_plan_id", "id", task_ids)}
+    plan_ids = sorted(set(p for p in plan_by_task.values() if p))
+    plans = {p["id"]: p for p in _select_in("action_plans", "id, metadata", "id", plan_ids)}
+
+    overdue = []
+    for a in assignments:
+        window = scheduled_window(plans.get(plan_by_task.get(a["task_id"])), a["task_id"])
+        if window and window[0] + grace <= now:
+            overdue.append(a["id"])
+    return overdue
+
+
+class NoShowSweep:
+    """Periodic job turning missed check-ins into no_show assignments"""
+
+    def __init__(self, grace_minutes: int, interval_seconds: int, page_size: int = 1000):
+        self.grace = timedelta(minutes=grace_minutes)
+        self.interval_seconds = interval_seconds
+        self.page_size = page_size
+        self.runs = 0
+        self.skipped_runs = 0
+        self.no_shows = 0
+        self.last_run = None
+        self.last_error = None
+        self.lease = JobLease("no_show_sweep", ttl_seconds=2 * interval_seconds)
+        self._task = None
+
+    def run_once(self) -> dict:
+        """Mark every overdue assignment without a check-in as no_show (if this worker holds the lease)"""
+        if not self.lease.acquire():
+            self.skipped_runs += 1
+            return {"no_shows": 0, "skipped": "Another worker holds the no-show sweep lease"}
+
+        db = get_db()
+        now = local_now()
+        overdue, last_id = [], None
+        while True:
+            query = db.table("task_assignments").select("id, task_id, status").in_("status", AWAITING_CHECK_IN_STATUSES)
+            if last_id:
+                query = query.gt("id", last_id)
+            page = query.order("id").limit(self.page_size).execute().data
+            if page:
+                overdue.extend(overdue_assignments(page, now, self.grace))
+            if len(page) < self.page_size:
+                break
+            last_id = page[-1]["id"]
+
+        result = {"updated": 0, "failed": []}
+        if overdue:
+            # Re-read and written only if the status is unchanged, so a racing check-in wins
+            result = apply_status_updates([
+                {"assignment_id": a_id, "status": "no_show", "notes": "No check-in by the scheduled start"}
+                for a_id in overdue
+            ])
+
+        self.runs += 1
+        self.no_shows += result["updated"]
+        self.last_run = datetime.utcnow().isoformat()
+        if result["updated"]:
+            print(f"🚫 No-show sweep: {result['updated']} assignments marked no_show")
+        return {"no_shows": result["updated"], "failed": result["failed"]}
+
+    async def _loop(self):
+        while True:
+            try:
+                # Database calls are blocking; keep them off the event loop
+                await asyncio.to_thread(self.run_once)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ No-show sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Run periodically in the background (must run inside the event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(), name="no-show-sweep")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            if self.lease.held_until:
+                try:
+                    await asyncio.to_thread(self.lease.release)
+                except Exception as e:
+                    print(f"⚠️ Could not release the no-show sweep lease: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "grace_minutes": int(self.grace.total_seconds() // 60),
+            "runs": self.runs,
+            "skipped_runs": self.skipped_runs,
+            "no_shows": self.no_shows,
+            "lease": self.lease.stats(),
+            "last_run": self.last_run,
+            "last_error": self.last_error
+        }
+
+
+@lru_cache()
+def get_no_show_sweep() -> NoShowSweep:
+    """Get the process-wide no-show sweep job"""
+    settings = get_settings()
+    return NoShowSweep(
+        grace_minutes=settings.no_show_grace_minutes,
+        interval_seconds=settings.no_show_sweep_interval_seconds
+    )
@@ -0,0 +1,323 @@
+"""
+Plan similarity index for reusing historical action plans
+
+Issues are embedded as hashed TF-IDF vectors (feature hashing, no vocabulary
+to maintain). Candidates are found with random-hyperplane LSH (SimHash over
+several tables) and re-ranked by exact cosine similarity, so lookups touch a
+handful of stored plans instead of the whole history. Plans generated
+between rebuilds are added as they come; past max_plans the oldest entries
+are evicted so memory stays bounded.
+"""
+
+from config import get_settings
+from utils.supabase_client import get_db
+from functools import lru_cache
+import asyncio
+import copy
+import math
+import re
+import time
+import zlib
+
+
+STOPWORDS = {
+    "the", "and", "for", "are", "but", "not", "you", "all", "any", "can", "has", "have",
+    "was", "our", "out", "this", "that", "with", "from", "they", "there", "their", "been",
+    "into", "near", "needs", "need", "very", "some", "also", "its", "it's", "is",
+    "in", "on", "at", "of", "to", "a", "an", "be", "by", "or", "as", "we", "it"
+}
+
+URGENCY_TO_PLAN_PRIORITY = {
+    "critical": "high",
+    "high": "high",
+    "medium": "medium",
+    "low": "low"
+}
+
+# Entries allowed past max_plans before the oldest are evicted in one pass
+EVICTION_SLACK_FRACTION = 0.1
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens with stopwords removed"""
+    return [t for t in re.findall(r"[a-z0-9]+", (text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _bucket(token: str, dims: int) -> int:
+    return zlib.crc32(token.encode("utf-8")) % dims
+
+
+def _plane_sign(bucket: int, plane: int) -> int:
+    """Deterministic ±1 component of random hyperplane `plane` at `bucket`"""
+    return 1 if zlib.crc32(f"{plane}:{bucket}".encode("ascii")) & 1 else -1
+
+
+def issue_document(issue: dict, category: str = None) -> str:
+    """Text used to embed an issue: title weighted twice, description, category"""
+    title = issue.get("title", "")
+    return f"{title} {title} {issue.get('description', '')} {category or issue.get('category', '')}"
+
+
+class PlanIndex:
+    """In-memory ANN index over past issues and their planning analysis"""
+
+    def __init__(self, dims: int = 4096, tables: int = 8, bits_per_table: int = 6, max_plans: int = None):
+        self.dims = dims
+        self.tables = tables
+        self.bits_per_table = bits_per_table
+        self.max_plans = max_plans
+        self.evicted = 0
+        self.entries = []
+        self.plan_ids = set()
+        self.doc_freq = {}
+        self.buckets = [{} for _ in range(tables)]
+        self.built_at = None
+        self.lookups = 0
+        self.hits = 0
+        self.forced_misses = 0
+        self._lock = asyncio.Lock()
+        self._recorded_during_rebuild = None
+
+    def _term_counts(self, text: str) -> dict:
+        counts = {}
+        for token in tokenize(text):
+            b = _bucket(token, self.dims)
+            counts[b] = counts.get(b, 0) + 1
+        return counts
+
+    def _signatures(self, counts: dict) -> list:
+        # Sublinear TF for hashing so long descriptions don't dominate
+        weights = {b: 1.0 + math.log(c) for b, c in counts.items()}
+        signatures = []
+        for t in range(self.tables):
+            sig = 0
+            for bit in range(self.bits_per_table):
+                plane = t * self.bits_per_table + bit
+                dot = sum(w * _plane_sign(b, plane) for b, w in weights.items())
+                sig = (sig << 1) | (1 if dot >= 0 else 0)
+            signatures.append(sig)
+        return signatures
+
+    def _tfidf(self, counts: dict) -> dict:
+        n = len(self.entries) + 1
+        vector = {
+            b: (1.0 + math.log(c)) * (math.log(n / (1 + self.doc_freq.get(b, 0))) + 1.0)
+            for b, c in counts.items()
+        }
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {b: v / norm for b, v in vector.items()}
+
+    def add(self, plan_id: str, issue: dict, category: str, plan_data: dict):
+        """Index a generated plan under the issue it was created for"""
+        if plan_id in self.plan_ids or not plan_data.get("tasks"):
+            return
+
+        counts = self._term_counts(issue_document(issue, category))
+        if not counts:
+            return
+
+        entry = {
+            "action_plan_id": plan_id,
+            "category": category,
+            "counts": counts,
+            "plan_data": plan_data,
+            "confidence": plan_data.get("confidence", 0.0),
+            "signatures": self._signatures(counts)
+        }
+        self._insert(entry)
+
+        if self.max_plans and len(self.entries) > self.max_plans + max(1, int(self.max_plans * EVICTION_SLACK_FRACTION)):
+            self._evict_oldest(len(self.entries) - self.max_plans)
+
+    def _insert(self, entry: dict):
+        idx = len(self.entries)
+        self.entries.append(entry)
+        self.plan_ids.add(entry["action_plan_id"])
+
+        for b in entry["counts"]:
+            self.doc_freq[b] = self.doc_freq.get(b, 0) + 1
+        for t, sig in enumerate(entry["signatures"]):
+            self.buckets[t].setdefault(sig, []).append(idx)
+
+    def _evict_oldest(self, count: int):
+        """Drop the first `count` entries and re-index the rest (bucket positions shift)"""
+        kept = self.entries[count:]
+        self.entries = []
+        self.plan_ids = set()
+        self.doc_freq = {}
+        self.buckets = [{} for _ in range(self.tables)]
+        for entry in kept:
+            self._insert(entry)
+        self.evicted += count
+
+    def search(self, issue: dict, category: str, limit: int = 3) -> list:
+        """Return (similarity, entry) pairs for the closest indexed plans in the same category"""
+        counts = self._term_counts(issue_document(issue, category))
+        if not counts:
+            return []
+
+        candidates = set()
+        for t, sig in enumerate(self._signatures(counts)):
+            candidates.update(self.buckets[t].get(sig, []))
+
+        query = self._tfidf(counts)
+        scored = []
+        for idx in candidates:
+            entry = self.entries[idx]
+            if entry["category"] != category:
+                continue
+            stored = self._tfidf(entry["counts"])
+            similarity = sum(w * stored.get(b, 0.0) for b, w in query.items())
+            scored.append((similarity, entry))
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return scored[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "indexed_plans": len(self.entries),
+            "max_plans": self.max_plans,
+            "evicted": self.evicted,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "forced_misses": self.forced_misses,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "built_at": self.built_at
+        }
+
+    def record(self, plan_id: str, issue: dict, category: str, plan_data: dict):
+        """Index a newly generated plan, keeping it for a rebuild that is reading the database"""
+        if self._recorded_during_rebuild is not None:
+            self._recorded_during_rebuild.append((plan_id, issue, category, plan_data))
+        if self.built_at:
+            self.add(plan_id, issue, category, plan_data)
+
+    def _load(self, max_plans: int, page_size: int) -> "PlanIndex":
+        """A new index over up to max_plans historical plans (blocking database reads)"""
+        db = get_db()
+        fresh = PlanIndex(self.dims, self.tables, self.bits_per_table, max_plans)
+        last_id = None
+        while len(fresh.entries) < max_plans:
+            query = db.table("action_plans").select("id, metadata, issues(title, description, category)")
+            if last_id:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(page_size).execute().data
+
+            for row in rows:
+                plan_data = (row.get("metadata") or {}).get("planning_analysis") or {}
+                issue = row.get("issues") or {}
+                if plan_data.get("reused_from"):
+                    continue  # Only index plans that came from a real planning call
+                fresh.add(row["id"], issue, issue.get("category"), plan_data)
+
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1]["id"]
+        return fresh
+
+    async def ensure_built(self, max_plans: int, rebuild_seconds: int, page_size: int = 200):
+        """
+        Load historical plans from the database on first use and periodically after
+
+        The reads run in a worker thread. Plans recorded meanwhile may be
+        behind the page cursor, so they are added to the new index before
+        it replaces the current one.
+        """
+        if self.built_at and time.time() - self.built_at < rebuild_seconds:
+            return
+
+        async with self._lock:
+            if self.built_at and time.time() - self.built_at < rebuild_seconds:
+                return
+
+            self._recorded_during_rebuild = []
+            try:
+                fresh = await asyncio.to_thread(self._load, max_plans, page_size)
+                for recorded in self._recorded_during_rebuild:
+                    fresh.add(*recorded)
+            finally:
+                self._recorded_during_rebuild = None
+
+            self.entries = fresh.entries
+            self.plan_ids = fresh.plan_ids
+            self.doc_freq = fresh.doc_freq
+            self.buckets = fresh.buckets
+            self.max_plans = max_plans
+            self.evicted += fresh.evicted
+            self.built_at = time.time()
+            print(f"🗂️ Plan reuse index built with {len(self.entries)} plans")
+
+
+def adapt_plan(stored_plan: dict, issue: dict, discovery_analysis: dict, similarity: float, source_plan_id: str) -> dict:
+    """Tailor a stored plan to a new issue: title, staffing and priority"""
+    plan = copy.deepcopy(stored_plan)
+    title = issue.get("title", "Community Issue")
+
+    # Scale staffing towards what Discovery estimated for this issue
+    stored_volunteers = stored_plan.get("required_volunteers") or 0
+    target_volunteers = discovery_analysis.get("estimated_volunteers_needed")
+    if stored_volunteers and target_volunteers:
+        scale = min(2.0, max(0.5, target_volunteers / stored_volunteers))
+        for task in plan.get("tasks", []):
+            task["required_people"] = max(1, round(task.get("required_people", 1) * scale))
+
+    plan["plan_title"] = f"Action Plan: {title}"
+    plan["plan_description"] = f"{stored_plan.get('plan_description', '')} (Adapted from a similar past plan.)".strip()
+    plan["required_volunteers"] = sum(t.get("required_people", 1) for t in plan.get("tasks", []))
+    plan["priority"] = URGENCY_TO_PLAN_PRIORITY.get(discovery_analysis.get("urgency"), stored_plan.get("priority", "medium"))
+    plan["confidence"] = round(stored_plan.get("confidence", 0.0) * similarity, 3)
+    plan["reused_from"] = {
+        "action_plan_id": source_plan_id,
+        "similarity": round(similarity, 3)
+    }
+    return plan
+
+
+async def find_reusable_plan(issue: dict, discovery_analysis: dict) -> dict:
+    """
+    Return an adapted plan from a sufficiently similar past issue, or None
+
+    A stored plan is reused only if it is in the same category, its cosine
+    similarity clears the configured threshold and its original confidence
+    clears the quality floor. Once the running hit rate exceeds the
+    configured cap, lookups fall through to a fresh planning call so the
+    index keeps learning.
+    """
+    settings = get_settings()
+    if not settings.plan_reuse_enabled:
+        return None
+
+    index = get_plan_index()
+    await index.ensure_built(settings.plan_reuse_max_indexed_plans, settings.plan_reuse_rebuild_seconds)
+
+    category = discovery_analysis.get("category", issue.get("category"))
+    index.lookups += 1
+
+    for similarity, entry in index.search(issue, category):
+        if similarity < settings.plan_reuse_similarity_threshold:
+            break
+        if entry["confidence"] < settings.plan_reuse_min_confidence:
+            continue
+
+        if index.hits / index.lookups >= settings.plan_reuse_max_hit_rate:
+            index.forced_misses += 1
+            return None
+
+        index.hits += 1
+        return adapt_plan(entry["plan_data"], issue, discovery_analysis, similarity, entry["action_plan_id"])
+
+    return None
+
+
+def record_generated_plan(plan_id: str, issue: dict, category: str, plan_data: dict):
+    """Add a freshly generated plan to the reuse index"""
+    settings = get_settings()
+    if not settings.plan_reuse_enabled or plan_data.get("reused_from"):
+        return
+    get_plan_index().record(plan_id, issue, category, plan_data)
+
+
+@lru_cache()
+def get_plan_index() -> PlanIndex:
+    """Get the process-wide plan reuse index"""
+    return PlanIndex()
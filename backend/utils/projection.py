@@ -0,0 +1,95 @@
+"""
+Column projection for list endpoints
+
+Endpoints accept `fields=title,status,...` to choose which columns come
+back. Requested names are validated against the table's known columns so
+typos become a 400 instead of a database error, and each endpoint has a
+slim default that leaves out large JSON blobs such as metadata.
+`fields=*` returns every column.
+"""
+
+from fastapi import HTTPException
+from typing import Optional
+
+
+ISSUE_COLUMNS = (
+    "id", "title", "description", "category", "location", "images", "status",
+    "priority", "created_by", "created_at", "metadata"
+)
+ISSUE_LIST_FIELDS = (
+    "id", "title", "description", "category", "location", "status", "priority", "images", "created_at"
+)
+
+ACTION_PLAN_COLUMNS = (
+    "id", "issue_id", "title", "description", "status", "priority", "estimated_duration_days",
+    "required_volunteers", "assigned_volunteers", "progress_percentage", "created_at", "metadata"
+)
+ACTION_PLAN_LIST_FIELDS = (
+    "id", "issue_id", "title", "description", "status", "priority", "estimated_duration_days",
+    "required_volunteers", "assigned_volunteers", "progress_percentage", "created_at", "issues"
+)
+ACTION_PLAN_RELATIONS = {
+    "issues": "issues(title, category, location)"
+}
+
+VOLUNTEER_COLUMNS = (
+    "id", "name", "email", "phone", "location", "skills", "availability",
+    "reliability_score", "created_at", "updated_at"
+)
+VOLUNTEER_LIST_FIELDS = (
+    "id", "name", "email", "location", "skills", "availability", "reliability_score", "created_at"
+)
+
+AGENT_LOG_COLUMNS = (
+    "id", "session_id", "agent_type", "action", "input_data", "output_data",
+    "confidence_score", "execution_time_ms", "success", "error_message", "created_at", "metadata"
+)
+AGENT_LOG_LIST_FIELDS = (
+    "id", "session_id", "agent_type", "action", "confidence_score",
+    "execution_time_ms", "success", "error_message", "created_at", "metadata"
+)
+
+# Assignment listings embed the task, its plan and issue without their metadata
+ASSIGNMENT_WITH_TASK_SELECT = (
+    "id, task_id, volunteer_id, status, assigned_at, started_at, completed_at, notes, "
+    "check_in_location, check_out_location, completion_notes, status_updated_at, "
+    "tasks(id, action_plan_id, name, description, status, priority, estimated_hours, required_people, skills_required, "
+    "action_plans(id, issue_id, title, status, priority, progress_percentage, "
+    "issues(id, title, category, location, status)))"
+)
+ASSIGNMENT_WITH_VOLUNTEER_SELECT = (
+    "id, task_id, volunteer_id, status, assigned_at, started_at, completed_at, notes, "
+    "check_in_location, check_out_location, completion_notes, status_updated_at, "
+    "volunteers(id, name, email, skills, location, reliability_score)"
+)
+
+
+def build_select(fields: Optional[str], columns: tuple, default: tuple, relations: dict = None) -> str:
+    """
+    Turn a `fields` query parameter into a select string
+
+    Unknown names raise a 400 listing what is allowed. `id` is always
+    included so clients can key rows.
+    """
+    relations = relations or {}
+
+    if fields is None or not fields.strip():
+        requested = list(default)
+    elif fields.strip() == "*":
+        return ", ".join(["*"] + list(relations.values()))
+    else:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+
+    unknown = [f for f in requested if f not in columns and f not in relations]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(list(columns) + list(relations))}"
+        )
+
+    if "id" not in requested:
+        requested.insert(0, "id")
+
+    # Keep order, drop duplicates
+    selected = list(dict.fromkeys(requested))
+    return ", ".join(relations.get(f, f) for f in selected)
@@ -0,0 +1,159 @@
+"""
+Volunteer reliability from assignment outcomes
+
+Reliability is estimated from exponentially decayed counts of completed
+and failed assignments, pulled towards a prior so new volunteers start at
+the old 0.8 default. This module:
+1. Maps assignment statuses to success/failure weights
+2. Applies one outcome to a volunteer's decayed counts in O(1), with the
+   same arithmetic as record_reliability_event() in
+   migrations/004_volunteer_reliability.sql (which runs it on every status
+   change)
+3. Backfills volunteer_reliability from task_assignments history, streamed
+   in keyset-paged batches
+"""
+
+from utils.supabase_client import get_db
+from utils.log_retention import parse_timestamp
+from datetime import datetime
+import asyncio
+import math
+import time
+
+
+RELIABILITY_PRIOR = 0.8
+PRIOR_STRENGTH = 2.0
+HALF_LIFE_DAYS = 180
+
+# status -> (success weight, failure weight); no_show is also set by
+# utils/no_show_sweep.py when a volunteer misses their check-in
+OUTCOME_WEIGHTS = {
+    "completed": (1.0, 0.0),
+    "no_show": (0.0, 1.0),
+    "dropped": (0.0, 0.5),
+    "withdrawn": (0.0, 0.5)
+}
+
+# Rows per volunteer_reliability upsert
+WRITE_CHUNK_SIZE = 500
+
+
+def outcome_weights(status: str) -> tuple:
+    """(success, failure) weights of an assignment status; (0, 0) if it isn't an outcome"""
+    return OUTCOME_WEIGHTS.get(status, (0.0, 0.0))
+
+
+def decay_factor(elapsed_seconds: float) -> float:
+    """How much a weight shrinks over elapsed_seconds"""
+    return math.exp(-math.log(2) * max(elapsed_seconds, 0.0) / (HALF_LIFE_DAYS * 86400))
+
+
+def reliability_score(completed_weight: float, failed_weight: float) -> float:
+    return (completed_weight + RELIABILITY_PRIOR * PRIOR_STRENGTH) / (
+        completed_weight + failed_weight + PRIOR_STRENGTH
+    )
+
+
+def apply_outcome(state: dict, success: float, failure: float, at: datetime) -> dict:
+    """
+    Decay a volunteer_reliability row to `at` and add one outcome
+
+    Args:
+        state: Existing row (or None for a volunteer's first outcome)
+        success / failure: Weights from outcome_weights()
+        at: When the outcome happened (naive UTC)
+
+    Returns:
+        The updated row fields
+    """
+    completed, failed, last = 0.0, 0.0, at
+    if state:
+        completed = state.get("completed_weight") or 0.0
+        failed = state.get("failed_weight") or 0.0
+        if state.get("last_event_at"):
+            last = parse_timestamp(state["last_event_at"])
+
+    decay = decay_factor((at - last).total_seconds())
+    completed = completed * decay + success
+    failed = failed * decay + failure
+    return {
+        "completed_weight": completed,
+        "failed_weight": failed,
+        "score": reliability_score(completed, failed),
+        "last_event_at": max(last, at).isoformat(),
+        "updated_at": datetime.utcnow().isoformat()
+    }
+
+
+def outcome_time(assignment: dict, default: datetime) -> datetime:
+    """Best available timestamp for when an assignment's outcome happened"""
+    for column in ("completed_at", "started_at", "assigned_at", "created_at"):
+        value = assignment.get(column)
+        if value:
+            try:
+                return parse_timestamp(value)
+            except (TypeError, ValueError):
+                continue
+    return default
+
+
+async def backfill_reliability(batch_size: int = 1000) -> dict:
+    """
+    Rebuild volunteer_reliability from every assignment outcome
+
+    Streams task_assignments in id order, decays each outcome to now and
+    upserts one row per volunteer (the sync trigger copies scores onto
+    volunteers). Meant to run once after applying the migration; outcomes
+    recorded while it runs may be counted twice.
+    """
+    db = get_db()
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    weights = {}  # volunteer_id -> [completed, failed]
+    scanned = batches = 0
+
+    last_id = None
+    while True:
+        query = db.table("task_assignments").select(
+            "id, volunteer_id, status, assigned_at, started_at, completed_at"
+        ).in_("status", list(OUTCOME_WEIGHTS))
+        if last_id:
+            query = query.gt("id", last_id)
+        rows = query.order("id").limit(batch_size).execute().data
+
+        for row in rows:
+            success, failure = outcome_weights(row["status"])
+            decay = decay_factor((now - outcome_time(row, now)).total_seconds())
+            totals = weights.setdefault(row["volunteer_id"], [0.0, 0.0])
+            totals[0] += success * decay
+            totals[1] += failure * decay
+
+        scanned += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1]["id"]
+        await asyncio.sleep(0)
+
+    records = [
+        {
+            "volunteer_id": volunteer_id,
+            "completed_weight": completed,
+            "failed_weight": failed,
+            "score": reliability_score(completed, failed),
+            "last_event_at": now.isoformat(),
+            "updated_at": now.isoformat()
+        }
+        for volunteer_id, (completed, failed) in weights.items()
+    ]
+    for i in range(0, len(records), WRITE_CHUNK_SIZE):
+        db.table("volunteer_reliability").upsert(records[i:i + WRITE_CHUNK_SIZE], on_conflict="volunteer_id").execute()
+        await asyncio.sleep(0)
+
+    print(f"🎯 Reliability backfill: {scanned} outcomes, {len(records)} volunteers")
+    return {
+        "outcomes_scanned": scanned,
+        "batches": batches,
+        "volunteers_updated": len(records),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
@@ -0,0 +1,78 @@
+"""
+Single-flight call coalescing
+
+Concurrent callers asking for the same key share one in-flight execution:
+the first caller runs the coroutine, later callers await its result (or
+exception). Once it finishes the key is free again, so this deduplicates
+overlapping work without caching results.
+"""
+
+import asyncio
+
+
+class SingleFlightAbandoned(Exception):
+    """Raised to waiters when the caller running the shared execution was cancelled"""
+
+
+class SingleFlight:
+    """Coalesces concurrent async calls that share a key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight = {}
+        self.waiters = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.shared_executions = 0
+        self.max_waiters = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless a call for `key` is already in flight"""
+        self.calls += 1
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            self.waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self.waiters[key])
+            # Shield so a cancelled waiter doesn't cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        self.waiters[key] = 0
+        self.executions += 1
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            # Waiters weren't cancelled themselves; give them an ordinary error to handle
+            future.set_exception(SingleFlightAbandoned(f"Shared {self.name} call for {key!r} was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else waited on isn't reported as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.in_flight[key]
+            if self.waiters.pop(key):
+                self.shared_executions += 1
+
+    def is_in_flight(self, key) -> bool:
+        return key in self.in_flight
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "shared_executions": self.shared_executions,
+            "in_flight": len(self.in_flight),
+            "waiting": sum(self.waiters.values()),
+            "max_waiters": self.max_waiters
+        }
@@ -1,20 +1,43 @@
-from supabase import create_client, Client
 from config import get_settings
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
-settings = get_settings()
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 @lru_cache()
-def get_supabase_client() -> Client:
-    """Get Supabase client singleton"""
+def get_supabase_client() -> "Client":
+    """Get Supabase client singleton (the SDK is imported on first use)"""
+    settings = get_settings()
+    if settings.database_backend == "memory":
+        return get_memory_client()
+    
+    from supabase import create_client
+    
     return create_client(
         supabase_url=settings.supabase_url,
         supabase_key=settings.supabase_anon_key
     )
 
 
+@lru_cache()
+def get_memory_client():
+    """Get the in-memory database stand-in (DATABASE_BACKEND=memory)"""
+    from utils.memory_db import InMemoryClient, install_default_triggers
+    
+    settings = get_settings()
+    client = InMemoryClient(
+        latency_ms=settings.memory_db_latency_ms,
+        jitter_ms=settings.memory_db_latency_jitter_ms
+    )
+    install_default_triggers(client)
+    if settings.memory_db_seed_path:
+        client.load_seed_file(settings.memory_db_seed_path)
+    return client
+
+
 # Convenience function
-def get_db() -> Client:
+def get_db() -> "Client":
     """Get database client"""
     return get_supabase_client()
@@ -0,0 +1,97 @@
+"""
+Intake triage for agent pipeline scheduling
+
+Discovery is the first point an LLM looks at an issue, but the pipeline has
+to order issues before that. This module:
+1. Pre-scores a new issue from keywords and its category (no LLM call)
+2. Turns Discovery's priority/urgency into a scheduling priority
+3. Maps a priority back to an urgency band for reporting
+"""
+
+import re
+
+
+URGENCY_LEVELS = ("low", "medium", "high", "critical")
+
+# Minimum scheduling priority implied by an urgency label
+URGENCY_FLOOR = {"low": 0.0, "medium": 0.4, "high": 0.7, "critical": 0.9}
+
+# Priority for issues whose text matches no keyword
+CATEGORY_BASE = {
+    "safety": 0.6,
+    "infrastructure": 0.5,
+    "environment": 0.4,
+    "social": 0.4,
+    "civic": 0.35,
+    "other": 0.35
+}
+
+KEYWORDS = {
+    "critical": [
+        "emergency", "fire", "smoke", "gas leak", "explosion", "live wire", "downed power line",
+        "power line down", "electrocut", "collapse", "collapsed", "sinkhole", "flooding", "flash flood",
+        "injured", "injury", "bleeding", "trapped", "drowning", "carbon monoxide", "toxic", "chemical spill",
+        "sewage overflow", "no water", "unsafe structure", "immediate danger", "life threatening"
+    ],
+    "high": [
+        "danger", "dangerous", "hazard", "unsafe", "urgent", "asap", "broken streetlight", "streetlight out",
+        "traffic light", "open manhole", "exposed", "leak", "burst", "blocked road", "fallen tree",
+        "pothole", "accident", "elderly", "children", "school", "shelter", "homeless", "no heat"
+    ],
+    "low": [
+        "graffiti", "litter", "trash", "bench", "paint", "repaint", "mural", "suggestion", "idea",
+        "beautif", "cosmetic", "faded", "weeds", "overgrown", "noise"
+    ]
+}
+
+_PATTERNS = {
+    level: re.compile(r"\b(" + "|".join(re.escape(k) for k in words) + r")", re.IGNORECASE)
+    for level, words in KEYWORDS.items()
+}
+
+
+def urgency_for_priority(priority: float) -> str:
+    """Urgency band a scheduling priority falls in"""
+    for level in reversed(URGENCY_LEVELS):
+        if priority >= URGENCY_FLOOR[level]:
+            return level
+    return "low"
+
+
+def pre_score(title: str, description: str = "", category: str = None) -> dict:
+    """
+    Cheap intake priority from keywords and category
+
+    Returns {"priority", "urgency", "signals"} where signals lists the
+    matched keywords (most urgent level first).
+    """
+    text = f"{title or ''}\n{description or ''}"
+    matches = {level: sorted(set(m.lower() for m in pattern.findall(text))) for level, pattern in _PATTERNS.items()}
+    base = CATEGORY_BASE.get((category or "other").lower(), CATEGORY_BASE["other"])
+
+    if matches["critical"]:
+        priority = min(1.0, 0.9 + 0.02 * (len(matches["critical"]) - 1 + len(matches["high"])))
+    elif matches["high"]:
+        priority = min(0.89, max(base, 0.7) + 0.03 * (len(matches["high"]) - 1))
+    elif matches["low"]:
+        priority = min(base, 0.25)
+    else:
+        priority = base
+
+    priority = round(priority, 3)
+    return {
+        "priority": priority,
+        "urgency": urgency_for_priority(priority),
+        "signals": matches["critical"] + matches["high"] + matches["low"]
+    }
+
+
+def priority_from_analysis(analysis: dict, fallback: float = 0.5) -> float:
+    """Scheduling priority from Discovery's priority score and urgency label"""
+    try:
+        priority = float(analysis.get("priority", fallback))
+    except (TypeError, ValueError):
+        priority = fallback
+    urgency = str(analysis.get("urgency") or "").lower()
+    priority = max(priority, URGENCY_FLOOR.get(urgency, 0.0))
+    return round(min(1.0, max(0.0, priority)), 3)
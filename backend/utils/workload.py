@@ -0,0 +1,144 @@
+"""
+Volunteer workload lookups
+
+Reads the trigger-maintained volunteer_workload counters (see
+migrations/001_volunteer_workload.sql) instead of counting active
+task_assignments rows in Python.
+"""
+
+from utils.supabase_client import get_db
+from utils.log_retention import parse_timestamp
+from datetime import timedelta
+import time
+
+
+ACTIVE_ASSIGNMENT_STATUSES = ["assigned", "in_progress"]
+
+# Keep in_() filters comfortably inside URL length limits
+ID_CHUNK_SIZE = 200
+
+# After a failed counter read, count assignments instead for this long
+# (doubling on each further failure), then try the counters again
+COUNTER_RETRY_SECONDS = 30
+COUNTER_RETRY_MAX_SECONDS = 900
+
+_counter_retry_at = 0.0
+_counter_backoff = 0.0
+
+
+def get_workload_counts(volunteer_ids: list = None) -> dict:
+    """
+    Active assignment counts per volunteer
+
+    Args:
+        volunteer_ids: Only look up these volunteers. When omitted, returns
+            every volunteer with a non-zero workload.
+
+    Returns:
+        Dictionary of volunteer_id -> active assignment count (missing = 0)
+    """
+    global _counter_retry_at, _counter_backoff
+
+    if time.time() >= _counter_retry_at:
+        try:
+            counts = _read_counters(volunteer_ids)
+            _counter_backoff = 0.0
+            return counts
+        except Exception as e:
+            _counter_backoff = min(COUNTER_RETRY_MAX_SECONDS, _counter_backoff * 2 or COUNTER_RETRY_SECONDS)
+            _counter_retry_at = time.time() + _counter_backoff
+            print(f"⚠️ volunteer_workload counters unavailable, counting assignments for {_counter_backoff:.0f}s: {e}")
+
+    return _count_active_assignments(volunteer_ids)
+
+
+def _read_counters(volunteer_ids: list = None) -> dict:
+    db = get_db()
+    counts = {}
+
+    if volunteer_ids is None:
+        rows = db.table("volunteer_workload").select("volunteer_id, active_assignments").gt("active_assignments", 0).execute().data
+        return {r["volunteer_id"]: r["active_assignments"] for r in rows}
+
+    for i in range(0, len(volunteer_ids), ID_CHUNK_SIZE):
+        chunk = volunteer_ids[i:i + ID_CHUNK_SIZE]
+        rows = db.table("volunteer_workload").select("volunteer_id, active_assignments").in_("volunteer_id", chunk).execute().data
+        for r in rows:
+            counts[r["volunteer_id"]] = r["active_assignments"]
+    return counts
+
+
+def _count_active_assignments(volunteer_ids: list = None) -> dict:
+    """Fallback for databases without the counter table"""
+    db = get_db()
+    counts = {}
+
+    if volunteer_ids is None:
+        chunks = [None]
+    else:
+        chunks = [volunteer_ids[i:i + ID_CHUNK_SIZE] for i in range(0, len(volunteer_ids), ID_CHUNK_SIZE)]
+
+    for chunk in chunks:
+        query = db.table("task_assignments").select("volunteer_id").in_("status", ACTIVE_ASSIGNMENT_STATUSES)
+        if chunk is not None:
+            query = query.in_("volunteer_id", chunk)
+        for a in query.execute().data:
+            counts[a["volunteer_id"]] = counts.get(a["volunteer_id"], 0) + 1
+    return counts
+
+
+def _select_in(table: str, columns: str, column: str, values: list, statuses: list = None) -> list:
+    db = get_db()
+    rows = []
+    for i in range(0, len(values), ID_CHUNK_SIZE):
+        query = db.table(table).select(columns).in_(column, values[i:i + ID_CHUNK_SIZE])
+        if statuses:
+            query = query.in_("status", statuses)
+        rows.extend(query.execute().data)
+    return rows
+
+
+def scheduled_window(plan: dict, task_id: str):
+    """Wall-clock (start, end) of a task from its plan's stored schedule, or None"""
+    schedule = ((plan or {}).get("metadata") or {}).get("schedule") or {}
+    window = (schedule.get("tasks") or {}).get(task_id)
+    if not window or not schedule.get("start_at"):
+        return None
+    try:
+        start = parse_timestamp(schedule["start_at"])
+    except (TypeError, ValueError):
+        return None
+    return (start + timedelta(hours=window["start_hour"]), start + timedelta(hours=window["end_hour"]))
+
+
+def get_active_windows(volunteer_ids: list) -> dict:
+    """
+    Wall-clock windows of each volunteer's active assignments
+
+    Windows come from the schedule matching stored on each plan
+    (metadata.schedule). Three reads (assignments, tasks, plans) however
+    many volunteers are asked for.
+
+    Returns:
+        volunteer_id -> list of (start, end) datetimes, with None for an
+        assignment whose plan has no scheduled start (it may overlap anything)
+    """
+    if not volunteer_ids:
+        return {}
+    assignments = _select_in("task_assignments", "volunteer_id, task_id", "volunteer_id", volunteer_ids,
+                             ACTIVE_ASSIGNMENT_STATUSES)
+    task_ids = sorted(set(a["task_id"] for a in assignments))
+    plan_by_task = {t["id"]: t.get("action_plan_id") for t in _select_in("tasks", "id, action_plan_id", "id", task_ids)}
+    plan_ids = sorted(set(p for p in plan_by_task.values() if p))
+    plans = {p["id"]: p for p in _select_in("action_plans", "id, metadata", "id", plan_ids)}
+
+    windows = {}
+    for a in assignments:
+        plan = plans.get(plan_by_task.get(a["task_id"]))
+        windows.setdefault(a["volunteer_id"], []).append(scheduled_window(plan, a["task_id"]))
+    return windows
+
+
+def overlapping_count(windows: list, start, end) -> int:
+    """Active assignments overlapping [start, end); unscheduled ones always count"""
+    return sum(1 for w in windows if w is None or (w[0] < end and start < w[1]))